@@ -1,52 +1,324 @@
+import csv
+import hashlib
+import io
 import os
-from flask import Flask, render_template, request
+from datetime import date, datetime
+from flask import Flask, Response, render_template, request, jsonify, url_for, stream_with_context
 import pymysql
 from dotenv import load_dotenv
+from db_pool import ConnectionPool, PoolTimeout
+from cache_versions import VersionedCache, get_version
+from search_index import SearchIndex
+from rollups import load_stats
 
 load_dotenv()
 
 app = Flask(__name__)
 
+# Beyond this many search matches an IN list stops paying off and the search falls back to LIKE
+SEARCH_MAX_IDS = int(os.getenv('SEARCH_MAX_IDS', '2000'))
+
+# Rows per dashboard page
+PAGE_SIZE = int(os.getenv('PAGE_SIZE', '50'))
+MAX_PAGE_SIZE = 500
+PAGE_SIZE_OPTIONS = [25, 50, 100, 200]
+
+# Weeks of history in the stats page's weekly chart
+STATS_WEEKS = int(os.getenv('STATS_WEEKS', '26'))
+# Companies listed in the stats page's top companies chart
+STATS_TOP_COMPANIES = 10
+
+# Columns written by /export.csv, in order
+EXPORT_COLUMNS = ['number', 'application_date', 'company_name', 'job_title', 'platform', 'status']
+# Rows pulled from the server-side cursor per chunk of CSV output
+EXPORT_CHUNK_ROWS = 1000
+
 def get_db_connection():
     connection = pymysql.connect(
         host=os.getenv('DB_HOST'),
         user=os.getenv('DB_USER'),
         password=os.getenv('DB_PASSWORD'),
         database=os.getenv('DB_NAME'),
-        cursorclass=pymysql.cursors.DictCursor
+        cursorclass=pymysql.cursors.DictCursor,
+        # Each read sees the latest data instead of a snapshot held open by the pool
+        autocommit=True
     )
     return connection
 
-@app.route('/', methods=['GET'])
-def index():
-    search = request.args.get('search', '')
-    filter_platform = request.args.get('platform', '')
-    filter_status = request.args.get('status', '')
-    query = "SELECT * FROM job_applications WHERE 1=1"
+db_pool = ConnectionPool(get_db_connection)
+facet_cache = VersionedCache()
+stats_cache = VersionedCache()
+search_index = SearchIndex()
+
+# Always offered in the status filter, even before any application reaches them
+DEFAULT_STATUSES = ['Offered', 'Interviewing']
+
+def load_facets(conn):
+    """Count applications per platform and per status across the whole table"""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT platform, status, COUNT(*) AS count FROM job_applications GROUP BY platform, status")
+        rows = cursor.fetchall()
+    platform_counts = {}
+    status_counts = {}
+    for row in rows:
+        if row['platform']:
+            platform_counts[row['platform']] = platform_counts.get(row['platform'], 0) + row['count']
+        if row['status']:
+            status_counts[row['status']] = status_counts.get(row['status'], 0) + row['count']
+    platforms = sorted(platform_counts.items())
+    statuses = sorted(status_counts.items())
+    statuses.extend((status, 0) for status in DEFAULT_STATUSES if status not in status_counts)
+    return platforms, statuses
+
+def build_filters(conn, search, filter_platform, filter_status):
+    """Return the WHERE clauses and parameters for the dashboard's search and filters.
+
+    Also returns the search index's {number: score} matches (None without a search).
+    """
+    clauses = []
     params = []
+    scores = None
     if search:
-        query += " AND (company_name LIKE %s OR job_title LIKE %s)"
-        params.extend([f"%{search}%", f"%{search}%"])
+        scores = search_index.search(conn, search)
+        if not scores:
+            clauses.append("1 = 0")
+        elif len(scores) <= SEARCH_MAX_IDS:
+            clauses.append(f"number IN ({', '.join(['%s'] * len(scores))})")
+            params.extend(scores)
+        else:
+            clauses.append("(company_name LIKE %s OR job_title LIKE %s)")
+            params.extend([f"%{search}%", f"%{search}%"])
     if filter_platform:
-        query += " AND platform = %s"
+        clauses.append("platform = %s")
         params.append(filter_platform)
     if filter_status:
-        query += " AND status = %s"
+        clauses.append("status = %s")
         params.append(filter_status)
-    query += " ORDER BY application_date DESC, number DESC"
-    conn = get_db_connection()
+    return clauses, params, scores
+
+def parse_cursor(value):
+    """Parse a 'YYYY-MM-DD:number' page cursor ('null:number' for rows without a date)"""
+    if not value:
+        return None
+    date_part, _, number = value.rpartition(':')
+    try:
+        number = int(number)
+        application_date = None if date_part == 'null' else datetime.strptime(date_part, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+    return application_date, number
+
+def format_cursor(row):
+    application_date = row['application_date']
+    date_part = application_date.strftime('%Y-%m-%d') if application_date else 'null'
+    return f"{date_part}:{row['number']}"
+
+def keyset_clause(cursor, direction):
+    """SQL selecting the rows after (older) or before (newer) a cursor.
+
+    Matches ORDER BY application_date DESC, number DESC, where MySQL sorts NULL
+    dates last, so the seek is served by the (application_date, number) index.
+    """
+    application_date, number = cursor
+    if application_date is None:
+        if direction == 'after':
+            return "(application_date IS NULL AND number < %s)", [number]
+        return "(application_date IS NOT NULL OR number > %s)", [number]
+    date_param = application_date.strftime('%Y-%m-%d')
+    if direction == 'after':
+        return ("(application_date < %s OR (application_date = %s AND number < %s) OR application_date IS NULL)",
+                [date_param, date_param, number])
+    return "(application_date > %s OR (application_date = %s AND number > %s))", [date_param, date_param, number]
+
+def fetch_page(conn, clauses, params, per_page, after=None, before=None):
+    """Fetch one page with keyset pagination, returning (rows, has_previous, has_next)"""
+    clauses = list(clauses)
+    params = list(params)
+    cursor_value = after or before
+    direction = 'before' if before and not after else 'after'
+    if cursor_value:
+        clause, clause_params = keyset_clause(cursor_value, direction)
+        clauses.append(clause)
+        params.extend(clause_params)
+    query = "SELECT * FROM job_applications"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    if direction == 'before':
+        query += " ORDER BY application_date ASC, number ASC"
+    else:
+        query += " ORDER BY application_date DESC, number DESC"
+    # One extra row tells us whether there is another page in this direction
+    query += " LIMIT %s"
+    params.append(per_page + 1)
+    with conn.cursor() as cursor:
+        cursor.execute(query, params)
+        rows = list(cursor.fetchall())
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == 'before':
+        rows.reverse()
+        return rows, has_more, True
+    return rows, cursor_value is not None, has_more
+
+def fetch_ranked_page(conn, clauses, params, scores, per_page, page):
+    """Fetch one page of search results ordered by relevance, newest first among equals"""
+    query = "SELECT * FROM job_applications WHERE " + " AND ".join(clauses)
     with conn.cursor() as cursor:
         cursor.execute(query, params)
-        applications = cursor.fetchall()
-    conn.close()
-    # For filter dropdowns
-    platforms = sorted({row['platform'] for row in applications if row['platform']})
-    statuses = sorted({row['status'] for row in applications if row['status']})
-    if 'Offered' not in statuses:
-        statuses.append('Offered')
-    if 'Interviewing' not in statuses:
-        statuses.append('Interviewing')
-    return render_template('index.html', applications=applications, search=search, filter_platform=filter_platform, filter_status=filter_status, platforms=platforms, statuses=statuses, status_label='All Status')
+        rows = list(cursor.fetchall())
+    rows.sort(key=lambda row: row['number'], reverse=True)
+    rows.sort(key=lambda row: row['application_date'] or date.min, reverse=True)
+    rows.sort(key=lambda row: scores.get(row['number'], 0), reverse=True)
+    start = (page - 1) * per_page
+    return rows[start:start + per_page], page > 1, len(rows) > start + per_page
+
+def get_page():
+    try:
+        return max(1, int(request.args.get('page', 1)))
+    except ValueError:
+        return 1
+
+def get_per_page():
+    try:
+        per_page = int(request.args.get('per_page', PAGE_SIZE))
+    except ValueError:
+        per_page = PAGE_SIZE
+    return max(1, min(per_page, MAX_PAGE_SIZE))
+
+def get_filters():
+    return request.args.get('search', ''), request.args.get('platform', ''), request.args.get('status', '')
+
+def load_page(conn, search, filter_platform, filter_status, per_page, sort):
+    """Fetch the page of applications the request asks for.
+
+    Returns (rows, previous_args, next_args), where the link arguments select
+    the neighbouring pages (None when there is no such page).
+    """
+    clauses, params, scores = build_filters(conn, search, filter_platform, filter_status)
+    if sort == 'relevance' and scores and len(scores) <= SEARCH_MAX_IDS:
+        page = get_page()
+        rows, has_previous, has_next = fetch_ranked_page(conn, clauses, params, scores, per_page, page)
+        previous_args = {'page': page - 1} if has_previous else None
+        next_args = {'page': page + 1} if has_next else None
+        return rows, previous_args, next_args
+    after = parse_cursor(request.args.get('after'))
+    before = parse_cursor(request.args.get('before'))
+    rows, has_previous, has_next = fetch_page(conn, clauses, params, per_page, after, before)
+    previous_args = {'before': format_cursor(rows[0])} if has_previous and rows else None
+    next_args = {'after': format_cursor(rows[-1])} if has_next and rows else None
+    return rows, previous_args, next_args
+
+def get_link_args(search, filter_platform, filter_status, per_page, sort):
+    """Query arguments that page links carry over: the current filters and page size"""
+    link_args = {key: value for key, value in (('search', search), ('platform', filter_platform), ('status', filter_status), ('sort', sort)) if value}
+    link_args['per_page'] = per_page
+    return link_args
+
+@app.route('/', methods=['GET'])
+def index():
+    search, filter_platform, filter_status = get_filters()
+    per_page = get_per_page()
+    sort = request.args.get('sort', '')
+    link_args = get_link_args(search, filter_platform, filter_status, per_page, sort)
+    with db_pool.connection() as conn:
+        applications, previous_args, next_args = load_page(conn, search, filter_platform, filter_status, per_page, sort)
+        # Filter dropdowns list every value in the table, not just the ones on this page
+        platforms, statuses = facet_cache.get(conn, load_facets)
+    previous_url = url_for('index', **previous_args, **link_args) if previous_args else None
+    next_url = url_for('index', **next_args, **link_args) if next_args else None
+    return render_template('index.html', applications=applications, search=search, filter_platform=filter_platform, filter_status=filter_status, platforms=platforms, statuses=statuses, status_label='All Status', per_page=per_page, page_sizes=PAGE_SIZE_OPTIONS, previous_url=previous_url, next_url=next_url, sort=sort)
+
+def serialize_application(row):
+    return {key: value.isoformat() if isinstance(value, date) else value for key, value in row.items()}
+
+@app.route('/api/applications', methods=['GET'])
+def api_applications():
+    """One page of applications as JSON, with the same filters and paging arguments as the dashboard"""
+    search, filter_platform, filter_status = get_filters()
+    per_page = get_per_page()
+    sort = request.args.get('sort', '')
+    link_args = get_link_args(search, filter_platform, filter_status, per_page, sort)
+    with db_pool.connection() as conn:
+        # Every writer bumps this counter, so it identifies the table contents
+        # without running the page query; pollers get a 304 while it stays put
+        with conn.cursor() as cursor:
+            version = get_version(cursor)
+        etag = hashlib.sha1(f"{version}:{request.query_string.decode()}".encode()).hexdigest()
+        if etag in request.if_none_match:
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        applications, previous_args, next_args = load_page(conn, search, filter_platform, filter_status, per_page, sort)
+    response = jsonify({
+        'applications': [serialize_application(row) for row in applications],
+        'previous': url_for('api_applications', **previous_args, **link_args) if previous_args else None,
+        'next': url_for('api_applications', **next_args, **link_args) if next_args else None
+    })
+    response.set_etag(etag)
+    return response
+
+def generate_csv(conn, clauses, params):
+    """Stream the matching rows as CSV text, a chunk at a time, from an unbuffered cursor"""
+    query = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM job_applications"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY application_date DESC, number DESC"
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    # SSCursor reads rows off the socket as they are fetched instead of loading the whole result
+    cursor = conn.cursor(pymysql.cursors.SSCursor)
+    cursor.execute(query, params)
+    while True:
+        rows = cursor.fetchmany(EXPORT_CHUNK_ROWS)
+        if not rows:
+            break
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    cursor.close()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def stream_export(search, filter_platform, filter_status):
+    # Holds the pooled connection until the last row is sent; an aborted
+    # download discards it rather than returning it mid-result
+    with db_pool.connection() as conn:
+        clauses, params, _ = build_filters(conn, search, filter_platform, filter_status)
+        yield from generate_csv(conn, clauses, params)
+
+def resume_stream(first_chunk, chunks):
+    """Yield first_chunk, then the rest of chunks; closing this generator closes chunks too"""
+    try:
+        yield first_chunk
+        yield from chunks
+    finally:
+        chunks.close()
+
+@app.route('/export.csv', methods=['GET'])
+def export_csv():
+    """Every application matching the dashboard filters as a streamed CSV download"""
+    search, filter_platform, filter_status = get_filters()
+    chunks = stream_export(search, filter_platform, filter_status)
+    # Run the query before the response starts, so a busy pool still gets its 503
+    first_chunk = next(chunks)
+    return Response(stream_with_context(resume_stream(first_chunk, chunks)), mimetype='text/csv', headers={'Content-Disposition': 'attachment; filename=job_applications.csv'})
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    """Charts of applications per week, the status funnel and top companies, read from the rollups"""
+    with db_pool.connection() as conn:
+        summary = stats_cache.get(conn, lambda conn: load_stats(conn, STATS_WEEKS, STATS_TOP_COMPANIES))
+    return render_template('stats.html', stats=summary)
+
+@app.errorhandler(PoolTimeout)
+def pool_timeout(error):
+    return "The database is busy, please try again shortly.", 503
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return jsonify({'db_pool': db_pool.metrics()})
 
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
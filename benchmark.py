@@ -0,0 +1,157 @@
+"""Benchmark a full process_emails() run against a synthetic mailbox and a SQLite job_applications table.
+
+Runs offline: the IMAP server is replaced by synthetic_mail.FakeImap and the
+RDS database by sqlite_db.SqliteConnection. Each mailbox size runs in its own
+process so peak RSS is measured per size.
+
+    python benchmark.py                              # 1k, 10k and 100k messages
+    python benchmark.py --sizes 10000 --imap-latency 0.05 --db-latency 0.002
+    python benchmark.py --mode offline --json bench.json
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+class ErrorCapture(logging.Handler):
+    """Keep the processor's error messages; everything below ERROR is dropped"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.errors = []
+
+    def emit(self, record):
+        self.errors.append(record.getMessage())
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_once(size, mode, imap_latency, db_latency, seed, pool_size):
+    """Run process_emails() once over a fresh mailbox and database and return the measurements"""
+    workdir = tempfile.mkdtemp(prefix='jobapp-bench-')
+    # The processor's modules read their settings at import time
+    os.environ['SYNC_MODE'] = 'offline' if mode == 'offline' else 'incremental'
+    os.environ['SYNC_STATE_FILE'] = os.path.join(workdir, 'sync_state.json')
+    os.environ['MESSAGE_CACHE_PATH'] = ''
+    os.environ['IMAP_POOL_SIZE'] = str(pool_size)
+    os.environ.setdefault('EMAIL_ADDRESS', 'bench@example.com')
+    os.environ.setdefault('EMAIL_PASSWORD', 'bench')
+    from synthetic_mail import SyntheticMailbox, FakeImap, ImapStats
+    from sqlite_db import SqliteConnection
+    import process_job_emails
+
+    mailbox = SyntheticMailbox(size, seed=seed)
+    if mode == 'offline':
+        os.environ['MAIL_EXPORT_PATH'] = os.path.join(workdir, 'mailbox.mbox')
+        mailbox.write_mbox(os.environ['MAIL_EXPORT_PATH'])
+    db_path = os.path.join(workdir, 'job_applications.sqlite3')
+    imap_stats = ImapStats()
+    db_round_trips = 0
+
+    def connect_to_email():
+        mail = FakeImap(mailbox, imap_latency, imap_stats)
+        mail.login(os.environ['EMAIL_ADDRESS'], os.environ['EMAIL_PASSWORD'])
+        return mail
+
+    def connect_to_database():
+        nonlocal db_round_trips
+        connection = SqliteConnection(db_path, db_latency)
+        close = connection.close
+
+        def close_and_count():
+            nonlocal db_round_trips
+            db_round_trips += connection.round_trips
+            close()
+
+        connection.close = close_and_count
+        process_job_emails.load_canonical_names(connection)
+        return connection
+
+    process_job_emails.connect_to_email = connect_to_email
+    process_job_emails.connect_to_database = connect_to_database
+    output = ErrorCapture()
+    logging.getLogger().handlers = [output]
+    logging.getLogger().setLevel(logging.ERROR)
+    start = time.perf_counter()
+    process_job_emails.process_emails()
+    elapsed = time.perf_counter() - start
+    check = SqliteConnection(db_path)
+    stored = check.db.execute("SELECT COUNT(*) FROM job_applications").fetchone()[0]
+    check.close()
+    shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        'size': size,
+        'mode': mode,
+        'job_emails': sum(1 for kind in mailbox.kinds if kind != 'noise'),
+        'applications_stored': stored,
+        'seconds': round(elapsed, 3),
+        'messages_per_sec': round(size / elapsed, 1) if elapsed else None,
+        'imap_round_trips': imap_stats.round_trips,
+        'imap_commands': imap_stats.commands,
+        'db_round_trips': db_round_trips,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'stages': process_job_emails.METRICS.report()['stages'],
+        'errors': output.errors
+    }
+
+def run_isolated(args, size):
+    """Run one size in a child process, so its peak RSS is not inflated by the others"""
+    command = [
+        sys.executable, os.path.abspath(__file__), '--single', str(size),
+        '--mode', args.mode, '--imap-latency', str(args.imap_latency),
+        '--db-latency', str(args.db_latency), '--seed', str(args.seed), '--pool-size', str(args.pool_size)
+    ]
+    completed = subprocess.run(command, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark of {size} messages failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def print_table(results):
+    print(f"{'messages':>9} {'mode':>11} {'stored':>8} {'seconds':>9} {'msg/s':>9} {'IMAP RTs':>9} {'DB RTs':>8} {'peak RSS MB':>12}")
+    for result in results:
+        print(
+            f"{result['size']:>9} {result['mode']:>11} {result['applications_stored']:>8} {result['seconds']:>9} "
+            f"{result['messages_per_sec']:>9} {result['imap_round_trips']:>9} {result['db_round_trips']:>8} "
+            f"{result['peak_rss_mb']:>12}"
+        )
+        for name, stage in result['stages'].items():
+            print(f"    {name:<20} {stage['calls']:>8} calls {stage['items']:>9} items {stage['seconds']:>9.3f}s")
+        for error in result['errors']:
+            print(f"    {error}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the email ingestion pipeline offline")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="mailbox sizes to run")
+    parser.add_argument('--mode', choices=['imap', 'offline'], default='imap',
+                        help="fetch from the fake IMAP server, or read an mbox export (SYNC_MODE=offline)")
+    parser.add_argument('--imap-latency', type=float, default=0.0, help="seconds added to every IMAP command")
+    parser.add_argument('--db-latency', type=float, default=0.0, help="seconds added to every database round-trip")
+    parser.add_argument('--pool-size', type=int, default=1, help="IMAP_POOL_SIZE for the run")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the synthetic mailbox")
+    parser.add_argument('--json', help="also write the results to this file")
+    parser.add_argument('--single', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        result = run_once(args.single, args.mode, args.imap_latency, args.db_latency, args.seed, args.pool_size)
+        print(json.dumps(result))
+        return
+
+    results = [run_isolated(args, size) for size in args.sizes]
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
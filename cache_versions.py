@@ -0,0 +1,69 @@
+import os
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Hard upper bound on how long derived data is served without reloading it
+CACHE_TTL = float(os.getenv('CACHE_TTL', '300'))
+# How often, in seconds, the cached version counter is compared with the database
+CACHE_VERSION_CHECK_INTERVAL = float(os.getenv('CACHE_VERSION_CHECK_INTERVAL', '5'))
+
+APPLICATIONS = 'job_applications'
+# Bumped, together with APPLICATIONS, when existing rows are rewritten rather than new ones added
+APPLICATION_REWRITES = 'job_applications_rewrites'
+
+def bump_version(cursor, name=APPLICATIONS):
+    """Mark data derived from a table as stale; call inside the writing transaction"""
+    cursor.execute(
+        "INSERT INTO cache_versions (name, version) VALUES (%s, 1) ON DUPLICATE KEY UPDATE version = version + 1",
+        (name,)
+    )
+
+def get_version(cursor, name=APPLICATIONS):
+    cursor.execute("SELECT version FROM cache_versions WHERE name = %s", (name,))
+    row = cursor.fetchone()
+    if not row:
+        return 0
+    return row['version'] if isinstance(row, dict) else row[0]
+
+class VersionedCache:
+    """An in-process cache of one derived value, reloaded when its version counter moves or its TTL expires.
+
+    Writers in other processes (the email processor, the normalization scripts)
+    invalidate it by bumping the counter with bump_version().
+    """
+
+    def __init__(self, name=APPLICATIONS, ttl=CACHE_TTL, check_interval=CACHE_VERSION_CHECK_INTERVAL):
+        self.name = name
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.value = None
+        self.version = None
+        self.loaded_at = 0.0
+        self.checked_at = 0.0
+
+    def get(self, connection, load):
+        """Return the cached value, calling load(connection) to refresh it when stale"""
+        now = time.monotonic()
+        with self.lock:
+            if self.version is not None and now - self.loaded_at < self.ttl:
+                if now - self.checked_at < self.check_interval:
+                    return self.value
+                with connection.cursor() as cursor:
+                    version = get_version(cursor, self.name)
+                self.checked_at = now
+                if version == self.version:
+                    return self.value
+            with connection.cursor() as cursor:
+                version = get_version(cursor, self.name)
+            self.value = load(connection)
+            self.version = version
+            self.loaded_at = self.checked_at = now
+            return self.value
+
+    def invalidate(self):
+        with self.lock:
+            self.version = None
@@ -0,0 +1,79 @@
+import os
+from functools import lru_cache
+from dotenv import load_dotenv
+from cache_versions import APPLICATION_REWRITES, get_version
+from normalization import company_normalizer, platform_normalizer, load_aliases
+
+load_dotenv()
+
+# Distinct raw values remembered per field
+CANONICAL_CACHE_SIZE = int(os.getenv('CANONICAL_CACHE_SIZE', '4096'))
+
+class Canonicalizer:
+    """Maps raw company and platform values to their canonical form before they are stored.
+
+    Uses the same rules as the normalization scripts, plus the name_aliases
+    table and the spellings already in job_applications once load() has run,
+    so a new 'ACME LIMITED' is stored as the existing 'Acme'. Lookups are
+    memoized, since the same few companies and platforms recur in every batch.
+    Names it canonicalizes are learned as it goes, so the table is only read
+    again after existing rows have been rewritten.
+    """
+
+    def __init__(self, cache_size=CANONICAL_CACHE_SIZE):
+        self.companies = company_normalizer()
+        self.platforms = platform_normalizer()
+        self.company = lru_cache(maxsize=cache_size)(self._company)
+        self.platform = lru_cache(maxsize=cache_size)(self._platform)
+        # APPLICATION_REWRITES version the spellings were loaded at
+        self.rewrites = None
+
+    def _company(self, raw):
+        if not raw:
+            return raw
+        company = self.companies.normalize(raw)
+        # Later case variants of a new company take the spelling stored first, as after a reload
+        self.companies.learn(company)
+        return company
+
+    def _platform(self, raw):
+        return self.platforms.normalize(raw) if raw else raw
+
+    def load(self, connection):
+        """Load aliases and existing spellings from the database, unless this process already has them.
+
+        The full read runs once per process, and again only after the cleanup
+        scripts or a duplicate merge have rewritten stored rows, so reconnects
+        cost one version lookup.
+        """
+        with connection.cursor() as cursor:
+            rewrites = get_version(cursor, APPLICATION_REWRITES)
+        if rewrites == self.rewrites:
+            return
+        self.companies = company_normalizer(load_aliases(connection, 'company'))
+        self.platforms = platform_normalizer(load_aliases(connection, 'platform'))
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT company_name, COUNT(*) AS count FROM job_applications GROUP BY company_name")
+            rows = cursor.fetchall()
+        for row in rows:
+            company_name, count = (row['company_name'], row['count']) if isinstance(row, dict) else row
+            if company_name:
+                self.companies.learn(company_name, count)
+        self.company.cache_clear()
+        self.platform.cache_clear()
+        self.rewrites = rewrites
+
+    def canonicalize(self, job_info):
+        """Rewrite a job_info's company_name and platform in place, and return it"""
+        job_info['company_name'] = self.company(job_info['company_name'])
+        job_info['platform'] = self.platform(job_info['platform'])
+        return job_info
+
+# Shared by the writers, which canonicalize every row just before storing it
+CANONICALIZER = Canonicalizer()
+
+def canonicalize(job_info):
+    return CANONICALIZER.canonicalize(job_info)
+
+def load_canonical_names(connection):
+    CANONICALIZER.load(connection)
@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+# Seconds to wait for a free connection before giving up
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+# Connections older than this many seconds are replaced
+DB_POOL_RECYCLE = float(os.getenv('DB_POOL_RECYCLE', '3600'))
+# Connections idle for longer than this many seconds are pinged before use
+DB_POOL_PING_AFTER = float(os.getenv('DB_POOL_PING_AFTER', '30'))
+
+class PoolTimeout(Exception):
+    """Raised when no connection became free within the pool's timeout"""
+
+class ConnectionPool:
+    """A bounded, thread-safe pool of database connections.
+
+    connect is called to open a new connection whenever the pool is below its
+    size and has no idle connection to hand out.
+    """
+
+    def __init__(self, connect, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 recycle=DB_POOL_RECYCLE, ping_after=DB_POOL_PING_AFTER):
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+        # (connection, created_at, returned_at); used as a LIFO stack to keep the warmest connections in use
+        self.idle = []
+        self.lock = threading.Lock()
+        # Signalled whenever a connection is returned or a slot frees up
+        self.available = threading.Condition(self.lock)
+        self.open_count = 0
+        self.stats = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'connections_opened': 0,
+            'connections_recycled': 0,
+            'connections_discarded': 0,
+            'wait_seconds_total': 0.0,
+            'checkout_seconds_total': 0.0,
+            'checkout_seconds_max': 0.0
+        }
+
+    def _open(self):
+        connection = self.connect()
+        now = time.monotonic()
+        with self.lock:
+            self.stats['connections_opened'] += 1
+        return connection, now, now
+
+    def _release_slot(self):
+        with self.available:
+            self.open_count -= 1
+            self.available.notify()
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self.lock:
+            self.stats['connections_discarded'] += 1
+        self._release_slot()
+
+    def _reserve(self, start):
+        """Take an idle entry, or None after reserving a slot for a new connection"""
+        deadline = start + self.timeout
+        with self.available:
+            while not self.idle and self.open_count >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats['timeouts'] += 1
+                    raise PoolTimeout(f"No database connection free after {self.timeout} seconds")
+                self.available.wait(remaining)
+            if self.idle:
+                return self.idle.pop()
+            self.open_count += 1
+            return None
+
+    def _checkout(self):
+        start = time.monotonic()
+        entry = self._reserve(start)
+        waited = time.monotonic() - start
+        if entry is None:
+            try:
+                entry = self._open()
+            except Exception:
+                self._release_slot()
+                raise
+        connection, created_at, returned_at = entry
+        now = time.monotonic()
+        try:
+            if now - created_at > self.recycle:
+                # Too old: replace it rather than risk a server-side timeout mid-request
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+                connection = None
+                connection, created_at, returned_at = self._open()
+                with self.lock:
+                    self.stats['connections_recycled'] += 1
+            elif now - returned_at > self.ping_after:
+                connection.ping(reconnect=True)
+        except Exception:
+            # Give the slot back, or a database outage would use up the pool for good
+            if connection is None:
+                self._release_slot()
+            else:
+                self._discard(connection)
+            raise
+        elapsed = time.monotonic() - start
+        with self.lock:
+            self.stats['checkouts'] += 1
+            self.stats['wait_seconds_total'] += waited
+            self.stats['checkout_seconds_total'] += elapsed
+            self.stats['checkout_seconds_max'] = max(self.stats['checkout_seconds_max'], elapsed)
+        return connection, created_at
+
+    @contextmanager
+    def connection(self):
+        """Check a connection out for the duration of a with block"""
+        connection, created_at = self._checkout()
+        try:
+            yield connection
+        except BaseException:
+            # The connection may be mid-result or broken (including a streamed
+            # response abandoned by its client); don't hand it to the next request
+            self._discard(connection)
+            raise
+        with self.available:
+            self.idle.append((connection, created_at, time.monotonic()))
+            self.available.notify()
+
+    def metrics(self):
+        """Return pool size, utilisation and checkout timing counters"""
+        with self.lock:
+            metrics = dict(self.stats)
+            metrics['size'] = self.size
+            metrics['open'] = self.open_count
+            metrics['idle'] = len(self.idle)
+        metrics['in_use'] = metrics['open'] - metrics['idle']
+        checkouts = metrics['checkouts'] or 1
+        metrics['wait_seconds_avg'] = metrics['wait_seconds_total'] / checkouts
+        metrics['checkout_seconds_avg'] = metrics['checkout_seconds_total'] / checkouts
+        return metrics
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection, _, _ in idle:
+            self._discard(connection)
@@ -0,0 +1,181 @@
+import logging
+import os
+import uuid
+from dotenv import load_dotenv
+from cache_versions import bump_version
+from canonical import canonicalize
+from dedup import DEDUP_MODE, dedupe_new_rows
+from ingest_metrics import METRICS
+from rollups import add_to_rollups
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# How many applications to buffer before writing them in one statement
+BATCH_SIZE = int(os.getenv('DB_BATCH_SIZE', '500'))
+
+# Relies on the unique key from migrations/001_application_unique_key.sql.
+# A no-op update leaves duplicates untouched and reports 0 affected rows for them,
+# so the affected row count is exactly the number of new applications.
+# New rows carry the batch's ingest_batch token; the no-op update leaves the
+# token of rows that already existed alone.
+# InnoDB spends an AUTO_INCREMENT number on every row the no-op update turns
+# away, so rows already stored are filtered out with EXISTING_SQL first. Only a
+# writer racing this one, or a rolled-back batch, still leaves a gap in number.
+INSERT_SQL = """
+INSERT INTO job_applications
+(company_name, job_title, application_date, status, platform, company_platform, ingest_batch)
+VALUES (%s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE number = number
+"""
+
+EXISTING_SQL = """
+SELECT company_name, job_title, application_date FROM job_applications
+WHERE (company_name, job_title, application_date) IN ({keys})
+"""
+
+def _key(company_name, job_title, application_date):
+    """An application's unique key, compared as loosely as MySQL's case-insensitive collation"""
+    return (
+        company_name.casefold() if company_name else company_name,
+        job_title.casefold() if job_title else job_title,
+        str(application_date) if application_date is not None else None
+    )
+
+def _new_rows(cursor, rows):
+    """Drop the rows whose unique key is already stored, or repeated earlier in the batch"""
+    keys = [row[:3] for row in rows if None not in row[:3]]
+    seen = set()
+    if keys:
+        cursor.execute(
+            EXISTING_SQL.format(keys=', '.join(['(%s, %s, %s)'] * len(keys))),
+            [value for key in keys for value in key]
+        )
+        seen = {_key(*row) for row in cursor.fetchall()}
+    new_rows = []
+    for row in rows:
+        key = _key(*row[:3])
+        if key in seen:
+            continue
+        # NULLs never collide in a unique key
+        if None not in key:
+            seen.add(key)
+        new_rows.append(row)
+    return new_rows
+
+def _insert_one_by_one(connection, cursor, rows):
+    """Insert rows one at a time inside the current transaction, skipping the ones the database rejects.
+
+    Returns (inserted, rejected).
+    """
+    inserted = rejected = 0
+    for row in rows:
+        cursor.execute("SAVEPOINT application_row")
+        try:
+            inserted += cursor.execute(INSERT_SQL, row)
+        except (connection.DataError, connection.IntegrityError) as e:
+            # Only this row's statement is undone; the rows before it stay in the transaction
+            cursor.execute("ROLLBACK TO SAVEPOINT application_row")
+            rejected += 1
+            logger.error(f"Skipping job application for '{row[0]}' - '{row[1]}' on {row[2]}: {str(e)}")
+    return inserted, rejected
+
+def update_database(connection, job_infos):
+    """Insert a batch of job applications in one statement and commit once.
+
+    Returns (inserted, skipped) where skipped counts rows that already existed
+    or that the database rejected. When the database rejects the batch for
+    its data (a value too long, a missing field), the batch is retried one row
+    at a time so that only the bad rows are skipped. Any other failed write is
+    rolled back and re-raised, so the caller never records the batch's emails
+    as synced.
+    """
+    if not job_infos:
+        return 0, 0
+    # Canonical names let the unique key catch near-duplicates like 'Acme Ltd' vs 'ACME'
+    job_infos = [canonicalize(job_info) for job_info in job_infos]
+    ingest_batch = uuid.uuid4().hex
+    rows = [
+        (
+            job_info['company_name'],
+            job_info['job_title'],
+            job_info['application_date'],
+            job_info['status'],
+            job_info['platform'],
+            job_info['company_platform'],
+            ingest_batch
+        )
+        for job_info in job_infos
+    ]
+    rejected = 0
+    cursor = connection.cursor()
+    try:
+        with METRICS.stage('db_insert', len(rows)):
+            new_rows = _new_rows(cursor, rows)
+            inserted = 0
+            try:
+                if new_rows:
+                    cursor.executemany(INSERT_SQL, new_rows)
+                    inserted = cursor.rowcount
+            except (connection.DataError, connection.IntegrityError) as e:
+                connection.rollback()
+                logger.warning(f"Database rejected a batch of {len(new_rows)} job applications ({str(e)}), retrying one row at a time")
+                inserted, rejected = _insert_one_by_one(connection, cursor, new_rows)
+            if inserted:
+                add_to_rollups(cursor, "ingest_batch = %s", [ingest_batch])
+                bump_version(cursor)
+            connection.commit()
+        skipped = len(rows) - inserted
+        logger.info(f"Wrote batch of {len(rows)} job applications: {inserted} added, "
+                    f"{skipped - rejected} duplicates skipped, {rejected} rejected")
+    except Exception as e:
+        logger.error(f"Error updating database: {str(e)}")
+        METRICS.count('db_errors')
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    METRICS.count('applications_rejected', rejected)
+    if inserted and DEDUP_MODE in ('flag', 'merge'):
+        try:
+            with METRICS.stage('db_dedup', inserted):
+                duplicates = dedupe_new_rows(connection, ingest_batch, [row[2] for row in rows])
+        except Exception as e:
+            logger.error(f"Error checking for duplicate applications: {str(e)}")
+            METRICS.count('db_errors')
+            connection.rollback()
+            duplicates = 0
+        if duplicates:
+            METRICS.count('duplicates_flagged' if DEDUP_MODE == 'flag' else 'duplicates_merged', duplicates)
+            logger.info(f"{'Merged' if DEDUP_MODE == 'merge' else 'Flagged'} {duplicates} likely duplicate applications")
+            if DEDUP_MODE == 'merge':
+                inserted -= duplicates
+                skipped += duplicates
+    METRICS.count('applications_inserted', inserted)
+    METRICS.count('applications_skipped', skipped)
+    return inserted, skipped
+
+class ApplicationBatchWriter:
+    """Buffers extracted job applications and writes them to the database in batches"""
+
+    def __init__(self, connection, batch_size=BATCH_SIZE):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.pending = []
+        self.inserted_count = 0
+        self.skipped_count = 0
+
+    def add(self, job_info):
+        """Queue one application, flushing when the batch is full"""
+        self.pending.append(job_info)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write all queued applications, returning (inserted, skipped) for this batch"""
+        batch, self.pending = self.pending, []
+        inserted, skipped = update_database(self.connection, batch)
+        self.inserted_count += inserted
+        self.skipped_count += skipped
+        return inserted, skipped
@@ -0,0 +1,184 @@
+import logging
+import os
+import re
+from datetime import date, timedelta
+from difflib import SequenceMatcher
+from functools import lru_cache
+from dotenv import load_dotenv
+from cache_versions import bump_version, APPLICATION_REWRITES
+from normalization import company_normalizer, fold
+from rollups import add_to_rollups, prune_rollups
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# What to do with likely duplicates: 'flag' sets duplicate_of, 'merge' deletes them, 'off' skips detection
+DEDUP_MODE = os.getenv('DEDUP_MODE', 'flag').lower()
+# Applications this many days apart can still be the same one
+DEDUP_WINDOW_DAYS = int(os.getenv('DEDUP_WINDOW_DAYS', '3'))
+# Minimum job title similarity (0-1) for two applications to the same company to count as duplicates
+DEDUP_TITLE_SIMILARITY = float(os.getenv('DEDUP_TITLE_SIMILARITY', '0.85'))
+
+COLUMNS = ('number', 'company_name', 'job_title', 'application_date', 'status', 'duplicate_of', 'ingest_batch')
+# Words that say nothing about which company it is
+COMPANY_STOPWORDS = {'the'}
+
+# Title words that make two otherwise similar titles different jobs ('Engineer II' vs 'Engineer III')
+DISTINGUISHING_WORDS = {
+    'i', 'ii', 'iii', 'iv', 'senior', 'sr', 'junior', 'jr', 'lead', 'principal', 'staff',
+    'intern', 'head', 'assistant', 'associate', 'trainee', 'graduate'
+}
+TITLE_WORD_RE = re.compile(r'\w+')
+
+_companies = company_normalizer()
+
+@lru_cache(maxsize=8192)
+def company_key(company_name):
+    return _companies.key(company_name or '')
+
+def same_company(a, b):
+    """Equal normalized names, or one extends the other by whole words ('Acme' / 'Acme Group')"""
+    if a == b:
+        return True
+    shorter, longer = sorted((a, b), key=len)
+    return longer.startswith(shorter + ' ')
+
+def company_token(company_name):
+    """Blocking token: the first significant word of the normalized company name"""
+    words = [word for word in company_key(company_name).split() if word not in COMPANY_STOPWORDS]
+    return words[0] if words else ''
+
+def distinguishing_words(title):
+    return {word for word in TITLE_WORD_RE.findall(title) if word.isdigit() or word in DISTINGUISHING_WORDS}
+
+def title_similarity(a, b):
+    """Similarity of two job titles from 0 to 1; 0 when their level or number words differ"""
+    a = fold(a or '')
+    b = fold(b or '')
+    if a == b:
+        return 1.0
+    if distinguishing_words(a) != distinguishing_words(b):
+        return 0.0
+    return SequenceMatcher(None, a, b).ratio()
+
+def _as_date(value):
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+class DuplicateIndex:
+    """Applications grouped into blocks by (company token, date).
+
+    find() only compares a row with the rows in its own company block within
+    the date window, so checking n applications costs about n * (2 * window + 1)
+    dictionary lookups plus a few title comparisons, instead of n^2 comparisons.
+    """
+
+    def __init__(self, window_days=DEDUP_WINDOW_DAYS, threshold=DEDUP_TITLE_SIMILARITY):
+        self.window_days = window_days
+        self.threshold = threshold
+        self.blocks = {}
+
+    def add(self, row):
+        application_date = _as_date(row['application_date'])
+        if application_date is None:
+            return
+        self.blocks.setdefault((company_token(row['company_name']), application_date), []).append(row)
+
+    def find(self, row):
+        """Return the indexed row that row most likely duplicates, or None"""
+        application_date = _as_date(row['application_date'])
+        token = company_token(row['company_name'])
+        if application_date is None or not token:
+            return None
+        key = company_key(row['company_name'])
+        best = None
+        best_score = self.threshold
+        for offset in range(-self.window_days, self.window_days + 1):
+            for candidate in self.blocks.get((token, application_date + timedelta(days=offset)), ()):
+                if not same_company(company_key(candidate['company_name']), key):
+                    continue
+                score = title_similarity(row['job_title'], candidate['job_title'])
+                if score >= best_score:
+                    best, best_score = candidate, score
+        return best
+
+def find_duplicates(rows, index=None, new_numbers=None):
+    """Pair each likely duplicate with the application it repeats, in number order.
+
+    rows must be sorted by number; the lower-numbered application is kept.
+    When new_numbers is given only those rows are checked, the others just
+    fill the index.
+    """
+    index = index or DuplicateIndex()
+    pairs = []
+    for row in rows:
+        if row.get('duplicate_of'):
+            continue
+        original = index.find(row) if new_numbers is None or row['number'] in new_numbers else None
+        if original:
+            pairs.append((row, original))
+        else:
+            index.add(row)
+    return pairs
+
+def load_rows(connection, start=None, end=None):
+    """Read the columns dedup needs, in number order, optionally for a date range"""
+    query = f"SELECT {', '.join(COLUMNS)} FROM job_applications"
+    params = []
+    if start is not None:
+        query += " WHERE application_date BETWEEN %s AND %s"
+        params = [start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')]
+    query += " ORDER BY number"
+    with connection.cursor() as cursor:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+    return [row if isinstance(row, dict) else dict(zip(COLUMNS, row)) for row in rows]
+
+def apply_duplicates(connection, pairs, mode=DEDUP_MODE):
+    """Flag or merge duplicate pairs in one transaction, returning how many rows changed"""
+    if not pairs or mode not in ('flag', 'merge'):
+        return 0
+    with connection.cursor() as cursor:
+        if mode == 'flag':
+            cursor.executemany(
+                "UPDATE job_applications SET duplicate_of = %s WHERE number = %s",
+                [(original['number'], duplicate['number']) for duplicate, original in pairs]
+            )
+        else:
+            # Keep the furthest-along status when the kept row is still at 'Applied'
+            promotions = [
+                (duplicate['status'], original['number'])
+                for duplicate, original in pairs
+                if original['status'] == 'Applied' and duplicate['status'] not in (None, 'Applied')
+            ]
+            touched = [duplicate['number'] for duplicate, _ in pairs] + [number for _, number in promotions]
+            where = f"number IN ({', '.join(['%s'] * len(touched))})"
+            add_to_rollups(cursor, where, touched, sign=-1)
+            if promotions:
+                cursor.executemany("UPDATE job_applications SET status = %s WHERE number = %s", promotions)
+            cursor.executemany(
+                "DELETE FROM job_applications WHERE number = %s",
+                [(duplicate['number'],) for duplicate, _ in pairs]
+            )
+            add_to_rollups(cursor, where, touched)
+            prune_rollups(cursor)
+        bump_version(cursor)
+        bump_version(cursor, APPLICATION_REWRITES)
+    connection.commit()
+    return len(pairs)
+
+def dedupe_new_rows(connection, ingest_batch, dates, mode=DEDUP_MODE):
+    """Check the applications a batch inserted against everything near their dates"""
+    dates = [_as_date(value) for value in dates if value]
+    if mode not in ('flag', 'merge') or not dates:
+        return 0
+    window = timedelta(days=DEDUP_WINDOW_DAYS)
+    rows = load_rows(connection, min(dates) - window, max(dates) + window)
+    new_numbers = {row['number'] for row in rows if row['ingest_batch'] == ingest_batch}
+    pairs = find_duplicates(rows, new_numbers=new_numbers)
+    for duplicate, original in pairs:
+        logger.debug("Likely duplicate: #%s %s - %s repeats #%s %s", duplicate['number'], duplicate['company_name'],
+                     duplicate['job_title'], original['number'], original['job_title'])
+    return apply_duplicates(connection, pairs, mode)
@@ -0,0 +1,35 @@
+import os
+import sys
+import pymysql
+from dotenv import load_dotenv
+from dedup import DEDUP_MODE, find_duplicates, load_rows, apply_duplicates
+
+load_dotenv()
+
+def dedupe_applications(mode=DEDUP_MODE, dry_run=False):
+    """Find likely duplicates across the whole history and flag or merge them"""
+    connection = pymysql.connect(
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME'),
+        cursorclass=pymysql.cursors.DictCursor
+    )
+    try:
+        rows = load_rows(connection)
+        pairs = find_duplicates(rows)
+        for duplicate, original in pairs:
+            print(f"#{duplicate['number']} {duplicate['company_name']} - {duplicate['job_title']} ({duplicate['application_date']}) "
+                  f"repeats #{original['number']} {original['job_title']} ({original['application_date']})")
+        if dry_run:
+            print(f"Dry run: {len(pairs)} likely duplicates among {len(rows)} applications")
+        else:
+            changed = apply_duplicates(connection, pairs, mode)
+            print(f"{'Merged' if mode == 'merge' else 'Flagged'} {changed} likely duplicates among {len(rows)} applications")
+    finally:
+        connection.close()
+        print("Duplicate detection complete.")
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    dedupe_applications(mode='merge' if '--merge' in args else 'flag', dry_run='--dry-run' in args)
@@ -0,0 +1,310 @@
+import logging
+import re
+from datetime import datetime
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# LinkedIn patterns
+LINKEDIN_COMPANY_RE = re.compile(r"Your application was sent to ([\w\s\-&().]+)")
+LINKEDIN_VIEWED_RE = re.compile(r"Your application was viewed by ([\w\s\-&().]+)")
+# 'Your application to Data Engineer at Acme', sent when the employer rejects or moves forward
+LINKEDIN_UPDATE_RE = re.compile(r"Your application to (.+?) at ([\w\s\-&().]+?)\s*$")
+# The first non-empty line after the 'Your application was sent to/viewed by ...' line is the job title
+LINKEDIN_TITLE_RE = re.compile(
+    r"your application was (?:sent to|viewed by)[^\r\n]*(?:\r\n|\r|\n)(?:[^\S\r\n]*(?:\r\n|\r|\n))*[^\S\r\n]*([^\r\n]*\S)",
+    re.IGNORECASE
+)
+LINKEDIN_APPLIED_ON_RE = re.compile(r'Applied on ([A-Za-z]+ \d{1,2}, \d{4})')
+
+# Domain of the address at the end of a From header, e.g. 'LinkedIn <jobs-noreply@linkedin.com>'
+SENDER_DOMAIN_RE = re.compile(r'@([A-Za-z0-9.-]+)>?\s*$')
+
+# JobsDB pattern: matches with or without 'Hi ...,' at the start
+JOBSDB_APPLICATION_RE = re.compile(
+    r'(?:Hi [\w\s,]+)?your application for ([\w\s\-/&().]+?) was successfully submitted to ([\w\s\-&().]+)',
+    re.IGNORECASE
+)
+
+# Recruiter emails from applicant tracking systems
+RECRUITER_SUBJECT_RE = re.compile(r'application|applying|candidacy|interview|your interest|next steps', re.IGNORECASE)
+# 'for the Data Engineer position', optionally followed by 'at Acme'
+RECRUITER_ROLE_RE = re.compile(
+    r"(?i:for|regarding)\s+(?i:the\s+|our\s+)?([A-Z][\w\s\-/&(),.]*?)\s+(?i:position|role|opening)"
+    r"(?:\s+(?i:at|with)\s+([A-Z][\w\s\-&().]*?))?(?=\s*[-|:!,.\r\n]|$)"
+)
+# 'Your application to Acme', 'Thank you for applying to Acme', 'your interest in Acme'
+RECRUITER_COMPANY_RE = re.compile(
+    r"(?i:application|applying|candidacy|interest)\s+(?i:to|with|at|in)\s+([A-Z][\w\s\-&().]*?)"
+    r"(?=\s*[-|:!,.\r\n]|\s+(?i:for|as)\b|$)"
+)
+# 'Acme Recruiting <no-reply@greenhouse.io>' -> 'Acme'
+SENDER_NAME_RE = re.compile(r'^\s*"?([^"<]+?)"?\s*<')
+SENDER_NAME_SUFFIX_RE = re.compile(
+    r'\s+(?:Recruiting|Recruitment|Careers|Talent(?: Acquisition)?(?: Team)?|Hiring(?: Team)?|HR|Jobs)$',
+    re.IGNORECASE
+)
+# Display names that are the tracking system or a mailbox, not the employer
+GENERIC_SENDER_NAMES = {
+    'greenhouse', 'lever', 'workday', 'smartrecruiters', 'ashby', 'workable', 'icims',
+    'no reply', 'noreply', 'no-reply', 'notifications'
+}
+
+# What a status email says happened; checked in this order, since rejections
+# and offers often mention the interviews that came before. Each pattern needs
+# a whole phrase: a word like 'unfortunately' also turns up in invitations.
+STATUS_PATTERNS = (
+    ('Offered', re.compile(r"pleased to (?:offer|extend)|offer letter|extend (?:you )?an offer", re.IGNORECASE)),
+    ('Rejected', re.compile(
+        r"regret to inform|not (?:to )?(?:move|moving) forward|decided (?:not to (?:proceed|progress)|to (?:pursue|proceed with|move forward with) other)"
+        r"|(?:will|won't|would|are) not be (?:moving|proceeding|progressing)|no longer (?:under consideration|being considered)"
+        r"|not been selected|position has been filled|unable to offer you",
+        re.IGNORECASE
+    )),
+    ('Interviewing', re.compile(
+        r"invit(?:e|ation)(?: you)? (?:to|for) (?:an? )?(?:\w+ )?interview|schedule (?:an? |your )?(?:\w+ )?(?:interview|call)"
+        r"|interview (?:invitation|request)|next round|like to (?:speak|talk|chat) with you",
+        re.IGNORECASE
+    )),
+)
+
+def new_job_info(platform, status='Applied'):
+    """Return an empty application record for a platform.
+
+    Status updates carry the new status and the email's date as status_date
+    instead of an application_date.
+    """
+    return {
+        'company_name': None,
+        'job_title': None,
+        'application_date': None,
+        'status': status,
+        'platform': platform,
+        'company_platform': 'NA'
+    }
+
+def any_of(criteria):
+    """OR together IMAP SEARCH keys; OR only takes two, so longer lists are nested"""
+    combined = criteria[-1]
+    for criterion in reversed(criteria[:-1]):
+        combined = f"OR {criterion} {combined}"
+    return combined
+
+def classify_status(text):
+    """Return the status a recruiter email announces, or None"""
+    for status, pattern in STATUS_PATTERNS:
+        if pattern.search(text):
+            return status
+    return None
+
+def format_email_date(email_date):
+    return email_date.strftime('%Y-%m-%d') if email_date else datetime.now().strftime('%Y-%m-%d')
+
+class Extractor:
+    """Base class for a job board whose confirmation emails we can parse.
+
+    Subclasses declare the sender domains they handle, the IMAP SEARCH keys that
+    find their emails, and implement extract() with module-level precompiled patterns.
+    """
+    name = None
+    platform = None
+    domains = ()
+    search_criteria = None
+
+    def accepts(self, subject):
+        """Client-side check run on the fetched subject before the body is downloaded"""
+        return True
+
+    def extract(self, email_body, email_subject, email_date, from_address):
+        """Return the list of job_info dicts found in one email"""
+        raise NotImplementedError
+
+class LinkedInExtractor(Extractor):
+    name = 'linkedin'
+    platform = 'LinkedIn'
+    domains = ('linkedin.com',)
+    search_criteria = (
+        '(FROM "jobs-noreply@linkedin.com" OR SUBJECT "your application was sent" '
+        'OR SUBJECT "your application was viewed" SUBJECT "your application to")'
+    )
+
+    def accepts(self, subject):
+        subject = subject.lower()
+        return ("your application was sent" in subject or "your application was viewed" in subject
+                or "your application to" in subject)
+
+    def extract(self, email_body, email_subject, email_date, from_address):
+        logger.debug("Processing email with subject: %s", email_subject)
+        logger.debug("From: %s", from_address)
+        if LINKEDIN_VIEWED_RE.search(email_subject):
+            return self.extract_viewed(email_body, email_subject, email_date)
+        update_match = LINKEDIN_UPDATE_RE.search(email_subject)
+        if update_match:
+            return self.extract_update(update_match, email_body, email_date)
+        job_info = new_job_info(self.platform)
+        # 1. Company name from subject or body
+        company_match = LINKEDIN_COMPANY_RE.search(email_subject) or LINKEDIN_COMPANY_RE.search(email_body)
+        if company_match:
+            job_info['company_name'] = company_match.group(1).strip()
+            logger.debug("Found company name: %s", job_info['company_name'])
+        # 2. Job title: first non-empty line after the line with 'Your application was sent to ...'
+        title_match = LINKEDIN_TITLE_RE.search(email_body)
+        if title_match:
+            job_info['job_title'] = title_match.group(1).strip()
+        else:
+            # Fallback: first non-empty line that is not company/location
+            company = job_info['company_name'].lower() if job_info['company_name'] else None
+            for line in email_body.splitlines():
+                line = line.strip()
+                if line and (not company or company not in line.lower()):
+                    job_info['job_title'] = line
+                    break
+        if job_info['job_title']:
+            logger.debug("Found job title: %s", job_info['job_title'])
+        # 3. Application date from body
+        app_date_match = LINKEDIN_APPLIED_ON_RE.search(email_body)
+        if app_date_match:
+            try:
+                parsed_date = datetime.strptime(app_date_match.group(1), "%B %d, %Y")
+                job_info['application_date'] = parsed_date.strftime('%Y-%m-%d')
+                logger.debug("Found application date: %s", job_info['application_date'])
+            except Exception as e:
+                logger.warning(f"Could not parse application date: {e}")
+        logger.debug("Application date: %s", job_info['application_date'])
+        if job_info['company_name'] and job_info['job_title']:
+            return [job_info]
+        return []
+
+    def extract_viewed(self, email_body, email_subject, email_date):
+        """'Your application was viewed by Acme', with the job title on the next line of the body"""
+        job_info = new_job_info(self.platform, 'Viewed')
+        job_info['status_date'] = format_email_date(email_date)
+        company_match = LINKEDIN_VIEWED_RE.search(email_subject)
+        job_info['company_name'] = company_match.group(1).strip()
+        title_match = LINKEDIN_TITLE_RE.search(email_body)
+        if title_match:
+            job_info['job_title'] = title_match.group(1).strip()
+        logger.debug("Application viewed: %s - %s", job_info['company_name'], job_info['job_title'])
+        return [job_info]
+
+    def extract_update(self, update_match, email_body, email_date):
+        """'Your application to Data Engineer at Acme': a rejection or an invitation to interview"""
+        status = classify_status(email_body)
+        if not status:
+            return []
+        job_info = new_job_info(self.platform, status)
+        job_info['status_date'] = format_email_date(email_date)
+        job_info['job_title'] = update_match.group(1).strip()
+        job_info['company_name'] = update_match.group(2).strip()
+        logger.debug("Application status %s: %s - %s", status, job_info['company_name'], job_info['job_title'])
+        return [job_info]
+
+class JobsdbExtractor(Extractor):
+    name = 'jobsdb'
+    platform = 'Jobsdb'
+    domains = ('jobsdb.com',)
+    search_criteria = '(FROM "noreply@jobsdb.com" SUBJECT "Your application was successfully submitted")'
+
+    def accepts(self, subject):
+        return "your application was successfully submitted" in subject.lower()
+
+    def extract(self, email_body, email_subject, email_date, from_address):
+        """Extract all job applications from a JobsDB email body (digests hold several)"""
+        logger.debug("Processing JobsDB email with subject: %s", email_subject)
+        logger.debug("From: %s", from_address)
+        applications = []
+        application_date = format_email_date(email_date)
+        for match in JOBSDB_APPLICATION_RE.finditer(email_body):
+            job_info = new_job_info(self.platform)
+            job_info['job_title'] = match.group(1).strip()
+            job_info['company_name'] = match.group(2).strip()
+            job_info['application_date'] = application_date
+            logger.debug("Found job title: %s, company name: %s", job_info['job_title'], job_info['company_name'])
+            applications.append(job_info)
+        return applications
+
+class RecruiterExtractor(Extractor):
+    """Rejections, interview invitations and offers sent through applicant tracking systems.
+
+    Only reports status updates: the company comes from the subject, the body
+    or the sender's display name, the job title from 'for the ... position'
+    when the email names it.
+    """
+    name = 'recruiter'
+    platform = 'Recruiter'
+    domains = (
+        'greenhouse.io', 'greenhouse-mail.io', 'lever.co', 'myworkday.com',
+        'smartrecruiters.com', 'ashbyhq.com', 'workablemail.com', 'icims.com'
+    )
+    search_criteria = '(' + any_of(['FROM "%s"' % domain for domain in domains]) + ')'
+
+    def accepts(self, subject):
+        return bool(RECRUITER_SUBJECT_RE.search(subject))
+
+    def extract(self, email_body, email_subject, email_date, from_address):
+        logger.debug("Processing recruiter email with subject: %s", email_subject)
+        logger.debug("From: %s", from_address)
+        status = classify_status(email_body)
+        if not status:
+            return []
+        job_info = new_job_info(self.platform, status)
+        job_info['status_date'] = format_email_date(email_date)
+        role_match = RECRUITER_ROLE_RE.search(email_subject) or RECRUITER_ROLE_RE.search(email_body)
+        if role_match:
+            job_info['job_title'] = role_match.group(1).strip()
+            job_info['company_name'] = role_match.group(2) and role_match.group(2).strip()
+        if not job_info['company_name']:
+            company_match = RECRUITER_COMPANY_RE.search(email_subject) or RECRUITER_COMPANY_RE.search(email_body)
+            if company_match:
+                job_info['company_name'] = company_match.group(1).strip()
+            else:
+                job_info['company_name'] = sender_company(from_address)
+        if not job_info['company_name']:
+            return []
+        logger.debug("Application status %s: %s - %s", status, job_info['company_name'], job_info['job_title'])
+        return [job_info]
+
+# Sender domain -> extractor, in registration order
+EXTRACTORS = {}
+
+def register(extractor):
+    """Add an extractor to the registry for each of its sender domains"""
+    for domain in extractor.domains:
+        EXTRACTORS[domain.lower()] = extractor
+    get_extractor.cache_clear()
+    return extractor
+
+def registered_extractors():
+    """Return each registered extractor once, in registration order"""
+    return list(dict.fromkeys(EXTRACTORS.values()))
+
+def sender_domain(from_address):
+    match = SENDER_DOMAIN_RE.search(from_address or '')
+    return match.group(1).lower() if match else ''
+
+def sender_company(from_address):
+    """Employer named in a From header like 'Acme Recruiting <no-reply@greenhouse.io>', or None"""
+    match = SENDER_NAME_RE.search(from_address or '')
+    if not match:
+        return None
+    name = SENDER_NAME_SUFFIX_RE.sub('', match.group(1).strip())
+    return None if name.lower() in GENERIC_SENDER_NAMES else name
+
+@lru_cache(maxsize=1024)
+def get_extractor(from_address):
+    """Find the extractor for a sender, also matching subdomains like mail.linkedin.com"""
+    domain = sender_domain(from_address)
+    while domain:
+        extractor = EXTRACTORS.get(domain)
+        if extractor:
+            return extractor
+        domain = domain.partition('.')[2]
+    return None
+
+def combined_search_criteria(extractors):
+    """OR together the search criteria of several extractors so one SEARCH covers them all"""
+    return any_of([extractor.search_criteria for extractor in extractors])
+
+LINKEDIN = register(LinkedInExtractor())
+JOBSDB = register(JobsdbExtractor())
+RECRUITER = register(RecruiterExtractor())
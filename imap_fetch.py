@@ -0,0 +1,261 @@
+import base64
+import email
+import email.utils
+import os
+import quopri
+import re
+from datetime import datetime
+from email.header import decode_header
+from dotenv import load_dotenv
+from ingest_metrics import METRICS
+
+load_dotenv()
+
+# Items requested for every candidate in the header pass
+HEADER_ITEM = 'BODY.PEEK[HEADER.FIELDS (SUBJECT DATE FROM)]'
+HEADER_KEY = 'BODY[HEADER.FIELDS (SUBJECT DATE FROM)]'
+
+# How many UIDs to put in a single body FETCH
+FETCH_CHUNK_SIZE = int(os.getenv('FETCH_CHUNK_SIZE', '200'))
+
+_TOKEN_RE = re.compile(rb'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|\{(\d+)\}|([^\s()"\[]+(?:\[[^\]]*\][^\s()"]*)?))')
+_MESSAGE_START_RE = re.compile(rb'^\d+ \(')
+
+def search_uids(mail, search_criteria, after_uid=0):
+    """Run a UID SEARCH and return the matching UIDs above after_uid as a list of bytes"""
+    with METRICS.stage('imap_search'):
+        _, data = mail.uid('SEARCH', None, search_criteria)
+    if not data or not data[0]:
+        return []
+    # 'UID n:*' always matches the newest message, even when its UID is below n
+    return [uid for uid in data[0].split() if int(uid) > after_uid]
+
+def compress_uids(uids):
+    """Turn a list of UIDs into a compact IMAP sequence set like '1:4,9'"""
+    numbers = sorted({int(uid) for uid in uids})
+    ranges = []
+    start = prev = None
+    for number in numbers:
+        if start is None:
+            start = prev = number
+        elif number == prev + 1:
+            prev = number
+        else:
+            ranges.append(f"{start}:{prev}" if start != prev else str(start))
+            start = prev = number
+    if start is not None:
+        ranges.append(f"{start}:{prev}" if start != prev else str(start))
+    return ','.join(ranges)
+
+def chunked(items, size):
+    """Yield successive lists of at most size items"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _tokenize(chunk, tokens):
+    """Append the IMAP tokens found in chunk to tokens, returning a trailing literal size if any"""
+    pos = 0
+    literal_size = None
+    while pos < len(chunk):
+        match = _TOKEN_RE.match(chunk, pos)
+        if not match or match.end() == pos:
+            break
+        pos = match.end()
+        open_paren, close_paren, quoted, literal, atom = match.groups()
+        if open_paren:
+            tokens.append('(')
+        elif close_paren:
+            tokens.append(')')
+        elif quoted is not None:
+            tokens.append(('str', re.sub(rb'\\(.)', rb'\1', quoted)))
+        elif literal is not None:
+            literal_size = int(literal)
+        elif atom is not None:
+            tokens.append(('atom', atom))
+    return literal_size
+
+def _build(tokens, index):
+    """Build a nested list from tokens starting at index, returning (value, next_index)"""
+    token = tokens[index]
+    if token == '(':
+        items = []
+        index += 1
+        while index < len(tokens) and tokens[index] != ')':
+            value, index = _build(tokens, index)
+            items.append(value)
+        return items, index + 1
+    kind, value = token
+    if kind == 'atom' and value.upper() == b'NIL':
+        return None, index + 1
+    return value, index + 1
+
+def _parse_message(pieces):
+    """Parse the pieces of one FETCH response into a dict of item name -> value"""
+    tokens = []
+    for piece in pieces:
+        if isinstance(piece, tuple):
+            _tokenize(piece[0], tokens)
+            tokens.append(('lit', piece[1]))
+        else:
+            _tokenize(piece, tokens)
+    # tokens: <seq> ( name value name value ... )
+    if len(tokens) < 2 or tokens[1] != '(':
+        return {}
+    values, _ = _build(tokens, 1)
+    items = {}
+    for i in range(0, len(values) - 1, 2):
+        name = values[i]
+        if isinstance(name, bytes):
+            items[name.decode('ascii', 'replace').upper()] = values[i + 1]
+    return items
+
+def parse_fetch_response(data):
+    """Group the raw list returned by imaplib's FETCH into one item dict per message"""
+    messages = []
+    pieces = []
+    for piece in data or []:
+        if piece is None:
+            continue
+        head = piece[0] if isinstance(piece, tuple) else piece
+        if _MESSAGE_START_RE.match(head) and pieces:
+            messages.append(_parse_message(pieces))
+            pieces = []
+        pieces.append(piece)
+    if pieces:
+        messages.append(_parse_message(pieces))
+    return [message for message in messages if message]
+
+def _as_text(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8', 'replace')
+    return value
+
+def find_text_part(structure, prefix=''):
+    """Find the first text/plain part in a BODYSTRUCTURE, returning (section, encoding, charset)"""
+    if not isinstance(structure, list) or not structure:
+        return None
+    if isinstance(structure[0], list):
+        # Multipart: children come first, followed by the subtype
+        part_number = 0
+        for child in structure:
+            if not isinstance(child, list):
+                break
+            part_number += 1
+            section = f"{prefix}.{part_number}" if prefix else str(part_number)
+            found = find_text_part(child, section)
+            if found:
+                return found
+        return None
+    main_type = (_as_text(structure[0]) or '').lower()
+    sub_type = (_as_text(structure[1]) or '').lower() if len(structure) > 1 else ''
+    if prefix and (main_type, sub_type) != ('text', 'plain'):
+        return None
+    charset = 'utf-8'
+    params = structure[2] if len(structure) > 2 and isinstance(structure[2], list) else []
+    for i in range(0, len(params) - 1, 2):
+        if (_as_text(params[i]) or '').lower() == 'charset' and params[i + 1]:
+            charset = _as_text(params[i + 1])
+    encoding = (_as_text(structure[5]) or '7bit').lower() if len(structure) > 5 else '7bit'
+    return prefix or '1', encoding, charset
+
+def decode_part(payload, encoding, charset):
+    """Undo the content transfer encoding of a fetched body part and decode it to text"""
+    if payload is None:
+        return ""
+    if encoding == 'base64':
+        payload = base64.b64decode(payload)
+    elif encoding == 'quoted-printable':
+        payload = quopri.decodestring(payload)
+    try:
+        return payload.decode(charset or 'utf-8', 'replace')
+    except LookupError:
+        return payload.decode('utf-8', 'replace')
+
+def decode_subject(raw_subject):
+    """Decode the first encoded word of a Subject header like the original processors did"""
+    if not raw_subject:
+        return ""
+    subject, charset = decode_header(raw_subject)[0]
+    if isinstance(subject, bytes):
+        subject = subject.decode(charset or 'utf-8', 'replace')
+    return subject
+
+def parse_email_date(raw_date):
+    """Parse a Date header into a local datetime, or None if it is missing"""
+    date_tuple = email.utils.parsedate_tz(raw_date) if raw_date else None
+    if not date_tuple:
+        return None
+    return datetime.fromtimestamp(email.utils.mktime_tz(date_tuple))
+
+def fetch_headers(mail, uids, cache=None):
+    """Fetch subject, date, sender and text part location for all uids in one FETCH.
+
+    With a cache, headers already stored there are not requested again.
+    """
+    if not uids:
+        return []
+    cached = cache.get_headers(uids) if cache else {}
+    missing = [uid for uid in uids if uid not in cached]
+    if not missing:
+        return sorted(cached.values(), key=lambda header: int(header['uid']))
+    with METRICS.stage('imap_fetch_headers', len(missing)):
+        _, data = mail.uid('FETCH', compress_uids(missing), f"(UID BODYSTRUCTURE {HEADER_ITEM})")
+        items = parse_fetch_response(data)
+    headers = []
+    for item in items:
+        if 'UID' not in item:
+            continue
+        header_message = email.message_from_bytes(item.get(HEADER_KEY) or b'')
+        text_part = find_text_part(item.get('BODYSTRUCTURE'))
+        section, encoding, charset = text_part if text_part else (None, None, None)
+        headers.append({
+            'uid': item['UID'],
+            'subject': decode_subject(header_message['subject']),
+            'from': header_message['from'] or '',
+            'date': parse_email_date(header_message['date']),
+            'section': section,
+            'encoding': encoding,
+            'charset': charset
+        })
+    if cache:
+        cache.put_headers(headers)
+    headers.extend(cached.values())
+    headers.sort(key=lambda header: int(header['uid']))
+    return headers
+
+def fetch_raw_parts(mail, headers, chunk_size=FETCH_CHUNK_SIZE, cache=None):
+    """Fetch the still-encoded text/plain part of each header in chunked multi-UID FETCHes.
+
+    Yields (header, payload) pairs in UID order, each chunk as soon as its
+    FETCH response is parsed, so only one chunk of parts is held at a time.
+    Messages without a text/plain part get a None payload without any extra
+    round-trip. With a cache, every fetched part is stored there as soon as
+    its chunk arrives.
+    """
+    for chunk in chunked(sorted(headers, key=lambda header: int(header['uid'])), chunk_size):
+        by_section = {}
+        for header in chunk:
+            if header['section'] is not None:
+                by_section.setdefault(header['section'], {})[header['uid']] = header
+        payloads = {}
+        # Messages nest their text part differently, and a FETCH asks for one section
+        for section, by_uid in by_section.items():
+            body_key = f"BODY[{section}]"
+            uid_set = ','.join(uid.decode() for uid in by_uid)
+            with METRICS.stage('imap_fetch_bodies', len(by_uid)):
+                _, data = mail.uid('FETCH', uid_set, f"(UID BODY.PEEK[{section}])")
+                fetched = [
+                    (item['UID'], item.get(body_key)) for item in parse_fetch_response(data)
+                    if item.get('UID') in by_uid
+                ]
+            METRICS.count('emails_fetched', len(fetched))
+            payloads.update(fetched)
+            if cache:
+                cache.put_payloads(fetched)
+        for header in chunk:
+            yield header, payloads.get(header['uid'])
+
+def fetch_bodies(mail, headers, chunk_size=FETCH_CHUNK_SIZE):
+    """Fetch and decode the text/plain part of each header, yielding (header, body) in UID order"""
+    for header, payload in fetch_raw_parts(mail, headers, chunk_size):
+        yield header, decode_part(payload, header['encoding'], header['charset'])
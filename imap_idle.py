@@ -0,0 +1,116 @@
+import imaplib
+import logging
+import os
+import select
+import time
+from dotenv import load_dotenv
+from ingest_metrics import METRICS
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Re-issue IDLE this often, in seconds; servers drop IDLE sessions silent for ~30 minutes
+IMAP_IDLE_TIMEOUT = float(os.getenv('IMAP_IDLE_TIMEOUT', '600'))
+# NOOP polling interval, in seconds, for servers without IDLE
+IMAP_POLL_INTERVAL = float(os.getenv('IMAP_POLL_INTERVAL', '60'))
+# Reconnect delays, in seconds, doubling after each failed attempt
+DAEMON_RETRY_MIN = float(os.getenv('DAEMON_RETRY_MIN', '5'))
+DAEMON_RETRY_MAX = float(os.getenv('DAEMON_RETRY_MAX', '300'))
+
+# imaplib only learned IDLE in Python 3.14; older versions refuse unknown commands
+imaplib.Commands.setdefault('IDLE', ('AUTH', 'SELECTED'))
+
+def supports_idle(mail):
+    return 'IDLE' in getattr(mail, 'capabilities', ()) and getattr(mail, 'sock', None) is not None
+
+def _readable(mail, timeout):
+    sock = mail.sock
+    # TLS may already hold decrypted bytes that select() cannot see
+    pending = getattr(sock, 'pending', None)
+    if pending and pending():
+        return True
+    return bool(select.select([sock], [], [], max(0.0, timeout))[0])
+
+def _idle_legacy(mail, timeout):
+    """IDLE (RFC 2177) through imaplib internals, for Python versions without IMAP4.idle()"""
+    tag = mail._command('IDLE')
+    # Wait for the '+ idling' continuation
+    while mail._get_response() is not None:
+        if mail.tagged_commands.get(tag):
+            raise mail.error(f"IDLE rejected: {mail.tagged_commands[tag]}")
+    deadline = time.monotonic() + timeout
+    while 'EXISTS' not in mail.untagged_responses:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not _readable(mail, remaining):
+            break
+        mail._get_response()
+    mail.send(b'DONE\r\n')
+    mail._command_complete('IDLE', tag)
+
+def new_mail_pending(mail):
+    """True when the server has announced messages (EXISTS) that no sync has searched for yet"""
+    return bool(mail.untagged_responses.get('EXISTS'))
+
+def forget_new_mail(mail):
+    """Drop pending EXISTS announcements; call just before a sync's search, which covers them"""
+    mail.response('EXISTS')
+
+def idle(mail, timeout=IMAP_IDLE_TIMEOUT):
+    """Wait in IDLE until the server announces new messages or timeout seconds pass.
+
+    Returns True when new mail arrived, straight away if it arrived during
+    the last sync.
+    """
+    if new_mail_pending(mail):
+        return True
+    with METRICS.stage('imap_idle'):
+        if hasattr(mail, 'idle'):
+            with mail.idle(duration=timeout) as idler:
+                for response_type, _ in idler:
+                    if response_type == 'EXISTS':
+                        return True
+            return new_mail_pending(mail)
+        _idle_legacy(mail, timeout)
+    return new_mail_pending(mail)
+
+def poll(mail, timeout=IMAP_IDLE_TIMEOUT, interval=IMAP_POLL_INTERVAL):
+    """Send NOOP every interval seconds until the server reports new messages or timeout passes"""
+    deadline = time.monotonic() + timeout
+    while True:
+        if new_mail_pending(mail):
+            return True
+        with METRICS.stage('imap_noop'):
+            mail.noop()
+        if new_mail_pending(mail):
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(interval, remaining))
+
+def wait_for_new_mail(mail, timeout=IMAP_IDLE_TIMEOUT):
+    """Block until new mail arrives in the selected folder, using IDLE when the server offers it.
+
+    EXISTS responses left over from the last sync count as new mail, so call
+    forget_new_mail() right before each sync's search. Returns False when
+    timeout passes without new mail; call again to keep waiting.
+    """
+    if supports_idle(mail):
+        return idle(mail, timeout)
+    return poll(mail, timeout)
+
+class Backoff:
+    """Exponential reconnect delay, reset after a successful sync"""
+
+    def __init__(self, minimum=DAEMON_RETRY_MIN, maximum=DAEMON_RETRY_MAX):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.delay = minimum
+
+    def reset(self):
+        self.delay = self.minimum
+
+    def sleep(self):
+        time.sleep(self.delay)
+        self.delay = min(self.delay * 2, self.maximum)
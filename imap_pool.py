@@ -0,0 +1,83 @@
+import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from dotenv import load_dotenv
+from imap_fetch import FETCH_CHUNK_SIZE, chunked, fetch_raw_parts
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Number of IMAP connections used for large fetches (1 keeps everything on the main connection)
+IMAP_POOL_SIZE = int(os.getenv('IMAP_POOL_SIZE', '1'))
+# Number of processes decoding and extracting fetched messages
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', str(os.cpu_count() or 1)))
+
+class ImapConnectionPool:
+    """A bounded set of authenticated IMAP connections, one per fetch thread"""
+
+    def __init__(self, connect, folder, cache=None):
+        self.connect = connect
+        self.folder = folder
+        self.cache = cache
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def get(self):
+        """Return this thread's connection, logging in on first use"""
+        mail = getattr(self.local, 'mail', None)
+        if mail is None:
+            mail = self.connect()
+            mail.select(self.folder, readonly=True)
+            self.local.mail = mail
+            with self.lock:
+                self.connections.append(mail)
+        return mail
+
+    def fetch_shard(self, shard):
+        """Fetch the raw text parts of one shard of headers on this thread's connection"""
+        return list(fetch_raw_parts(self.get(), shard, cache=self.cache))
+
+    def close(self):
+        for mail in self.connections:
+            try:
+                mail.close()
+                mail.logout()
+            except Exception as e:
+                logger.error(f"Error closing pooled IMAP connection: {str(e)}")
+        self.connections = []
+
+def parallel_fetch_and_parse(connect, folder, headers, parse_message, pool_size=IMAP_POOL_SIZE,
+                             parse_workers=PARSE_WORKERS, shard_size=FETCH_CHUNK_SIZE, cache=None):
+    """Fetch message parts over several IMAP connections and parse them on a process pool.
+
+    parse_message(header, payload) must be a module-level function so it can be
+    sent to worker processes. Yields (header, parse_message(header, payload)) in
+    the same UID order as a serial run, so the single DB writer sees identical input.
+    """
+    pool = ImapConnectionPool(connect, folder, cache)
+    shards = iter(chunked(headers, shard_size))
+    # spawn avoids forking while the fetch threads hold open sockets
+    context = multiprocessing.get_context('spawn')
+    try:
+        with ProcessPoolExecutor(max_workers=parse_workers, mp_context=context) as parsers, \
+                ThreadPoolExecutor(max_workers=pool_size) as fetchers:
+            # Keep a bounded window of shards in flight so memory stays flat on huge backfills
+            pending = deque(fetchers.submit(pool.fetch_shard, shard) for shard in islice(shards, pool_size * 2))
+            while pending:
+                fetched = pending.popleft().result()
+                next_shard = next(shards, None)
+                if next_shard is not None:
+                    pending.append(fetchers.submit(pool.fetch_shard, next_shard))
+                shard_headers = [header for header, _ in fetched]
+                payloads = [payload for _, payload in fetched]
+                chunksize = max(1, len(fetched) // parse_workers)
+                results = parsers.map(parse_message, shard_headers, payloads, chunksize=chunksize)
+                yield from zip(shard_headers, results)
+    finally:
+        pool.close()
@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# DEBUG shows per-email progress, INFO the per-batch and per-run summaries
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+# 'text' for human-readable lines, 'json' for one JSON object per line
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text').lower()
+# Optional run report outputs; leave unset to only log the summary
+METRICS_JSON_PATH = os.getenv('METRICS_JSON_PATH')
+# Written in the Prometheus text format, e.g. for node_exporter's textfile collector
+METRICS_PROMETHEUS_PATH = os.getenv('METRICS_PROMETHEUS_PATH')
+
+# Upper bounds, in seconds, of the stage duration histogram buckets
+HISTOGRAM_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+logger = logging.getLogger(__name__)
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+def configure_logging(level=LOG_LEVEL, log_format=LOG_FORMAT):
+    """Send log records to stderr at the configured level, as text or JSON lines"""
+    handler = logging.StreamHandler()
+    if log_format == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+
+class StageStats:
+    """Call count, item count and a duration histogram for one pipeline stage"""
+
+    def __init__(self):
+        self.calls = 0
+        self.items = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        # One count per bucket in HISTOGRAM_BUCKETS, plus +Inf
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+
+    def observe(self, seconds, items):
+        self.calls += 1
+        self.items += items
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        for index, bound in enumerate(HISTOGRAM_BUCKETS):
+            if seconds <= bound:
+                self.buckets[index] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def as_dict(self):
+        return {
+            'calls': self.calls,
+            'items': self.items,
+            'seconds': round(self.seconds, 6),
+            'max_seconds': round(self.max_seconds, 6)
+        }
+
+class RunMetrics:
+    """Timings and counters for one run of the email processor.
+
+    Stages ('imap_search', 'imap_fetch_bodies', 'extract', 'db_insert', ...)
+    are timed with stage(); plain totals ('emails_fetched', ...) with count().
+    Safe to use from the fetch pool's threads. Work done in the parse worker
+    processes is not recorded.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.stages = {}
+            self.counters = {}
+            self.started_at = time.time()
+            self.started = time.perf_counter()
+
+    def observe(self, stage, seconds, items=1):
+        with self.lock:
+            self.stages.setdefault(stage, StageStats()).observe(seconds, items)
+
+    @contextmanager
+    def stage(self, stage, items=1):
+        """Time the body of a with block as one call of stage covering items things"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, items)
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self):
+        """The run as a JSON-serializable dict"""
+        with self.lock:
+            return {
+                'started_at': datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(),
+                'seconds': round(time.perf_counter() - self.started, 6),
+                'stages': {name: stats.as_dict() for name, stats in self.stages.items()},
+                'counters': dict(self.counters)
+            }
+
+    def log_summary(self):
+        report = self.report()
+        logger.info(f"Run finished in {report['seconds']:.2f}s")
+        for name, stats in report['stages'].items():
+            logger.info(
+                f"  {name}: {stats['calls']} calls, {stats['items']} items, {stats['seconds']:.3f}s total, "
+                f"{stats['max_seconds']:.3f}s slowest"
+            )
+        if report['counters']:
+            logger.info("  " + ', '.join(f"{name}={value}" for name, value in sorted(report['counters'].items())))
+
+    def prometheus_text(self, prefix='jobapp_ingest'):
+        """Render the counters and stage histograms in the Prometheus text exposition format"""
+        report = self.report()
+        lines = [
+            f"# HELP {prefix}_run_seconds Wall-clock duration of the last run.",
+            f"# TYPE {prefix}_run_seconds gauge",
+            f"{prefix}_run_seconds {report['seconds']}",
+            f"# HELP {prefix}_last_run_timestamp_seconds When the last run started.",
+            f"# TYPE {prefix}_last_run_timestamp_seconds gauge",
+            f"{prefix}_last_run_timestamp_seconds {self.started_at:.3f}"
+        ]
+        for name, value in sorted(report['counters'].items()):
+            lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total {value}"]
+        lines += [
+            f"# HELP {prefix}_stage_seconds Time spent in each pipeline stage.",
+            f"# TYPE {prefix}_stage_seconds histogram"
+        ]
+        with self.lock:
+            stages = sorted(self.stages.items())
+        for name, stats in stages:
+            cumulative = 0
+            for bound, count in zip(HISTOGRAM_BUCKETS, stats.buckets):
+                cumulative += count
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {stats.calls}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stats.seconds:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stats.calls}')
+        lines += [f"# TYPE {prefix}_stage_items_total counter"]
+        lines += [f'{prefix}_stage_items_total{{stage="{name}"}} {stats.items}' for name, stats in stages]
+        return '\n'.join(lines) + '\n'
+
+    def write_reports(self, json_path=METRICS_JSON_PATH, prometheus_path=METRICS_PROMETHEUS_PATH):
+        """Write whichever run reports are configured, replacing each file atomically"""
+        if json_path:
+            _write_atomic(json_path, json.dumps(self.report(), indent=2))
+        if prometheus_path:
+            _write_atomic(prometheus_path, self.prometheus_text())
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+# Shared by every stage of the email processor
+METRICS = RunMetrics()
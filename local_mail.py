@@ -0,0 +1,111 @@
+import mmap
+import os
+import re
+from email import message_from_bytes
+from email.parser import BytesHeaderParser
+from imap_fetch import decode_subject, parse_email_date
+
+HEADER_END_RE = re.compile(rb'\r?\n\r?\n')
+_header_parser = BytesHeaderParser()
+
+def read_headers(key, raw_headers):
+    """Build the same header dict the IMAP fetch layer produces from a raw header block"""
+    headers = _header_parser.parsebytes(raw_headers)
+    return {
+        'uid': key,
+        'subject': decode_subject(headers['subject']),
+        'from': headers['from'] or '',
+        'date': parse_email_date(headers['date'])
+    }
+
+def message_body(raw_message):
+    """Return the decoded text/plain body of a full message, like the original IMAP processors did"""
+    email_message = message_from_bytes(raw_message)
+    if not email_message.is_multipart():
+        return _decode_payload(email_message)
+    for part in email_message.walk():
+        if part.get_content_type() == "text/plain":
+            return _decode_payload(part)
+    return ""
+
+def _decode_payload(part):
+    payload = part.get_payload(decode=True) or b''
+    try:
+        return payload.decode(part.get_content_charset() or 'utf-8', 'replace')
+    except LookupError:
+        return payload.decode('utf-8', 'replace')
+
+def _split_headers(buffer, start, end):
+    """Return the end offset of the header block of the message spanning buffer[start:end]"""
+    match = HEADER_END_RE.search(buffer, start, end)
+    return match.end() if match else end
+
+def iter_mbox(path):
+    """Stream the messages of an mbox file through mmap, one message in memory at a time.
+
+    Yields (header, read_message) pairs. Only the header block is copied out of
+    the map; read_message() copies the full message and must be called before
+    moving on to the next message.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            if mm[:5] == b'From ':
+                start = 0
+            else:
+                separator = mm.find(b'\nFrom ')
+                if separator == -1:
+                    return
+                start = separator + 1
+            index = 0
+            while start < size:
+                # Skip the 'From ' separator line itself
+                message_start = mm.find(b'\n', start) + 1 or size
+                separator = mm.find(b'\nFrom ', message_start)
+                message_end = separator + 1 if separator != -1 else size
+                header_end = _split_headers(mm, message_start, message_end)
+                index += 1
+                header = read_headers(str(index).encode(), mm[message_start:header_end])
+                yield header, lambda s=message_start, e=message_end: mm[s:e]
+                start = message_end
+
+def _iter_files(paths):
+    for index, path in enumerate(paths, 1):
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                continue
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                header_end = _split_headers(mm, 0, len(mm))
+                header = read_headers(str(index).encode(), mm[:header_end])
+                yield header, lambda mm=mm: mm[:]
+
+def iter_maildir(path):
+    """Stream the messages of a Maildir (cur/ and new/), in file name order"""
+    paths = []
+    for sub_dir in ('cur', 'new'):
+        directory = os.path.join(path, sub_dir)
+        if os.path.isdir(directory):
+            paths.extend(os.path.join(directory, name) for name in sorted(os.listdir(directory)))
+    yield from _iter_files(paths)
+
+def iter_eml_dir(path):
+    """Stream every .eml file below a directory, in path order"""
+    paths = []
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        paths.extend(os.path.join(root, name) for name in sorted(files) if name.lower().endswith('.eml'))
+    yield from _iter_files(paths)
+
+def iter_local_messages(path):
+    """Stream messages from an mbox file, a single .eml file, a Maildir or a directory of .eml files"""
+    if os.path.isdir(path):
+        if os.path.isdir(os.path.join(path, 'cur')) or os.path.isdir(os.path.join(path, 'new')):
+            return iter_maildir(path)
+        return iter_eml_dir(path)
+    if not os.path.exists(path):
+        raise ValueError(f"Mail export not found: {path}")
+    if path.lower().endswith('.eml'):
+        return _iter_files([path])
+    return iter_mbox(path)
@@ -0,0 +1,202 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Local cache of fetched emails; leave MESSAGE_CACHE_PATH unset to disable it
+MESSAGE_CACHE_PATH = os.getenv('MESSAGE_CACHE_PATH')
+MESSAGE_CACHE_MAX_MB = int(os.getenv('MESSAGE_CACHE_MAX_MB', '512'))
+
+# SQLite's default limit on bound parameters is 999 on older builds
+_QUERY_CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    folder TEXT NOT NULL,
+    uidvalidity INTEGER NOT NULL,
+    uid INTEGER NOT NULL,
+    subject TEXT,
+    sender TEXT,
+    sent_at TEXT,
+    section TEXT,
+    encoding TEXT,
+    charset TEXT,
+    has_body INTEGER NOT NULL DEFAULT 0,
+    body BLOB,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (folder, uidvalidity, uid)
+);
+CREATE INDEX IF NOT EXISTS idx_messages_last_used ON messages (last_used);
+"""
+
+class MessageCache:
+    """On-disk cache of fetched headers and zlib-compressed text parts, keyed by (folder, UIDVALIDITY, UID).
+
+    The total stored size is capped; the least recently used messages are evicted first.
+    Safe to share between the fetch pool's threads.
+    """
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        self.total_bytes = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM messages").fetchone()[0]
+        self._evict()
+
+    def mailbox(self, folder, uidvalidity):
+        """Return a view of the cache for one folder at one UIDVALIDITY"""
+        return MailboxCache(self, folder, uidvalidity)
+
+    def _select(self, columns, folder, uidvalidity, uids, extra=''):
+        rows = []
+        for i in range(0, len(uids), _QUERY_CHUNK):
+            chunk = [int(uid) for uid in uids[i:i + _QUERY_CHUNK]]
+            placeholders = ','.join('?' * len(chunk))
+            rows.extend(self.db.execute(
+                f"SELECT {columns} FROM messages WHERE folder = ? AND uidvalidity = ? AND uid IN ({placeholders}){extra}",
+                [folder, uidvalidity] + chunk
+            ).fetchall())
+        return rows
+
+    def _touch(self, folder, uidvalidity, uids):
+        now = time.time()
+        self.db.executemany(
+            "UPDATE messages SET last_used = ? WHERE folder = ? AND uidvalidity = ? AND uid = ?",
+            [(now, folder, uidvalidity, int(uid)) for uid in uids]
+        )
+
+    def get_headers(self, folder, uidvalidity, uids):
+        with self.lock:
+            rows = self._select("uid, subject, sender, sent_at, section, encoding, charset", folder, uidvalidity, uids)
+            self._touch(folder, uidvalidity, [row[0] for row in rows])
+            self.db.commit()
+        return {str(row[0]).encode(): _row_to_header(row) for row in rows}
+
+    def put_headers(self, folder, uidvalidity, headers):
+        now = time.time()
+        rows = []
+        for header in headers:
+            size = len(header['subject']) + len(header['from']) + 64
+            rows.append((
+                folder, uidvalidity, int(header['uid']), header['subject'], header['from'],
+                header['date'].isoformat() if header['date'] else None,
+                header['section'], header['encoding'], header['charset'], size, now
+            ))
+        with self.lock:
+            for row in rows:
+                cursor = self.db.execute(
+                    "INSERT OR IGNORE INTO messages "
+                    "(folder, uidvalidity, uid, subject, sender, sent_at, section, encoding, charset, size, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    row
+                )
+                if cursor.rowcount:
+                    self.total_bytes += row[9]
+            self.db.commit()
+            self._evict()
+
+    def get_payloads(self, folder, uidvalidity, uids):
+        with self.lock:
+            rows = self._select("uid, body", folder, uidvalidity, uids, " AND has_body = 1")
+            self._touch(folder, uidvalidity, [row[0] for row in rows])
+            self.db.commit()
+        return {str(uid).encode(): zlib.decompress(body) if body is not None else None for uid, body in rows}
+
+    def put_payloads(self, folder, uidvalidity, payloads):
+        """Store the raw text part of each (uid, payload) pair, compressed"""
+        now = time.time()
+        with self.lock:
+            for uid, payload in payloads:
+                body = zlib.compress(payload) if payload is not None else None
+                size = len(body) if body else 0
+                cursor = self.db.execute(
+                    "UPDATE messages SET has_body = 1, body = ?, size = size + ?, last_used = ? "
+                    "WHERE folder = ? AND uidvalidity = ? AND uid = ? AND has_body = 0",
+                    (body, size, now, folder, uidvalidity, int(uid))
+                )
+                if cursor.rowcount:
+                    self.total_bytes += size
+            self.db.commit()
+            self._evict()
+
+    def iter_messages(self):
+        """Yield (folder, header, payload) for every cached message whose text part was fetched, in UID order"""
+        cursor = self.db.execute(
+            "SELECT uid, subject, sender, sent_at, section, encoding, charset, body, folder FROM messages "
+            "WHERE has_body = 1 ORDER BY folder, uidvalidity, uid"
+        )
+        for row in cursor:
+            payload = zlib.decompress(row[7]) if row[7] is not None else None
+            yield row[8], _row_to_header(row[:7]), payload
+
+    def _evict(self):
+        """Drop least recently used messages until the cache is under its size cap"""
+        while self.total_bytes > self.max_bytes:
+            rows = self.db.execute(
+                "SELECT folder, uidvalidity, uid, size FROM messages ORDER BY last_used LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                self.total_bytes = 0
+                break
+            evicted = []
+            for folder, uidvalidity, uid, size in rows:
+                evicted.append((folder, uidvalidity, uid))
+                self.total_bytes -= size
+                if self.total_bytes <= self.max_bytes:
+                    break
+            self.db.executemany("DELETE FROM messages WHERE folder = ? AND uidvalidity = ? AND uid = ?", evicted)
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+class MailboxCache:
+    """The part of a MessageCache belonging to one folder at one UIDVALIDITY"""
+
+    def __init__(self, cache, folder, uidvalidity):
+        self.cache = cache
+        self.folder = folder
+        self.uidvalidity = uidvalidity
+
+    def get_headers(self, uids):
+        return self.cache.get_headers(self.folder, self.uidvalidity, uids)
+
+    def put_headers(self, headers):
+        self.cache.put_headers(self.folder, self.uidvalidity, headers)
+
+    def get_payloads(self, uids):
+        return self.cache.get_payloads(self.folder, self.uidvalidity, uids)
+
+    def put_payloads(self, payloads):
+        self.cache.put_payloads(self.folder, self.uidvalidity, payloads)
+
+def _row_to_header(row):
+    uid, subject, sender, sent_at, section, encoding, charset = row
+    return {
+        'uid': str(uid).encode(),
+        'subject': subject or '',
+        'from': sender or '',
+        'date': datetime.fromisoformat(sent_at) if sent_at else None,
+        'section': section,
+        'encoding': encoding,
+        'charset': charset
+    }
+
+def open_message_cache(path=MESSAGE_CACHE_PATH, max_mb=MESSAGE_CACHE_MAX_MB):
+    """Open the message cache, or return None when caching is disabled"""
+    if not path:
+        return None
+    logger.info(f"Using message cache {path} (max {max_mb} MB)")
+    return MessageCache(path, max_mb * 1024 * 1024)
@@ -0,0 +1,46 @@
+import os
+import pymysql
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+def split_statements(sql):
+    """Split a migration file into statements, dropping comment-only lines"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+def migrate():
+    connection = pymysql.connect(
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME'),
+        cursorclass=pymysql.cursors.DictCursor
+    )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                name VARCHAR(255) PRIMARY KEY,
+                applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+            """)
+            cursor.execute("SELECT name FROM schema_migrations")
+            applied = {row['name'] for row in cursor.fetchall()}
+            pending = sorted(name for name in os.listdir(MIGRATIONS_DIR) if name.endswith('.sql') and name not in applied)
+            for name in pending:
+                print(f"Applying migration {name}...")
+                with open(os.path.join(MIGRATIONS_DIR, name), 'r', encoding='utf-8') as f:
+                    for statement in split_statements(f.read()):
+                        cursor.execute(statement)
+                cursor.execute("INSERT INTO schema_migrations (name) VALUES (%s)", (name,))
+                connection.commit()
+            print(f"Applied {len(pending)} migrations")
+    finally:
+        connection.close()
+        print("Migrations complete.")
+
+if __name__ == '__main__':
+    migrate()
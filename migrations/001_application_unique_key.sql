@@ -0,0 +1,16 @@
+-- Let the database assign application numbers and reject exact duplicates,
+-- so batched inserts no longer need a MAX(number) lookup or a per-row
+-- duplicate SELECT.
+
+-- Drop exact duplicates that may have been entered by hand, keeping the oldest row
+DELETE newer FROM job_applications newer
+JOIN job_applications older
+  ON newer.company_name = older.company_name
+ AND newer.job_title = older.job_title
+ AND newer.application_date = older.application_date
+ AND newer.number > older.number;
+
+ALTER TABLE job_applications MODIFY number INT NOT NULL AUTO_INCREMENT;
+
+ALTER TABLE job_applications
+  ADD UNIQUE KEY uq_job_applications_company_title_date (company_name, job_title, application_date);
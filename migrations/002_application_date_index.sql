@@ -0,0 +1,4 @@
+-- Serve the dashboard's ORDER BY application_date DESC, number DESC listing
+-- and its keyset page seeks from an index instead of a filesort.
+ALTER TABLE job_applications
+  ADD INDEX idx_job_applications_date_number (application_date, number);
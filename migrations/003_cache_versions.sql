@@ -0,0 +1,8 @@
+-- Version counters that writers bump after changing job_applications, so the
+-- dashboard can keep derived data (filter facets, ...) cached until it changes.
+CREATE TABLE IF NOT EXISTS cache_versions (
+  name VARCHAR(64) PRIMARY KEY,
+  version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT IGNORE INTO cache_versions (name, version) VALUES ('job_applications', 0);
@@ -0,0 +1,8 @@
+-- Alias table for the normalization rules: each alias (matched ignoring case,
+-- whitespace and legal-form suffixes) is rewritten to its canonical name.
+CREATE TABLE IF NOT EXISTS name_aliases (
+  kind VARCHAR(32) NOT NULL,
+  alias VARCHAR(255) NOT NULL,
+  canonical VARCHAR(255) NOT NULL,
+  PRIMARY KEY (kind, alias)
+);
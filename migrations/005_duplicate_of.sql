@@ -0,0 +1,4 @@
+-- Likely duplicates found by fuzzy matching point at the application they repeat.
+ALTER TABLE job_applications
+  ADD COLUMN duplicate_of INT NULL,
+  ADD INDEX idx_job_applications_duplicate_of (duplicate_of);
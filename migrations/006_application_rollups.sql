@@ -0,0 +1,19 @@
+-- Daily application counts per (platform, status, company) for the stats
+-- page. The email processor and the cleanup scripts keep it up to date;
+-- python rebuild_rollups.py recomputes it from scratch.
+CREATE TABLE IF NOT EXISTS application_rollups (
+  day DATE NOT NULL,
+  platform VARCHAR(255) NOT NULL DEFAULT '',
+  status VARCHAR(64) NOT NULL DEFAULT '',
+  company_name VARCHAR(255) NOT NULL DEFAULT '',
+  applications INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, platform, status, company_name)
+);
+
+DELETE FROM application_rollups;
+
+INSERT INTO application_rollups (day, platform, status, company_name, applications)
+SELECT application_date, COALESCE(platform, ''), COALESCE(status, ''), COALESCE(company_name, ''), COUNT(*)
+FROM job_applications
+WHERE application_date IS NOT NULL
+GROUP BY application_date, COALESCE(platform, ''), COALESCE(status, ''), COALESCE(company_name, '');
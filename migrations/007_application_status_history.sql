@@ -0,0 +1,12 @@
+-- Status changes picked up from 'application viewed', rejection and
+-- interview emails, one row per transition.
+CREATE TABLE IF NOT EXISTS application_status_history (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  application_number INT NOT NULL,
+  old_status VARCHAR(64) NULL,
+  new_status VARCHAR(64) NOT NULL,
+  changed_on DATE NULL,
+  source VARCHAR(255) NULL,
+  recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  INDEX idx_status_history_application (application_number)
+);
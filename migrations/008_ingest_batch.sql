@@ -0,0 +1,6 @@
+-- Each batch the email processor inserts tags its new rows with a random
+-- token, so follow-up work (duplicate checks, rollups) can select exactly
+-- those rows. Existing rows and rows that already existed stay NULL.
+ALTER TABLE job_applications
+  ADD COLUMN ingest_batch CHAR(32) NULL,
+  ADD INDEX idx_job_applications_ingest_batch (ingest_batch);
@@ -0,0 +1,29 @@
+-- Application counts per status and per company for the stats page's funnel
+-- and top companies, so neither sums the daily application_rollups table.
+-- Kept up to date alongside application_rollups by every writer.
+CREATE TABLE IF NOT EXISTS application_status_rollups (
+  status VARCHAR(64) NOT NULL PRIMARY KEY,
+  applications INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS application_company_rollups (
+  company_name VARCHAR(255) NOT NULL PRIMARY KEY,
+  applications INT NOT NULL DEFAULT 0,
+  KEY idx_company_rollups_applications (applications)
+);
+
+DELETE FROM application_status_rollups;
+
+INSERT INTO application_status_rollups (status, applications)
+SELECT COALESCE(status, ''), COUNT(*)
+FROM job_applications
+WHERE application_date IS NOT NULL
+GROUP BY COALESCE(status, '');
+
+DELETE FROM application_company_rollups;
+
+INSERT INTO application_company_rollups (company_name, applications)
+SELECT COALESCE(company_name, ''), COUNT(*)
+FROM job_applications
+WHERE application_date IS NOT NULL
+GROUP BY COALESCE(company_name, '');
@@ -0,0 +1,127 @@
+import re
+
+# Legal-form suffixes stripped from the end of company names. Each entry is a
+# sequence of words; dots, commas and case are ignored when matching, so
+# 'Co Ltd' also strips 'Co., Ltd.' and 'CO. LTD'.
+COMPANY_SUFFIXES = [
+    'Co Ltd',
+    'Company Limited',
+    'Pte Ltd',
+    'Pty Ltd',
+    'Sdn Bhd',
+    'Limited',
+    'Ltd',
+    'Incorporated',
+    'Inc',
+    'LLC',
+    'LLP',
+    'Corporation',
+    'Corp',
+    'PLC',
+    'GmbH'
+]
+
+# Misspelled platform values, matched anywhere in the name, and the platform they mean
+PLATFORM_PATTERNS = [
+    (r'job', 'Jobsdb'),
+    (r'link|linedin|lineked', 'LinkedIn')
+]
+
+WHITESPACE_RE = re.compile(r'\s+')
+# Separators and stray punctuation left at the end once a suffix is removed
+TRAILING_PUNCTUATION = ' ,;:-.'
+
+def suffix_pattern(suffixes):
+    """Compile suffix word sequences into one regex anchored at the end of a name"""
+    alternatives = []
+    # Longest first, so 'Co Ltd' wins over 'Ltd'
+    for suffix in sorted(suffixes, key=len, reverse=True):
+        words = [re.escape(word) + r'\.?' for word in suffix.split()]
+        alternatives.append(r'[\s,]*'.join(words))
+    return re.compile(r'[\s,]+(?:' + '|'.join(alternatives) + r')[\s.,]*$', re.IGNORECASE)
+
+def fold(name):
+    """Case- and whitespace-insensitive comparison key"""
+    return WHITESPACE_RE.sub(' ', name).strip().casefold()
+
+class NameNormalizer:
+    """Rewrites free-text names into one canonical spelling using declarative rules.
+
+    Rules run in order: whitespace is collapsed, legal-form suffixes are
+    stripped until none is left (the name is left alone if nothing would
+    remain), and the result is looked up case-insensitively in the alias
+    table, then matched against the (regex, canonical) patterns. Other names
+    take the most common spelling seen through learn(), so 'ACME' and 'Acme'
+    end up the same. Dots inside a name ('Booking.com') are kept. Normalizing
+    a normalized name gives it back unchanged.
+    """
+
+    def __init__(self, suffixes=(), aliases=None, patterns=()):
+        self.suffix_re = suffix_pattern(suffixes) if suffixes else None
+        self.patterns = [(re.compile(pattern, re.IGNORECASE), canonical) for pattern, canonical in patterns]
+        self.aliases = {}
+        for alias, canonical in (aliases or {}).items():
+            self.add_alias(alias, canonical)
+        # folded key -> {spelling: count}
+        self.spellings = {}
+
+    def add_alias(self, alias, canonical):
+        self.aliases[fold(self.clean(alias))] = canonical
+        # A canonical name normalizes to itself, even one that keeps a suffix
+        self.aliases.setdefault(fold(self.clean(canonical)), canonical)
+
+    def clean(self, name):
+        name = WHITESPACE_RE.sub(' ', name or '').strip()
+        if self.suffix_re:
+            # One suffix comes off per pass ('Foo Inc Ltd' -> 'Foo Inc'), so repeat
+            # until nothing changes; cleaning a cleaned name must be a no-op
+            while True:
+                stripped = self.suffix_re.sub('', name).rstrip(TRAILING_PUNCTUATION)
+                if not stripped or stripped == name:
+                    break
+                name = stripped
+        return name
+
+    def key(self, name):
+        return fold(self.clean(name))
+
+    def learn(self, name, count=1):
+        """Record a spelling seen in the data, to pick the preferred one among case variants"""
+        cleaned = self.clean(name)
+        if not cleaned:
+            return
+        counts = self.spellings.setdefault(fold(cleaned), {})
+        counts[cleaned] = counts.get(cleaned, 0) + count
+
+    def normalize(self, name):
+        cleaned = self.clean(name)
+        key = fold(cleaned)
+        if key in self.aliases:
+            return self.aliases[key]
+        for pattern, canonical in self.patterns:
+            if pattern.search(cleaned):
+                return canonical
+        counts = self.spellings.get(key)
+        if counts:
+            # Most common spelling; ties go to the one with more capitals, then to a fixed order
+            return max(counts, key=lambda spelling: (counts[spelling], sum(c.isupper() for c in spelling), spelling))
+        return cleaned
+
+def load_aliases(connection, kind):
+    """Read {alias: canonical} for one kind of name ('company', 'platform') from the name_aliases table"""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT alias, canonical FROM name_aliases WHERE kind = %s", (kind,))
+        rows = cursor.fetchall()
+    aliases = {}
+    for row in rows:
+        if isinstance(row, dict):
+            aliases[row['alias']] = row['canonical']
+        else:
+            aliases[row[0]] = row[1]
+    return aliases
+
+def company_normalizer(aliases=None):
+    return NameNormalizer(COMPANY_SUFFIXES, aliases)
+
+def platform_normalizer(aliases=None):
+    return NameNormalizer(aliases=aliases, patterns=PLATFORM_PATTERNS)
@@ -1,36 +1,98 @@
 import os
+import sys
 import pymysql
 from dotenv import load_dotenv
+from cache_versions import bump_version, APPLICATION_REWRITES
+from normalization import company_normalizer, load_aliases
+from rollups import add_to_rollups, prune_rollups
 
 load_dotenv()
 
-def normalize_company_names():
-    connection = pymysql.connect(
+# Rows read from the server-side cursor, and updated in one statement, per chunk
+NORMALIZE_CHUNK_SIZE = int(os.getenv('NORMALIZE_CHUNK_SIZE', '1000'))
+
+def connect(cursorclass=pymysql.cursors.DictCursor):
+    return pymysql.connect(
         host=os.getenv('DB_HOST'),
         user=os.getenv('DB_USER'),
         password=os.getenv('DB_PASSWORD'),
         database=os.getenv('DB_NAME'),
-        cursorclass=pymysql.cursors.DictCursor
+        cursorclass=cursorclass
     )
+
+def stream_rows(connection, query, chunk_size):
+    """Yield chunks of rows from an unbuffered server-side cursor"""
+    with connection.cursor(pymysql.cursors.SSCursor) as cursor:
+        cursor.execute(query)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+
+def apply_changes(connection, changes):
+    """Rename a chunk of rows with one CASE update and commit it, returning how many rows changed.
+
+    UPDATE IGNORE skips rows whose new name would duplicate an existing
+    (company_name, job_title, application_date); they keep their old name.
+    """
+    cases = ' '.join(['WHEN %s THEN %s'] * len(changes))
+    placeholders = ', '.join(['%s'] * len(changes))
+    params = [value for number, _, new_name in changes for value in (number, new_name)]
+    numbers = [number for number, _, _ in changes]
+    params.extend(numbers)
+    with connection.cursor() as cursor:
+        # Move the chunk's rows to their new company in the rollups, in the same transaction
+        add_to_rollups(cursor, f"number IN ({placeholders})", numbers, sign=-1)
+        cursor.execute(
+            f"UPDATE IGNORE job_applications SET company_name = CASE number {cases} END WHERE number IN ({placeholders})",
+            params
+        )
+        updated = cursor.rowcount
+        add_to_rollups(cursor, f"number IN ({placeholders})", numbers)
+        if updated:
+            prune_rollups(cursor)
+            bump_version(cursor)
+            bump_version(cursor, APPLICATION_REWRITES)
+    connection.commit()
+    return updated
+
+def normalize_company_names(dry_run=False, chunk_size=NORMALIZE_CHUNK_SIZE):
+    # The unbuffered read needs its own connection, since updates can't be sent while it streams
+    reader = connect()
+    writer = connect()
     try:
-        with connection.cursor() as cursor:
-            # Select all company names with a full stop
-            cursor.execute("SELECT number, company_name FROM job_applications WHERE company_name LIKE '%.%'")
-            rows = cursor.fetchall()
-            updated = 0
-            for row in rows:
-                number = row['number']
-                company_name = row['company_name']
-                new_name = company_name.split('.', 1)[0].strip()
-                if new_name != company_name:
-                    update_sql = "UPDATE job_applications SET company_name = %s WHERE number = %s"
-                    cursor.execute(update_sql, (new_name, number))
-                    updated += 1
-            connection.commit()
-            print(f"Normalized {updated} company names (truncated at first full stop)")
+        normalizer = company_normalizer(load_aliases(writer, 'company'))
+        # First pass: learn which spelling of each name is most common
+        for rows in stream_rows(reader, "SELECT company_name FROM job_applications", chunk_size):
+            for (company_name,) in rows:
+                normalizer.learn(company_name)
+        changed = 0
+        updated = 0
+        for rows in stream_rows(reader, "SELECT number, company_name FROM job_applications ORDER BY number", chunk_size):
+            changes = []
+            for number, company_name in rows:
+                new_name = normalizer.normalize(company_name)
+                if company_name and new_name != company_name:
+                    changes.append((number, company_name, new_name))
+            if not changes:
+                continue
+            changed += len(changes)
+            if dry_run:
+                for number, company_name, new_name in changes:
+                    print(f"#{number}: {company_name!r} -> {new_name!r}")
+                continue
+            updated += apply_changes(writer, changes)
+        if dry_run:
+            print(f"Dry run: {changed} company names would be normalized")
+        else:
+            print(f"Normalized {updated} company names")
+            if changed > updated:
+                print(f"Skipped {changed - updated} rows that would duplicate an existing application")
     finally:
-        connection.close()
+        reader.close()
+        writer.close()
         print("Company name normalization complete.")
 
 if __name__ == '__main__':
-    normalize_company_names() 
\ No newline at end of file
+    normalize_company_names(dry_run='--dry-run' in sys.argv[1:])
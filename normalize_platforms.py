@@ -1,10 +1,14 @@
 import os
 import pymysql
 from dotenv import load_dotenv
+from cache_versions import bump_version, APPLICATION_REWRITES
+from normalization import platform_normalizer, load_aliases
+from rollups import add_to_rollups, prune_rollups
 
 load_dotenv()
 
 def normalize_platforms():
+    """Rewrite platform values stored before canonicalization was applied at ingest"""
     connection = pymysql.connect(
         host=os.getenv('DB_HOST'),
         user=os.getenv('DB_USER'),
@@ -13,29 +17,35 @@ def normalize_platforms():
         cursorclass=pymysql.cursors.DictCursor
     )
     try:
+        normalizer = platform_normalizer(load_aliases(connection, 'platform'))
         with connection.cursor() as cursor:
-            # Normalize Jobsdb
-            jobsdb_sql = """
-            UPDATE job_applications
-            SET platform = 'Jobsdb'
-            WHERE LOWER(platform) LIKE '%job%';
-            """
-            cursor.execute(jobsdb_sql)
-            print(f"Updated Jobsdb platforms: {cursor.rowcount}")
-            # Normalize LinkedIn and common misspellings
-            linkedin_sql = """
-            UPDATE job_applications
-            SET platform = 'LinkedIn'
-            WHERE LOWER(platform) LIKE '%link%' 
-               OR LOWER(platform) LIKE '%linedin%'
-               OR LOWER(platform) LIKE '%lineked%';
-            """
-            cursor.execute(linkedin_sql)
-            print(f"Updated LinkedIn platforms: {cursor.rowcount}")
+            # Only a handful of distinct values, so rewrite per value rather than per row
+            cursor.execute("SELECT DISTINCT platform FROM job_applications WHERE platform IS NOT NULL")
+            changes = []
+            for row in cursor.fetchall():
+                canonical = normalizer.normalize(row['platform'])
+                if canonical != row['platform']:
+                    changes.append((canonical, row['platform']))
+            updated = 0
+            if changes:
+                # Old and canonical values together select the same rows before and after the rewrite
+                platforms = sorted({value for change in changes for value in change})
+                where = f"platform IN ({', '.join(['%s'] * len(platforms))})"
+                add_to_rollups(cursor, where, platforms, sign=-1)
+                cursor.executemany("UPDATE job_applications SET platform = %s WHERE platform = %s", changes)
+                updated = cursor.rowcount
+                add_to_rollups(cursor, where, platforms)
+                prune_rollups(cursor)
+            for canonical, platform in changes:
+                print(f"{platform!r} -> {canonical!r}")
+            if updated:
+                bump_version(cursor)
+                bump_version(cursor, APPLICATION_REWRITES)
             connection.commit()
+            print(f"Updated platforms: {updated}")
     finally:
         connection.close()
         print("Platform normalization complete.")
 
 if __name__ == '__main__':
-    normalize_platforms() 
\ No newline at end of file
+    normalize_platforms()
@@ -1,15 +1,31 @@
+import heapq
 import imaplib
-import email
-from email.header import decode_header
+import logging
 import pymysql
 from datetime import datetime, timedelta
-import re
 import os
+import signal
+import sys
 from dotenv import load_dotenv
+from extractors import get_extractor, registered_extractors, combined_search_criteria
+from imap_fetch import FETCH_CHUNK_SIZE, search_uids, fetch_headers, fetch_raw_parts, decode_part
+from message_cache import open_message_cache
+from local_mail import iter_local_messages, message_body
+from imap_pool import IMAP_POOL_SIZE, parallel_fetch_and_parse
+from db_writer import ApplicationBatchWriter
+from status_updates import StatusUpdateWriter, is_status_update
+from canonical import load_canonical_names
+from sync_state import load_state, save_state, get_uidvalidity, get_uidnext, get_checkpoint, set_checkpoint
+from ingest_metrics import METRICS, configure_logging
+from imap_idle import Backoff, forget_new_mail, wait_for_new_mail
 
 # Load environment variables
 load_dotenv()
 
+IMAP_FOLDER = os.getenv("IMAP_FOLDER", "inbox")
+
+logger = logging.getLogger(__name__)
+
 def connect_to_email():
     """Connect to Gmail using credentials from environment variables"""
     email_address = os.getenv('EMAIL_ADDRESS')
@@ -18,10 +34,11 @@ def connect_to_email():
     if not email_address or not password:
         raise ValueError("Email credentials not found in .env file")
     
-    print(f"Connecting to Gmail as {email_address}...")
-    mail = imaplib.IMAP4_SSL("imap.gmail.com")
-    mail.login(email_address, password)
-    print("Successfully connected to Gmail")
+    logger.info(f"Connecting to Gmail as {email_address}...")
+    with METRICS.stage('imap_login'):
+        mail = imaplib.IMAP4_SSL("imap.gmail.com")
+        mail.login(email_address, password)
+    logger.info("Successfully connected to Gmail")
     return mail
 
 def connect_to_database():
@@ -34,343 +51,320 @@ def connect_to_database():
     if not all([db_host, db_name, db_user, db_pass]):
         raise ValueError("Database credentials not found in .env file")
 
-    print(f"Connecting to database {db_name} on {db_host}...")
+    logger.info(f"Connecting to database {db_name} on {db_host}...")
     connection = pymysql.connect(
         host=db_host,
         user=db_user,
         password=db_pass,
         database=db_name
     )
-    print("Successfully connected to database")
+    logger.info("Successfully connected to database")
+    # Canonical company/platform names are applied to every row this run stores
+    load_canonical_names(connection)
     return connection
 
-def extract_job_info(email_body, email_subject, email_date, from_address):
-    """Extract job information from email body and subject (LinkedIn/JobDB)"""
-    print(f"\nProcessing email with subject: {email_subject}")
-    print(f"From: {from_address}")
-    
-    job_info = {
-        'company_name': None,
-        'job_title': None,
-        'application_date': None,
-        'status': 'Applied',
-        'platform': None,  # Will be set below
-        'company_platform': 'NA'
-    }
-    
-    # Determine the platform
-    if 'linkedin' in from_address.lower():
-        job_info['platform'] = 'LinkedIn'
-        # 1. Company name from subject or body
-        company_match = re.search(r"Your application was sent to ([\w\s\-&().]+)", email_subject)
-        if not company_match:
-            company_match = re.search(r"Your application was sent to ([\w\s\-&().]+)", email_body)
-        if company_match:
-            job_info['company_name'] = company_match.group(1).strip()
-            print(f"Found company name: {job_info['company_name']}")
-        # 2. Job title: first non-empty line after the line with 'Your application was sent to ...'
-        lines = email_body.splitlines()
-        job_title = None
-        found_sent_to = False
-        for i, line in enumerate(lines):
-            if 'your application was sent to' in line.lower():
-                found_sent_to = True
-                # Look for the next non-empty line
-                for next_line in lines[i+1:]:
-                    next_line = next_line.strip()
-                    if next_line:
-                        job_title = next_line
-                        break
-                break
-        if not job_title:
-            # Fallback: first non-empty line that is not company/location
-            for line in lines:
-                line = line.strip()
-                if line and (not job_info['company_name'] or job_info['company_name'].lower() not in line.lower()):
-                    job_title = line
-                    break
-        if job_title:
-            job_info['job_title'] = job_title
-            print(f"Found job title: {job_info['job_title']}")
-        # 3. Application date from body
-        app_date_match = re.search(r'Applied on ([A-Za-z]+ \d{1,2}, \d{4})', email_body)
-        if app_date_match:
-            try:
-                parsed_date = datetime.strptime(app_date_match.group(1), "%B %d, %Y")
-                job_info['application_date'] = parsed_date.strftime('%Y-%m-%d')
-                print(f"Found application date: {job_info['application_date']}")
-            except Exception as e:
-                print(f"Could not parse application date: {e}")
-        # 4. Status from subject
-        if 'sent to' in email_subject.lower():
-            job_info['status'] = 'Applied'
-    else:
-        job_info['platform'] = 'Jobsdb'
-        # Extract job title from subject: 'your application for (.+?) was successfully'
-        job_title_match = re.search(r'your application for ([\w\s\-/&().]+?) was successfully', email_subject, re.IGNORECASE)
-        if job_title_match:
-            job_info['job_title'] = job_title_match.group(1).strip()
-            print(f"Found job title in subject: {job_info['job_title']}")
-        # Try to extract company name from body (common in JobsDB emails)
-        company_match = re.search(r'company[:\s]*([\w\s\-&().]+)', email_body, re.IGNORECASE)
-        if company_match:
-            job_info['company_name'] = company_match.group(1).strip()
-            print(f"Found company name in body: {job_info['company_name']}")
-        # Fallback: try to extract company name from subject if present
-        if not job_info['company_name']:
-            company_match = re.search(r'at ([\w\s\-&().]+)', email_subject, re.IGNORECASE)
-            if company_match:
-                job_info['company_name'] = company_match.group(1).strip()
-                print(f"Found company name in subject: {job_info['company_name']}")
-        if email_date:
-            job_info['application_date'] = email_date.strftime('%Y-%m-%d')
-        else:
-            job_info['application_date'] = datetime.now().strftime('%Y-%m-%d')
-    print(f"Application date: {job_info['application_date']}")
-    return job_info
+def parse_message(header, payload):
+    """Decode a fetched message part and run it through the extractor registered for its sender"""
+    logger.debug("Processing email %s", header['uid'].decode())
+    extractor = get_extractor(header['from'])
+    if extractor is None:
+        logger.warning(f"No extractor registered for sender: {header['from']}")
+        return []
+    with METRICS.stage('decode'):
+        body = decode_part(payload, header['encoding'], header['charset'])
+    with METRICS.stage('extract'):
+        return extractor.extract(body, header['subject'], header['date'], header['from'])
 
-def get_next_number(connection):
-    """Get the next number for the job_applications table."""
-    cursor = connection.cursor()
-    try:
-        cursor.execute("SELECT MAX(number) FROM job_applications")
-        result = cursor.fetchone()
-        max_number = result[0] if result and result[0] is not None else 0
-        return max_number + 1
-    finally:
-        cursor.close()
+def fetch_and_parse(mail, headers, cache=None):
+    """Yield (header, applications) in UID order, spreading large fetches over an IMAP pool.
 
-def update_database(connection, job_info, next_number):
-    """Update the database with job information, using the provided next_number."""
-    cursor = connection.cursor()
-    # Check if this job application already exists
-    check_sql = """
-    SELECT 1 FROM job_applications 
-    WHERE company_name = %s AND job_title = %s AND application_date = %s
+    Messages already in the cache are parsed from disk; only the rest are fetched.
     """
-    try:
-        print(f"\nChecking if job application exists for company: '{job_info['company_name']}', job title: '{job_info['job_title']}', date: {job_info['application_date']}...")
-        cursor.execute(check_sql, (
-            job_info['company_name'],
-            job_info['job_title'],
-            job_info['application_date']
-        ))
-        if cursor.fetchone() is None:
-            # Insert new job application with the next number
-            insert_sql = """
-            INSERT INTO job_applications 
-            (number, company_name, job_title, application_date, status, platform, company_platform) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """
-            cursor.execute(insert_sql, (
-                next_number,
-                job_info['company_name'],
-                job_info['job_title'],
-                job_info['application_date'],
-                job_info['status'],
-                job_info['platform'],
-                job_info['company_platform']
-            ))
-            connection.commit()
-            print(f"Successfully added job application for {job_info['company_name']} with number {next_number}")
-            return True  # Inserted
-        else:
-            print(f"Duplicate found: Skipping entry for company: '{job_info['company_name']}', job title: '{job_info['job_title']}', date: {job_info['application_date']} (already exists in DB)")
-            return False  # Not inserted
-    except Exception as e:
-        print(f"Error updating database: {str(e)}")
-        connection.rollback()
+    cached = cache.get_payloads([header['uid'] for header in headers]) if cache else {}
+    missing = [header for header in headers if header['uid'] not in cached]
+    if cached:
+        logger.info(f"Found {len(cached)} emails in the message cache, fetching {len(missing)} from the server")
+    if IMAP_POOL_SIZE > 1 and len(missing) > FETCH_CHUNK_SIZE:
+        logger.info(f"Fetching {len(missing)} emails over {IMAP_POOL_SIZE} IMAP connections")
+        fetched = parallel_fetch_and_parse(connect_to_email, IMAP_FOLDER, missing, parse_message, cache=cache)
+    else:
+        fetched = ((header, parse_message(header, payload)) for header, payload in fetch_raw_parts(mail, missing, cache=cache))
+    from_cache = ((header, parse_message(header, cached[header['uid']])) for header in headers if header['uid'] in cached)
+    yield from heapq.merge(from_cache, fetched, key=lambda item: int(item[0]['uid']))
+
+def is_target_date(header, target_date):
+    """Check whether a fetched header was sent on the target date (always true without one)"""
+    if target_date is None:
+        return True
+    email_date = header['date']
+    if not email_date:
+        logger.debug("No email date found for email %s", header['uid'].decode())
         return False
-    finally:
-        cursor.close()
+    if email_date.date() != target_date.date():
+        logger.debug("Skipping email from %s (not from target date)", email_date.date())
+        return False
+    return True
 
-def process_linkedin_emails(mail, db_connection, target_date, search_date, before_date, next_number):
-    print(f"\nSearching for LinkedIn job application emails from {search_date}...")
-    search_criteria = f'(FROM "jobs-noreply@linkedin.com" SINCE "{search_date}" BEFORE "{before_date}" SUBJECT "your application was sent")'
-    print(f"Search criteria: {search_criteria}")
-    _, messages = mail.search(None, search_criteria)
-    added_count = 0
-    if not messages[0]:
-        print(f"No LinkedIn job application emails found from {search_date}")
-        return next_number, added_count
-    linkedin_emails = messages[0].split()
-    print(f"\nFound {len(linkedin_emails)} LinkedIn job application emails")
-    linkedin_applications = []
-    for message_num in linkedin_emails:
-        _, msg_data = mail.fetch(message_num, "(RFC822)")
-        email_body = msg_data[0][1]
-        email_message = email.message_from_bytes(email_body)
-        subject = decode_header(email_message["subject"])[0][0]
-        if isinstance(subject, bytes):
-            subject = subject.decode()
-        from_address = email_message["from"]
-        # Check if this is a job application email
-        if "your application was sent" in subject.lower():
-            linkedin_applications.append(message_num)
-    print(f"\nFound {len(linkedin_applications)} LinkedIn job application emails with the correct subject pattern")
-    if not linkedin_applications:
-        print("No matching LinkedIn job application emails to process")
-        return next_number, added_count
-    for message_num in linkedin_applications:
-        print(f"\nProcessing email {message_num.decode()}")
-        _, msg_data = mail.fetch(message_num, "(RFC822)")
-        email_body = msg_data[0][1]
-        email_message = email.message_from_bytes(email_body)
-        # Get email date
-        date_tuple = email.utils.parsedate_tz(email_message['Date'])
-        if date_tuple:
-            email_date = datetime.fromtimestamp(email.utils.mktime_tz(date_tuple))
-            print(f"Email date: {email_date.strftime('%Y-%m-%d')}")
-        else:
-            email_date = None
-            print("No email date found")
-        # Skip if email is not from target date
-        if not email_date or email_date.date() != target_date.date():
-            print(f"Skipping email from {email_date.strftime('%Y-%m-%d')} (not from target date)")
-            continue
-        # Get email subject and from address
-        subject = decode_header(email_message["subject"])[0][0]
-        if isinstance(subject, bytes):
-            subject = subject.decode()
-        from_address = email_message["from"]
-        # Get email body
-        body = ""
-        if email_message.is_multipart():
-            for part in email_message.walk():
-                if part.get_content_type() == "text/plain":
-                    body = part.get_payload(decode=True).decode()
-                    break
-        else:
-            body = email_message.get_payload(decode=True).decode()
-        # Extract job information
-        job_info = extract_job_info(body, subject, email_date, from_address)
-        # Update database if we have the required information
-        if job_info['company_name'] and job_info['job_title']:
-            inserted = update_database(db_connection, job_info, next_number)
-            if inserted:
-                next_number += 1
-                added_count += 1
-        else:
-            print(f"Could not extract job information from email: {subject}")
-    print(f"\nTotal new LinkedIn job applications added: {added_count}")
-    return next_number, added_count
+def process_sources(mail, db_connection, extractors, search_filter, target_date, after_uid=0, cache=None):
+    """Find, fetch and store the emails of several job boards with a single mailbox search.
 
-def extract_jobsdb_applications(email_body, email_subject, email_date, from_address):
-    """Extract all job applications from a JobsDB email body."""
-    print(f"\nProcessing JobsDB email with subject: {email_subject}")
-    print(f"From: {from_address}")
-    applications = []
-    # Flexible regex: matches with or without 'Hi ...,' at the start
-    pattern = re.compile(
-        r'(?:Hi [\w\s,]+)?your application for ([\w\s\-/&().]+?) was successfully submitted to ([\w\s\-&().]+)',
-        re.IGNORECASE
-    )
-    for match in pattern.finditer(email_body):
-        job_title = match.group(1).strip()
-        company_name = match.group(2).strip()
-        print(f"Found job title: {job_title}, company name: {company_name}")
-        application_date = email_date.strftime('%Y-%m-%d') if email_date else datetime.now().strftime('%Y-%m-%d')
-        applications.append({
-            'company_name': company_name,
-            'job_title': job_title,
-            'application_date': application_date,
-            'status': 'Applied',
-            'platform': 'Jobsdb',
-            'company_platform': 'NA'
-        })
-    return applications
+    Returns ({source name: added count}, last UID seen by the search).
+    """
+    platforms = ', '.join(extractor.platform for extractor in extractors)
+    logger.info(f"Searching for {platforms} job application emails matching {search_filter}...")
+    search_criteria = f'({search_filter} {combined_search_criteria(extractors)})'
+    logger.debug("Search criteria: %s", search_criteria)
+    uids = search_uids(mail, search_criteria, after_uid)
+    added_counts = {extractor.name: 0 for extractor in extractors}
+    last_uid = max((int(uid) for uid in uids), default=after_uid)
+    if not uids:
+        logger.info(f"No {platforms} job application emails found matching {search_filter}")
+        return added_counts, last_uid
+    logger.info(f"Found {len(uids)} {platforms} job application emails")
+    # One FETCH for the headers of every hit, then dispatch and filter on the client
+    application_emails = []
+    for header in fetch_headers(mail, uids, cache):
+        extractor = get_extractor(header['from'])
+        if extractor in extractors and extractor.accepts(header['subject']) and is_target_date(header, target_date):
+            application_emails.append(header)
+    METRICS.count('emails_skipped', len(uids) - len(application_emails))
+    logger.info(f"Found {len(application_emails)} job application emails with the correct subject pattern")
+    if not application_emails:
+        logger.info("No matching job application emails to process")
+        return added_counts, last_uid
+    added_counts = store_applications(db_connection, extractors, fetch_and_parse(mail, application_emails, cache))
+    return added_counts, last_uid
 
-def process_jobsdb_emails(mail, db_connection, target_date, search_date, before_date, next_number):
-    print(f"\nSearching for JobsDB job application emails from {search_date}...")
-    jobsdb_search_criteria = f'(FROM "noreply@jobsdb.com" SINCE "{search_date}" BEFORE "{before_date}" SUBJECT "Your application was successfully submitted")'
-    print(f"Search criteria: {jobsdb_search_criteria}")
-    _, jobsdb_messages = mail.search(None, jobsdb_search_criteria)
-    jobsdb_added_count = 0
-    if not jobsdb_messages[0]:
-        print(f"No JobsDB job application emails found from {search_date}")
-        return next_number, jobsdb_added_count
-    jobsdb_emails = jobsdb_messages[0].split()
-    print(f"\nFound {len(jobsdb_emails)} JobsDB job application emails")
-    for message_num in jobsdb_emails:
-        print(f"\nProcessing JobsDB email {message_num.decode()}")
-        _, msg_data = mail.fetch(message_num, "(RFC822)")
-        email_body = msg_data[0][1]
-        email_message = email.message_from_bytes(email_body)
-        # Get email date
-        date_tuple = email.utils.parsedate_tz(email_message['Date'])
-        if date_tuple:
-            email_date = datetime.fromtimestamp(email.utils.mktime_tz(date_tuple))
-            print(f"Email date: {email_date.strftime('%Y-%m-%d')}")
-        else:
-            email_date = None
-            print("No email date found")
-        # Skip if email is not from target date
-        if not email_date or email_date.date() != target_date.date():
-            print(f"Skipping email from {email_date.strftime('%Y-%m-%d')} (not from target date)")
-            continue
-        # Get email subject and from address
-        subject = decode_header(email_message["subject"])[0][0]
-        if isinstance(subject, bytes):
-            subject = subject.decode()
-        from_address = email_message["from"]
-        # Get email body
-        body = ""
-        if email_message.is_multipart():
-            for part in email_message.walk():
-                if part.get_content_type() == "text/plain":
-                    body = part.get_payload(decode=True).decode()
-                    break
-        else:
-            body = email_message.get_payload(decode=True).decode()
-        # Extract all job applications from this email
-        applications = extract_jobsdb_applications(body, subject, email_date, from_address)
+def store_applications(db_connection, extractors, parsed_emails):
+    """Send (header, applications) pairs to one batch writer per source and return the added counts.
+
+    Status updates go to a single StatusUpdateWriter, flushed after the
+    application writers so they can match applications from the same run.
+    """
+    writers = {extractor.name: ApplicationBatchWriter(db_connection) for extractor in extractors}
+    status_writer = StatusUpdateWriter(db_connection)
+    for header, applications in parsed_emails:
+        writer = writers[get_extractor(header['from']).name]
+        METRICS.count('emails_parsed')
+        METRICS.count('applications_extracted', len(applications))
         for job_info in applications:
-            inserted = update_database(db_connection, job_info, next_number)
-            if inserted:
-                next_number += 1
-                jobsdb_added_count += 1
+            if is_status_update(job_info):
+                status_writer.add(job_info)
+            else:
+                writer.add(job_info)
         if not applications:
-            print(f"Could not extract job information from email: {subject}")
-    print(f"\nTotal new JobsDB job applications added: {jobsdb_added_count}")
-    return next_number, jobsdb_added_count
+            METRICS.count('emails_without_applications')
+            logger.debug("Could not extract job information from email: %s", header['subject'])
+        if status_writer.is_full():
+            for application_writer in writers.values():
+                application_writer.flush()
+            status_writer.flush()
+    added_counts = {}
+    for extractor in extractors:
+        writer = writers[extractor.name]
+        writer.flush()
+        added_counts[extractor.name] = writer.inserted_count
+        logger.info(f"Total new {extractor.platform} job applications added: {writer.inserted_count}")
+    status_writer.flush()
+    if status_writer.updated_count or status_writer.unmatched_count:
+        logger.info(f"Applications with a new status: {status_writer.updated_count}, "
+                    f"status emails without a matching application: {status_writer.unmatched_count}")
+    return added_counts
+
+def process_target_date(mail, db_connection, cache=None):
+    """Process the single day named by TARGET_DATE"""
+    # Set the target date for processing and searching from .env
+    target_date_str = os.getenv("TARGET_DATE")
+    if not target_date_str:
+        raise ValueError("TARGET_DATE not set in .env file")
+    search_date = target_date_str
+    # Calculate the next day for BEFORE clause
+    target_date = datetime.strptime(search_date, "%d-%b-%Y")
+    before_date = (target_date + timedelta(days=1)).strftime("%d-%b-%Y")
+    search_filter = f'SINCE "{search_date}" BEFORE "{before_date}"'
+    added_counts, _ = process_sources(mail, db_connection, registered_extractors(), search_filter, target_date, cache=cache)
+    return added_counts
+
+def process_incremental(mail, db_connection, folder, uidvalidity, cache=None):
+    """Process only mail that arrived since the last run, using per-source UID checkpoints.
+
+    A search's checkpoint is saved only after every batch it produced has committed.
+    """
+    state = load_state()
+    uidnext = get_uidnext(mail)
+    # Sources sharing a checkpoint (the usual case) are covered by one search
+    by_checkpoint = {}
+    for extractor in registered_extractors():
+        after_uid = get_checkpoint(state, folder, extractor.name, uidvalidity)
+        by_checkpoint.setdefault(after_uid, []).append(extractor)
+    added_counts = {}
+    for after_uid, extractors in sorted(by_checkpoint.items()):
+        logger.info(f"Syncing emails after UID {after_uid}")
+        # A failed write raises out of process_sources before the checkpoint
+        # moves, so the next run retries the same mail
+        counts, last_uid = process_sources(mail, db_connection, extractors, f"UID {after_uid + 1}:*", None, after_uid, cache)
+        added_counts.update(counts)
+        # Everything below UIDNEXT was visible to the search, matching or not
+        if uidnext:
+            last_uid = max(last_uid, uidnext - 1)
+        for extractor in extractors:
+            set_checkpoint(state, folder, extractor.name, uidvalidity, last_uid)
+        save_state(state)
+    return added_counts
+
+def parse_local_messages(path, extractors):
+    """Yield (header, applications) for the job application emails in a local mail export"""
+    for header, read_message in iter_local_messages(path):
+        extractor = get_extractor(header['from'])
+        if extractor not in extractors or not extractor.accepts(header['subject']):
+            continue
+        logger.debug("Processing email %s", header['uid'].decode())
+        with METRICS.stage('decode'):
+            body = message_body(read_message())
+        with METRICS.stage('extract'):
+            applications = extractor.extract(body, header['subject'], header['date'], header['from'])
+        yield header, applications
+
+def process_local_mail(db_connection, path):
+    """Re-run extraction over an mbox, Maildir or .eml directory without any network calls"""
+    logger.info(f"Reading job application emails from {path}...")
+    extractors = registered_extractors()
+    return store_applications(db_connection, extractors, parse_local_messages(path, extractors))
+
+def parse_cached_messages(cache, extractors):
+    """Yield (header, applications) for every job application email in the message cache"""
+    for folder, header, payload in cache.iter_messages():
+        extractor = get_extractor(header['from'])
+        if extractor in extractors and extractor.accepts(header['subject']):
+            yield header, parse_message(header, payload)
+
+def process_cached_mail(db_connection, cache):
+    """Re-run extraction over every cached email at disk speed, without connecting to the server"""
+    logger.info("Reading job application emails from the message cache...")
+    extractors = registered_extractors()
+    return store_applications(db_connection, extractors, parse_cached_messages(cache, extractors))
+
+def process_daemon(message_cache=None):
+    """Keep one IMAP session open and sync new mail as soon as the server reports it.
+
+    Each wake-up fetches only the UIDs above the incremental checkpoints.
+    Dropped IMAP or database connections are re-established with exponential
+    backoff, and a sync that fails for any other reason is retried the same way.
+    """
+    # Let 'kill' stop the daemon through the same cleanup as Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    backoff = Backoff()
+    while True:
+        mail = db_connection = None
+        try:
+            mail = connect_to_email()
+            mail.select(IMAP_FOLDER)
+            uidvalidity = get_uidvalidity(mail)
+            cache = message_cache.mailbox(IMAP_FOLDER, uidvalidity) if message_cache else None
+            db_connection = connect_to_database()
+            while True:
+                METRICS.reset()
+                # The search below sees everything announced so far; anything
+                # announced after this point (even mid-sync) wakes the next wait
+                forget_new_mail(mail)
+                print_totals(process_incremental(mail, db_connection, IMAP_FOLDER, uidvalidity, cache))
+                METRICS.log_summary()
+                METRICS.write_reports()
+                backoff.reset()
+                logger.info(f"Waiting for new mail in {IMAP_FOLDER}...")
+                while not wait_for_new_mail(mail):
+                    pass
+                # The connection may have sat idle past the server's wait_timeout
+                db_connection.ping(reconnect=True)
+        except (imaplib.IMAP4.abort, OSError, pymysql.err.OperationalError, pymysql.err.InterfaceError) as e:
+            logger.warning(f"Connection lost ({str(e)}), reconnecting in {backoff.delay:.0f}s")
+        except Exception as e:
+            # The checkpoints only move after a sync's writes commit, so the retry sees the same mail
+            logger.exception(f"Sync failed ({str(e)}), retrying in {backoff.delay:.0f}s")
+            METRICS.count('sync_errors')
+            METRICS.write_reports()
+        finally:
+            close_quietly(mail, db_connection)
+        backoff.sleep()
+
+def close_quietly(mail, db_connection):
+    """Release a session that may already be broken"""
+    if mail is not None:
+        try:
+            mail.logout()
+        except Exception:
+            pass
+    if db_connection is not None:
+        try:
+            db_connection.close()
+        except Exception:
+            pass
+
+def print_totals(added_counts):
+    totals = ', '.join(f"{extractor.platform}: {added_counts.get(extractor.name, 0)}" for extractor in registered_extractors())
+    logger.info(f"Processing completed. Total new {totals}")
 
 def process_emails():
     """Main function to process emails and update database"""
+    METRICS.reset()
     try:
+        sync_mode = os.getenv("SYNC_MODE", "date").lower()
+        if sync_mode == "offline":
+            export_path = os.getenv("MAIL_EXPORT_PATH")
+            if not export_path:
+                raise ValueError("MAIL_EXPORT_PATH not set in .env file")
+            db_connection = connect_to_database()
+            added_counts = process_local_mail(db_connection, export_path)
+            db_connection.close()
+            print_totals(added_counts)
+            return
+
+        message_cache = open_message_cache()
+        if sync_mode == "daemon":
+            process_daemon(message_cache)
+            return
+
+        if sync_mode == "cache":
+            if message_cache is None:
+                raise ValueError("MESSAGE_CACHE_PATH not set in .env file")
+            db_connection = connect_to_database()
+            added_counts = process_cached_mail(db_connection, message_cache)
+            db_connection.close()
+            message_cache.close()
+            print_totals(added_counts)
+            return
+
         # Connect to email
         mail = connect_to_email()
-        mail.select("inbox")
-        print("\nSearching for job application emails...")
-        
-        # Set the target date for processing and searching from .env
-        target_date_str = os.getenv("TARGET_DATE")
-        if not target_date_str:
-            raise ValueError("TARGET_DATE not set in .env file")
-        search_date = target_date_str
-        # Calculate the next day for BEFORE clause
-        dt = datetime.strptime(search_date, "%d-%b-%Y")
-        before_date = (dt + timedelta(days=1)).strftime("%d-%b-%Y")
-        print(f"\nSearching for LinkedIn job application emails from {search_date}...")
-        target_date = dt
+        mail.select(IMAP_FOLDER)
+        uidvalidity = get_uidvalidity(mail)
+        cache = message_cache.mailbox(IMAP_FOLDER, uidvalidity) if message_cache else None
+        logger.info("Searching for job application emails...")
         
         db_connection = connect_to_database()
-        next_number = get_next_number(db_connection)
-        print(f"Starting new entries from number {next_number}")
         
-        # Process LinkedIn emails
-        next_number, linkedin_added_count = process_linkedin_emails(mail, db_connection, target_date, search_date, before_date, next_number)
-        # Process JobsDB emails
-        next_number, jobsdb_added_count = process_jobsdb_emails(mail, db_connection, target_date, search_date, before_date, next_number)
+        if sync_mode == "incremental":
+            added_counts = process_incremental(mail, db_connection, IMAP_FOLDER, uidvalidity, cache)
+        elif sync_mode == "date":
+            added_counts = process_target_date(mail, db_connection, cache)
+        else:
+            raise ValueError(f"Unknown SYNC_MODE '{sync_mode}', expected 'date', 'incremental', 'offline', 'cache' or 'daemon'")
         
         # Now close and logout
         mail.close()
         mail.logout()
         db_connection.close()
-        print(f"\nProcessing completed. Total new LinkedIn: {linkedin_added_count}, JobsDB: {jobsdb_added_count}")
+        if message_cache:
+            message_cache.close()
+        print_totals(added_counts)
         
     except Exception as e:
-        print(f"Error: {str(e)}")
+        logger.exception(f"Error: {str(e)}")
+    finally:
+        METRICS.log_summary()
+        METRICS.write_reports()
 
 if __name__ == "__main__":
-    print("Starting job application email processor...")
+    configure_logging()
+    logger.info("Starting job application email processor...")
     process_emails() 
\ No newline at end of file
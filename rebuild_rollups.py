@@ -0,0 +1,28 @@
+import os
+import pymysql
+from dotenv import load_dotenv
+from rollups import rebuild_rollups
+
+load_dotenv()
+
+def rebuild():
+    """Recompute the stats rollups from job_applications, e.g. after editing rows by hand"""
+    connection = pymysql.connect(
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME'),
+        cursorclass=pymysql.cursors.DictCursor
+    )
+    try:
+        rebuild_rollups(connection)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) AS groups_count, COALESCE(SUM(applications), 0) AS applications FROM application_rollups")
+            row = cursor.fetchone()
+        print(f"Rebuilt {row['groups_count']} rollup rows covering {row['applications']} applications")
+    finally:
+        connection.close()
+        print("Rollup rebuild complete.")
+
+if __name__ == '__main__':
+    rebuild()
@@ -0,0 +1,119 @@
+from datetime import date, timedelta
+from cache_versions import bump_version
+
+# Daily application counts per (platform, status, company), kept in step with
+# job_applications by every writer so the stats page never scans the big table.
+# Applications without a date are left out.
+ROLLUP_SQL = """
+INSERT INTO application_rollups (day, platform, status, company_name, applications)
+SELECT application_date, COALESCE(platform, ''), COALESCE(status, ''), COALESCE(company_name, ''), %s * COUNT(*)
+FROM job_applications
+WHERE application_date IS NOT NULL AND ({where})
+GROUP BY application_date, COALESCE(platform, ''), COALESCE(status, ''), COALESCE(company_name, '')
+ON DUPLICATE KEY UPDATE applications = applications + VALUES(applications)
+"""
+
+# The same counts per status and per company alone, so the funnel and the top
+# companies read a few small rows instead of summing the daily table
+STATUS_ROLLUP_SQL = """
+INSERT INTO application_status_rollups (status, applications)
+SELECT COALESCE(status, ''), %s * COUNT(*)
+FROM job_applications
+WHERE application_date IS NOT NULL AND ({where})
+GROUP BY COALESCE(status, '')
+ON DUPLICATE KEY UPDATE applications = applications + VALUES(applications)
+"""
+
+COMPANY_ROLLUP_SQL = """
+INSERT INTO application_company_rollups (company_name, applications)
+SELECT COALESCE(company_name, ''), %s * COUNT(*)
+FROM job_applications
+WHERE application_date IS NOT NULL AND ({where})
+GROUP BY COALESCE(company_name, '')
+ON DUPLICATE KEY UPDATE applications = applications + VALUES(applications)
+"""
+
+ROLLUP_TABLES = ('application_rollups', 'application_status_rollups', 'application_company_rollups')
+
+# Later stages of an application, in order; a status implies all the ones before it
+STATUS_FUNNEL = ['Applied', 'Viewed', 'Interviewing', 'Offered']
+
+def add_to_rollups(cursor, where, params=(), sign=1):
+    """Add (sign=1) or remove (sign=-1) the applications matching where from the rollups.
+
+    To rewrite rows, remove them before the change and add them back after it,
+    with a where that selects the same rows both times. Call inside the
+    writing transaction.
+    """
+    for sql in (ROLLUP_SQL, STATUS_ROLLUP_SQL, COMPANY_ROLLUP_SQL):
+        cursor.execute(sql.format(where=where), [sign, *params])
+
+def prune_rollups(cursor):
+    """Drop the groups that rewrites have emptied"""
+    for table in ROLLUP_TABLES:
+        cursor.execute(f"DELETE FROM {table} WHERE applications = 0")
+
+def rebuild_rollups(connection):
+    """Recompute every rollup from job_applications in one transaction"""
+    with connection.cursor() as cursor:
+        for table in ROLLUP_TABLES:
+            cursor.execute(f"DELETE FROM {table}")
+        add_to_rollups(cursor, "1 = 1")
+        bump_version(cursor)
+    connection.commit()
+
+def _value(row, key, index):
+    return row[key] if isinstance(row, dict) else row[index]
+
+def load_stats(connection, weeks=26, top=10):
+    """Aggregate the rollups into what the stats page draws.
+
+    Weekly counts only read the last weeks of rollups, and the funnel and top
+    companies read the per-status and per-company rollups (the latter through
+    its applications index), so their cost does not grow with history.
+    """
+    today = date.today()
+    first_week = today - timedelta(days=today.weekday() + 7 * (weeks - 1))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT day, platform, SUM(applications) AS applications FROM application_rollups "
+            "WHERE day >= %s GROUP BY day, platform",
+            (first_week.strftime('%Y-%m-%d'),)
+        )
+        daily = cursor.fetchall()
+        cursor.execute("SELECT status, applications FROM application_status_rollups")
+        by_status = cursor.fetchall()
+        cursor.execute(
+            "SELECT company_name, applications FROM application_company_rollups ORDER BY applications DESC LIMIT %s",
+            (top,)
+        )
+        companies = cursor.fetchall()
+
+    week_starts = [first_week + timedelta(weeks=index) for index in range(weeks)]
+    per_platform = {}
+    for row in daily:
+        day = _value(row, 'day', 0)
+        if not isinstance(day, date):
+            day = date.fromisoformat(str(day)[:10])
+        week = (day - first_week).days // 7
+        if week >= weeks:
+            continue
+        counts = per_platform.setdefault(_value(row, 'platform', 1) or 'Unknown', [0] * weeks)
+        counts[week] += int(_value(row, 'applications', 2))
+
+    status_counts = {(_value(row, 'status', 0) or 'Unknown'): int(_value(row, 'applications', 1)) for row in by_status}
+    total = sum(status_counts.values())
+    # Every application starts at 'Applied'; later stages count everything that got there or beyond
+    funnel = [(STATUS_FUNNEL[0], total)]
+    for index, status in enumerate(STATUS_FUNNEL[1:], 1):
+        funnel.append((status, sum(status_counts.get(later, 0) for later in STATUS_FUNNEL[index:])))
+    other_statuses = sorted((status, count) for status, count in status_counts.items() if status not in STATUS_FUNNEL)
+
+    return {
+        'weeks': [week.strftime('%Y-%m-%d') for week in week_starts],
+        'per_platform': sorted(per_platform.items()),
+        'funnel': funnel,
+        'other_statuses': other_statuses,
+        'top_companies': [(_value(row, 'company_name', 0) or 'Unknown', int(_value(row, 'applications', 1))) for row in companies],
+        'total': total
+    }
@@ -0,0 +1,141 @@
+import os
+import re
+import threading
+import time
+from dotenv import load_dotenv
+from cache_versions import APPLICATIONS, APPLICATION_REWRITES, CACHE_VERSION_CHECK_INTERVAL, get_version
+
+load_dotenv()
+
+# Full rebuild at least this often, in seconds, as a safety net
+SEARCH_INDEX_TTL = float(os.getenv('SEARCH_INDEX_TTL', '3600'))
+# How long, in seconds, to keep looking for a row whose number was skipped;
+# AUTO_INCREMENT numbers can commit out of order under concurrent writers
+SEARCH_INDEX_GAP_SECONDS = float(os.getenv('SEARCH_INDEX_GAP_SECONDS', '300'))
+
+# Added to company match scores so any company match ranks above any job title match
+COMPANY_TIER = 4
+
+WORD_START_RE = re.compile(r'\w+')
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class SearchIndex:
+    """In-process trigram index over company names and job titles.
+
+    A search for a string of three or more characters only looks at the rows
+    listed under its rarest trigram, then confirms each one with a substring
+    test, so results are the same as company_name LIKE '%q%' OR job_title LIKE
+    '%q%' (case-insensitively) without scanning the table. New rows are added
+    incrementally when the job_applications cache version moves, re-checking
+    recently skipped numbers in case they commit late; a rewrite of
+    existing rows (normalization) triggers a full rebuild.
+    """
+
+    def __init__(self, ttl=SEARCH_INDEX_TTL, check_interval=CACHE_VERSION_CHECK_INTERVAL):
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.docs = {}
+        self.postings = {}
+        self.max_number = 0
+        # Skipped numbers below max_number -> when they were first seen missing.
+        # Most belong to a slower transaction that has yet to commit; numbers a
+        # rolled-back or racing insert used up never fill in and simply expire.
+        self.gaps = {}
+        self.versions = None
+        self.built_at = 0.0
+        self.checked_at = 0.0
+
+    def _add_rows(self, rows):
+        for row in rows:
+            number = row['number']
+            company = (row['company_name'] or '').casefold()
+            title = (row['job_title'] or '').casefold()
+            self.docs[number] = (company, title)
+            for gram in trigrams(company) | trigrams(title):
+                self.postings.setdefault(gram, []).append(number)
+            self.max_number = max(self.max_number, number)
+
+    def _load(self, conn, after_number=0):
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT number, company_name, job_title FROM job_applications WHERE number > %s ORDER BY number",
+                (after_number,)
+            )
+            return cursor.fetchall()
+
+    def _read_versions(self, conn):
+        with conn.cursor() as cursor:
+            return get_version(cursor, APPLICATIONS), get_version(cursor, APPLICATION_REWRITES)
+
+    def refresh(self, conn):
+        """Bring the index up to date with the table, as cheaply as the change allows"""
+        now = time.monotonic()
+        if self.versions is not None and now - self.checked_at < self.check_interval and now - self.built_at < self.ttl:
+            return
+        versions = self._read_versions(conn)
+        self.checked_at = now
+        if self.versions is None or versions[1] != self.versions[1] or now - self.built_at > self.ttl:
+            self.docs = {}
+            self.postings = {}
+            self.max_number = 0
+            self.gaps = {}
+            self._add_rows(self._load(conn))
+            self.built_at = now
+        elif versions[0] != self.versions[0]:
+            self._add_new_rows(conn, now)
+        self.versions = versions
+
+    def _add_new_rows(self, conn, now):
+        """Load rows added since the last refresh, including recent gaps that have since committed"""
+        self.gaps = {number: seen for number, seen in self.gaps.items() if now - seen < SEARCH_INDEX_GAP_SECONDS}
+        after_number = min(self.gaps, default=self.max_number + 1) - 1
+        previous_max = self.max_number
+        rows = [row for row in self._load(conn, after_number) if row['number'] not in self.docs]
+        self._add_rows(rows)
+        for row in rows:
+            self.gaps.pop(row['number'], None)
+        for number in range(previous_max + 1, self.max_number):
+            if number not in self.docs:
+                self.gaps[number] = now
+
+    def _candidates(self, query):
+        if len(query) < 3:
+            return self.docs.keys()
+        postings = [self.postings.get(gram) for gram in trigrams(query)]
+        if not all(postings):
+            return []
+        return min(postings, key=len)
+
+    def search(self, conn, query):
+        """Return {number: score} for rows whose company or job title contains query.
+
+        Higher scores rank better: an exact match beats a match at the start of
+        a word, which beats a match inside a word, and any company match beats
+        any job title match.
+        """
+        query = query.casefold()
+        with self.lock:
+            self.refresh(conn)
+            matches = {}
+            for number in self._candidates(query):
+                company, title = self.docs[number]
+                company_score = score_field(company, query)
+                score = company_score + COMPANY_TIER if company_score else score_field(title, query)
+                if score:
+                    matches[number] = score
+            return matches
+
+def score_field(text, query):
+    position = text.find(query)
+    if position == -1:
+        return 0
+    if text == query:
+        return 4
+    # A match at the start of any word counts as a prefix match
+    for word in WORD_START_RE.finditer(text):
+        if text.startswith(query, word.start()):
+            return 3 if word.start() == 0 else 2
+    return 1
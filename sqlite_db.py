@@ -0,0 +1,165 @@
+import re
+import sqlite3
+import time
+
+# The tables the email processor touches, as created by migrate.py on MySQL
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_applications (
+    number INTEGER PRIMARY KEY AUTOINCREMENT,
+    company_name TEXT,
+    job_title TEXT,
+    application_date TEXT,
+    status TEXT,
+    platform TEXT,
+    company_platform TEXT,
+    duplicate_of INTEGER,
+    ingest_batch TEXT,
+    UNIQUE (company_name, job_title, application_date)
+);
+CREATE INDEX IF NOT EXISTS idx_job_applications_date_number ON job_applications (application_date, number);
+CREATE INDEX IF NOT EXISTS idx_job_applications_duplicate_of ON job_applications (duplicate_of);
+CREATE INDEX IF NOT EXISTS idx_job_applications_ingest_batch ON job_applications (ingest_batch);
+CREATE TABLE IF NOT EXISTS cache_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS application_rollups (
+    day TEXT NOT NULL,
+    platform TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    company_name TEXT NOT NULL DEFAULT '',
+    applications INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, platform, status, company_name)
+);
+CREATE TABLE IF NOT EXISTS application_status_rollups (
+    status TEXT PRIMARY KEY,
+    applications INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS application_company_rollups (
+    company_name TEXT PRIMARY KEY,
+    applications INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_company_rollups_applications ON application_company_rollups (applications);
+CREATE TABLE IF NOT EXISTS application_status_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    application_number INTEGER NOT NULL,
+    old_status TEXT,
+    new_status TEXT NOT NULL,
+    changed_on TEXT,
+    source TEXT,
+    recorded_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_status_history_application ON application_status_history (application_number);
+CREATE TABLE IF NOT EXISTS name_aliases (
+    kind TEXT NOT NULL,
+    alias TEXT NOT NULL,
+    canonical TEXT NOT NULL,
+    PRIMARY KEY (kind, alias)
+);
+"""
+
+# MySQL spellings used by the writers, and their SQLite equivalents
+_NOOP_UPSERT_RE = re.compile(r'ON DUPLICATE KEY UPDATE\s+(\w+)\s*=\s*\1\s*$', re.IGNORECASE)
+_UPSERT_RE = re.compile(r'ON DUPLICATE KEY UPDATE\s+(.*)$', re.IGNORECASE | re.DOTALL)
+_VALUES_FUNCTION_RE = re.compile(r'\bVALUES\((\w+)\)', re.IGNORECASE)
+_IGNORE_RE = re.compile(r'^\s*(INSERT|UPDATE)\s+IGNORE\b', re.IGNORECASE)
+# SQLite locks the whole database for a write transaction instead
+_FOR_UPDATE_RE = re.compile(r'\s+FOR UPDATE$', re.IGNORECASE)
+# pymysql sends executemany() of a plain INSERT ... VALUES as one multi-row statement
+_MULTI_ROW_INSERT_RE = re.compile(r'^\s*(?:INSERT|REPLACE)\b.+\bVALUES\s*\(', re.IGNORECASE | re.DOTALL)
+
+def translate(query):
+    """Rewrite the MySQL dialect the ingest code uses into SQLite"""
+    query = query.strip()
+    query = _NOOP_UPSERT_RE.sub('ON CONFLICT DO NOTHING', query)
+    query = _UPSERT_RE.sub(lambda match: 'ON CONFLICT DO UPDATE SET ' + _VALUES_FUNCTION_RE.sub(r'excluded.\1', match.group(1)), query)
+    query = _IGNORE_RE.sub(lambda match: f"{match.group(1)} OR IGNORE", query)
+    query = _FOR_UPDATE_RE.sub('', query)
+    return query.replace('%s', '?')
+
+class SqliteCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.cursor = connection.db.cursor()
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+    def execute(self, query, args=None):
+        self.connection.round_trip()
+        self.cursor.execute(translate(query), tuple(args or ()))
+        return self.cursor.rowcount
+
+    def executemany(self, query, args):
+        args = [tuple(row) for row in args]
+        if not args:
+            return 0
+        if _MULTI_ROW_INSERT_RE.match(query):
+            self.connection.round_trip()
+        else:
+            # Anything else is sent one statement per row
+            for _ in args:
+                self.connection.round_trip()
+        self.cursor.executemany(translate(query), args)
+        return self.cursor.rowcount
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchmany(self, size):
+        return self.cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def close(self):
+        self.cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class SqliteConnection:
+    """A pymysql-compatible stand-in for the job_applications database, backed by SQLite.
+
+    Counts the round-trips the same code would make to MySQL (one per execute,
+    commit and rollback, one per multi-row INSERT) and can add a fixed latency
+    to each, for benchmarking the ingest pipeline offline.
+    """
+
+    # The DB-API exceptions pymysql also exposes on its connections
+    DataError = sqlite3.DataError
+    IntegrityError = sqlite3.IntegrityError
+
+    def __init__(self, path=':memory:', latency=0.0):
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        self.db.commit()
+        self.latency = latency
+        self.round_trips = 0
+
+    def round_trip(self):
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def cursor(self, cursor=None):
+        # Every cursor class (DictCursor, SSCursor) gets the connection's row_factory rows
+        return SqliteCursor(self)
+
+    def ping(self, reconnect=True):
+        self.round_trip()
+
+    def commit(self):
+        self.round_trip()
+        self.db.commit()
+
+    def rollback(self):
+        self.round_trip()
+        self.db.rollback()
+
+    def close(self):
+        self.db.close()
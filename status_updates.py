@@ -0,0 +1,229 @@
+import logging
+import os
+import time
+from dotenv import load_dotenv
+from cache_versions import APPLICATION_REWRITES, bump_version, get_version
+from canonical import canonicalize
+from dedup import DEDUP_TITLE_SIMILARITY, company_key, title_similarity
+from ingest_metrics import METRICS
+from normalization import fold
+from rollups import add_to_rollups, prune_rollups
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# How many status updates to match and write per transaction
+STATUS_BATCH_SIZE = int(os.getenv('STATUS_BATCH_SIZE', '500'))
+# How long, in seconds, to keep looking for an application whose number was
+# skipped; AUTO_INCREMENT numbers can commit out of order under concurrent writers
+STATUS_INDEX_GAP_SECONDS = float(os.getenv('STATUS_INDEX_GAP_SECONDS', '300'))
+
+# How far along each status is; an update never moves an application backwards
+STATUS_RANK = {'Applied': 0, 'Viewed': 1, 'Interviewing': 2, 'Rejected': 3, 'Offered': 4}
+
+INDEX_COLUMNS = ('number', 'company_name', 'job_title', 'application_date', 'status')
+
+def is_status_update(job_info):
+    """Extractors report status changes as job_infos with a status other than 'Applied'"""
+    return job_info['status'] != 'Applied'
+
+def _recency(row):
+    return (str(row['application_date'] or ''), row['number'])
+
+class ApplicationIndex:
+    """Existing applications keyed by normalized (company, job title), for matching status emails.
+
+    Loaded with one query, then kept current from the rows added since, so
+    matching never looks up applications one email at a time and a long-running
+    daemon loads the table only once. Rewrites of existing rows (normalization,
+    merged duplicates) trigger a full reload.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.by_key = {}
+        self.by_company = {}
+        self.rows = {}
+        self.max_number = 0
+        # Skipped numbers below max_number -> when they were first seen missing.
+        # Most belong to a slower transaction that has yet to commit; numbers a
+        # rolled-back or racing insert used up never fill in and simply expire.
+        self.gaps = {}
+        self.rewrites = None
+
+    def refresh(self, connection):
+        """Load the applications added since the last refresh (all of them the first time)"""
+        now = time.monotonic()
+        with connection.cursor() as cursor:
+            rewrites = get_version(cursor, APPLICATION_REWRITES)
+            if rewrites != self.rewrites:
+                self.clear()
+                self.rewrites = rewrites
+            self.gaps = {number: seen for number, seen in self.gaps.items() if now - seen < STATUS_INDEX_GAP_SECONDS}
+            cursor.execute(
+                f"SELECT {', '.join(INDEX_COLUMNS)} FROM job_applications "
+                "WHERE number > %s AND duplicate_of IS NULL ORDER BY number",
+                (min(self.gaps, default=self.max_number + 1) - 1,)
+            )
+            rows = cursor.fetchall()
+        previous_max = self.max_number
+        rows = [row if isinstance(row, dict) else dict(zip(INDEX_COLUMNS, row)) for row in rows]
+        rows = [row for row in rows if row['number'] not in self.rows]
+        for row in rows:
+            self.add(row)
+            self.gaps.pop(row['number'], None)
+        if previous_max:
+            for number in range(previous_max + 1, self.max_number):
+                if number not in self.rows:
+                    self.gaps[number] = now
+        return len(rows)
+
+    def add(self, row):
+        company = company_key(row['company_name'])
+        self.rows[row['number']] = row
+        self.by_key.setdefault((company, fold(row['job_title'] or '')), []).append(row)
+        self.by_company.setdefault(company, []).append(row)
+        self.max_number = max(self.max_number, row['number'])
+
+    def find(self, company_name, job_title):
+        """Return the application a status email refers to, or None.
+
+        An exact (company, title) match wins. Otherwise the closest title at
+        the same company is used if it is similar enough, and without a title
+        the company's most recent application.
+        """
+        company = company_key(company_name)
+        if not company:
+            return None
+        if job_title:
+            matches = self.by_key.get((company, fold(job_title)))
+            if matches:
+                return max(matches, key=_recency)
+        candidates = self.by_company.get(company)
+        if not candidates:
+            return None
+        if not job_title:
+            return max(candidates, key=_recency)
+        scored = [(title_similarity(job_title, row['job_title']), _recency(row), row) for row in candidates]
+        score, _, row = max(scored, key=lambda item: item[:2])
+        return row if score >= DEDUP_TITLE_SIMILARITY else None
+
+# Shared by every sync in the process, so daemon wake-ups only load new rows
+APPLICATION_INDEX = ApplicationIndex()
+
+class StatusUpdateWriter:
+    """Buffers status updates and applies them to matching applications in batches.
+
+    Each flush matches its updates against an in-memory ApplicationIndex,
+    rewrites the statuses with one CASE update, records every transition in
+    application_status_history and adjusts the rollups, all in one transaction.
+    """
+
+    def __init__(self, connection, batch_size=STATUS_BATCH_SIZE, index=APPLICATION_INDEX):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.pending = []
+        self.index = index
+        self.updated_count = 0
+        self.unmatched_count = 0
+
+    def add(self, job_info):
+        self.pending.append(job_info)
+
+    def is_full(self):
+        return len(self.pending) >= self.batch_size
+
+    def _transitions(self, updates):
+        """Match updates to applications, keeping the furthest-along new status per application"""
+        transitions = {}
+        for job_info in updates:
+            row = self.index.find(job_info['company_name'], job_info['job_title'])
+            if row is None:
+                self.unmatched_count += 1
+                logger.debug("No application found for %s update from %s - %s",
+                             job_info['status'], job_info['company_name'], job_info['job_title'])
+                continue
+            current = transitions.get(row['number'])
+            if current is None or STATUS_RANK.get(job_info['status'], 0) > STATUS_RANK.get(current['status'], 0):
+                transitions[row['number']] = job_info
+        return transitions
+
+    def flush(self):
+        """Apply all queued updates, returning how many applications changed status.
+
+        A failed write is rolled back and re-raised, like a failed application batch.
+        """
+        updates, self.pending = self.pending, []
+        if not updates:
+            return 0
+        # Aliases and stored spellings apply to matching just as to new applications
+        updates = [canonicalize(job_info) for job_info in updates]
+        unmatched = self.unmatched_count
+        try:
+            with METRICS.stage('db_status_updates', len(updates)):
+                # Picks up applications stored earlier in this run
+                self.index.refresh(self.connection)
+                transitions = self._transitions(updates)
+                applied = self._write(transitions) if transitions else 0
+        except Exception as e:
+            logger.error(f"Error applying status updates: {str(e)}")
+            METRICS.count('db_errors')
+            self.connection.rollback()
+            # The in-memory statuses may be ahead of the database now
+            self.index.clear()
+            raise
+        METRICS.count('status_updates_applied', applied)
+        METRICS.count('status_updates_unmatched', self.unmatched_count - unmatched)
+        self.updated_count += applied
+        logger.info(f"Applied {applied} status updates from {len(updates)} status emails")
+        return applied
+
+    def _write(self, transitions):
+        """Apply the transitions that move an application forward, returning how many did.
+
+        The matched rows are locked and their statuses re-read first, so a
+        status edited by hand since the index loaded it is never moved
+        backwards and the history records the status it really replaced.
+        """
+        placeholders = ', '.join(['%s'] * len(transitions))
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT number, status FROM job_applications WHERE number IN ({placeholders}) FOR UPDATE",
+                list(transitions)
+            )
+            current = dict((row['number'], row['status']) if isinstance(row, dict) else row for row in cursor.fetchall())
+            for number, status in current.items():
+                self.index.rows[number]['status'] = status
+            transitions = {
+                number: job_info for number, job_info in transitions.items()
+                if number in current and STATUS_RANK.get(job_info['status'], 0) > STATUS_RANK.get(current[number], 0)
+            }
+            if transitions:
+                numbers = list(transitions)
+                placeholders = ', '.join(['%s'] * len(numbers))
+                cases = ' '.join(['WHEN %s THEN %s'] * len(numbers))
+                params = [value for number in numbers for value in (number, transitions[number]['status'])]
+                history = [
+                    (number, current[number], job_info['status'], job_info.get('status_date'), job_info['platform'])
+                    for number, job_info in transitions.items()
+                ]
+                add_to_rollups(cursor, f"number IN ({placeholders})", numbers, sign=-1)
+                cursor.execute(
+                    f"UPDATE job_applications SET status = CASE number {cases} END WHERE number IN ({placeholders})",
+                    params + numbers
+                )
+                add_to_rollups(cursor, f"number IN ({placeholders})", numbers)
+                prune_rollups(cursor)
+                cursor.executemany(
+                    "INSERT INTO application_status_history (application_number, old_status, new_status, changed_on, source) "
+                    "VALUES (%s, %s, %s, %s, %s)",
+                    history
+                )
+                bump_version(cursor)
+        self.connection.commit()
+        for number, job_info in transitions.items():
+            self.index.rows[number]['status'] = job_info['status']
+        return len(transitions)
@@ -0,0 +1,56 @@
+import json
+import logging
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Where the incremental sync mode remembers how far it got. A relative path is
+# taken from this directory, not the working directory, so cron jobs and the
+# daemon find the same checkpoints wherever they are started from.
+SYNC_STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.getenv('SYNC_STATE_FILE', 'sync_state.json'))
+
+def load_state(path=SYNC_STATE_FILE):
+    """Load the sync checkpoints, returning an empty state if the file does not exist yet"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_state(state, path=SYNC_STATE_FILE):
+    """Write the sync checkpoints atomically so an interrupted run never corrupts them"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def get_uidvalidity(mail):
+    """Return the UIDVALIDITY of the currently selected folder"""
+    _, data = mail.response('UIDVALIDITY')
+    if not data or data[0] is None:
+        raise ValueError("Server did not report UIDVALIDITY for the selected folder")
+    return int(data[0])
+
+def get_uidnext(mail):
+    """Return the UIDNEXT of the currently selected folder, or None if the server did not send it"""
+    _, data = mail.response('UIDNEXT')
+    if not data or data[0] is None:
+        return None
+    return int(data[0])
+
+def get_checkpoint(state, folder, source, uidvalidity):
+    """Return the last processed UID for a folder/source, or 0 when a full rescan is needed"""
+    checkpoint = state.get(f"{folder}:{source}")
+    if not checkpoint:
+        logger.info(f"No checkpoint for {source} in {folder}, doing a full scan")
+        return 0
+    if checkpoint['uidvalidity'] != uidvalidity:
+        logger.warning(f"UIDVALIDITY of {folder} changed ({checkpoint['uidvalidity']} -> {uidvalidity}), doing a full rescan of {source}")
+        return 0
+    return checkpoint['last_uid']
+
+def set_checkpoint(state, folder, source, uidvalidity, last_uid):
+    """Record the last processed UID for a folder/source"""
+    state[f"{folder}:{source}"] = {'uidvalidity': uidvalidity, 'last_uid': last_uid}
@@ -0,0 +1,372 @@
+import base64
+import quopri
+import random
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+# Job board emails carry these; everything else in the mailbox is noise the SEARCH must skip
+LINKEDIN_SENDER = 'LinkedIn <jobs-noreply@linkedin.com>'
+JOBSDB_SENDER = 'JobsDB <noreply@jobsdb.com>'
+NOISE_SENDERS = [
+    'LinkedIn Job Alerts <jobalerts-noreply@linkedin.com>',
+    'GitHub <noreply@github.com>',
+    'Medium Daily Digest <noreply@medium.com>',
+    'Google <no-reply@accounts.google.com>'
+]
+NOISE_SUBJECTS = [
+    'New jobs similar to Data Engineer',
+    'Your weekly digest',
+    'Security alert',
+    '[jobApp] Pull request merged'
+]
+
+# Spelling variants of the same company, as the job boards actually send them
+COMPANIES = [
+    ['Acme', 'ACME', 'Acme Ltd', 'Acme Limited'],
+    ['Globex Corporation', 'Globex Corp', 'GLOBEX CORPORATION'],
+    ['Initech', 'Initech Inc', 'Initech, Inc.'],
+    ['Booking.com'],
+    ['HSBC', 'HSBC Holdings PLC'],
+    ['Cathay Pacific', 'Cathay Pacific Airways Limited'],
+    ['Hutchison Telecom', 'Hutchison Telecommunications Co., Ltd.'],
+    ['Stark Industries', 'Stark Industries LLC'],
+    ['Wayne Enterprises'],
+    ['Umbrella Pte Ltd', 'Umbrella'],
+    ['Soylent & Co'],
+    ['Tyrell (Asia) Limited', 'Tyrell (Asia)']
+]
+TITLES = [
+    'Data Engineer', 'Senior Data Engineer', 'Data Analyst', 'Machine Learning Engineer',
+    'Software Engineer II', 'Software Engineer III', 'Backend Developer', 'Business Analyst',
+    'Analytics Engineer', 'Junior Data Scientist', 'Data Scientist', 'Platform Engineer'
+]
+LOCATIONS = ['Hong Kong SAR', 'Singapore', 'Kowloon, Hong Kong SAR', 'Remote']
+
+# Share of the mailbox that is job board mail, and of that, JobsDB digests
+JOB_MAIL_SHARE = 0.7
+JOBSDB_SHARE = 0.4
+
+HEADER_FETCH_RE = re.compile(r'HEADER\.FIELDS')
+BODY_SECTION_RE = re.compile(r'BODY\.PEEK\[(\d+(?:\.\d+)*)\]')
+SEARCH_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|([^\s()"]+))')
+IMAP_DATE_FORMAT = '%d-%b-%Y'
+
+class SyntheticMessage:
+    """One generated RFC822 message, with its text parts kept separately so a fake server can serve sections"""
+
+    def __init__(self, uid, sender, subject, sent_at, parts):
+        self.uid = uid
+        self.sender = sender
+        self.subject = subject
+        self.sent_at = sent_at
+        # (subtype, transfer encoding, encoded bytes)
+        self.parts = parts
+
+    def header_bytes(self):
+        return (
+            f"Subject: {self.subject}\r\n"
+            f"Date: {format_datetime(self.sent_at)}\r\n"
+            f"From: {self.sender}\r\n\r\n"
+        ).encode()
+
+    def bodystructure(self):
+        """The BODYSTRUCTURE a server would report, as IMAP syntax"""
+        parts = []
+        for subtype, encoding, payload in self.parts:
+            lines = payload.count(b'\n') + 1
+            parts.append(f'("text" "{subtype}" ("charset" "utf-8") NIL NIL "{encoding}" {len(payload)} {lines} NIL NIL NIL)')
+        if len(parts) == 1:
+            return parts[0]
+        return f'({"".join(parts)} "alternative" ("boundary" "b{self.uid}") NIL NIL)'
+
+    def section(self, section):
+        """Return the encoded bytes of a numbered body section, or None if there is no such part"""
+        index = int(section.split('.')[0]) - 1
+        if 0 <= index < len(self.parts):
+            return self.parts[index][2]
+        return None
+
+    def as_bytes(self):
+        """The full message, as it would appear in an mbox or .eml export"""
+        lines = [
+            f"From: {self.sender}",
+            f"Subject: {self.subject}",
+            f"Date: {format_datetime(self.sent_at)}",
+            f"Message-ID: <{self.uid}@synthetic.invalid>",
+            "MIME-Version: 1.0"
+        ]
+        if len(self.parts) == 1:
+            subtype, encoding, payload = self.parts[0]
+            lines += [f'Content-Type: text/{subtype}; charset="utf-8"', f"Content-Transfer-Encoding: {encoding}", ""]
+            return '\r\n'.join(lines).encode() + b'\r\n' + payload
+        boundary = f"b{self.uid}"
+        lines += [f'Content-Type: multipart/alternative; boundary="{boundary}"', ""]
+        raw = '\r\n'.join(lines).encode() + b'\r\n'
+        for subtype, encoding, payload in self.parts:
+            raw += (
+                f'--{boundary}\r\nContent-Type: text/{subtype}; charset="utf-8"\r\n'
+                f'Content-Transfer-Encoding: {encoding}\r\n\r\n'
+            ).encode() + payload + b'\r\n'
+        return raw + f'--{boundary}--\r\n'.encode()
+
+def _encode(text, encoding):
+    data = text.replace('\n', '\r\n').encode()
+    if encoding == 'base64':
+        return base64.encodebytes(data).replace(b'\n', b'\r\n')
+    if encoding == 'quoted-printable':
+        return quopri.encodestring(data)
+    return data
+
+class SyntheticMailbox:
+    """A deterministic mailbox of LinkedIn confirmations, JobsDB (digest) confirmations and unrelated mail.
+
+    Only each message's kind and send time are kept in memory; the message
+    itself is regenerated from the seed whenever it is asked for, so a 100k
+    message mailbox costs a few MB. UIDs run from 1 to size.
+    """
+
+    def __init__(self, size, seed=0, days=180, end=None):
+        self.size = size
+        self.seed = seed
+        self.uidvalidity = 1000 + seed
+        end = end or datetime(2025, 5, 2, tzinfo=timezone.utc)
+        rng = random.Random(seed)
+        # Keep a finite pool of roles so the same application is confirmed more than once now and then
+        self.roles = [(rng.choice(COMPANIES), rng.choice(TITLES)) for _ in range(max(1, size // 3))]
+        self.kinds = []
+        self.dates = []
+        start = end - timedelta(days=days)
+        step = timedelta(days=days) / max(1, size)
+        for index in range(size):
+            roll = rng.random()
+            if roll >= JOB_MAIL_SHARE:
+                kind = 'noise'
+            elif roll < JOB_MAIL_SHARE * JOBSDB_SHARE:
+                kind = 'jobsdb'
+            else:
+                kind = 'linkedin'
+            self.kinds.append(kind)
+            # Mail arrives in UID order during office hours
+            day = (start + step * index).replace(hour=9, minute=0, second=0, microsecond=0)
+            self.dates.append(day + timedelta(seconds=rng.randrange(8 * 3600)))
+
+    def __len__(self):
+        return self.size
+
+    def _role(self, rng):
+        variants, title = rng.choice(self.roles)
+        return rng.choice(variants), title
+
+    def sender(self, uid):
+        kind = self.kinds[uid - 1]
+        if kind == 'linkedin':
+            return LINKEDIN_SENDER
+        if kind == 'jobsdb':
+            return JOBSDB_SENDER
+        return NOISE_SENDERS[uid % len(NOISE_SENDERS)]
+
+    def message(self, uid):
+        """Generate message uid (1-based)"""
+        rng = random.Random(self.seed * 1000003 + uid)
+        kind = self.kinds[uid - 1]
+        sent_at = self.dates[uid - 1]
+        if kind == 'linkedin':
+            company, title = self._role(rng)
+            text = (
+                f"Your application was sent to {company}\n\n"
+                f"{title}\n"
+                f"{company} · {rng.choice(LOCATIONS)} (Hybrid)\n"
+                f"Applied on {sent_at.strftime('%B')} {sent_at.day}, {sent_at.year}\n\n"
+                f"View job: https://www.linkedin.com/jobs/view/{rng.randrange(10 ** 9)}/\n\n"
+                "Now, take these next steps for more success\n"
+            )
+            html = f"<html><body><h2>Your application was sent to {company}</h2><p>{title}</p></body></html>\n"
+            parts = [('plain', 'quoted-printable', _encode(text, 'quoted-printable')),
+                     ('html', 'quoted-printable', _encode(html, 'quoted-printable'))]
+            return SyntheticMessage(uid, LINKEDIN_SENDER, f"Your application was sent to {company}", sent_at, parts)
+        if kind == 'jobsdb':
+            # Mostly single confirmations, sometimes a digest of several
+            count = 1 if rng.random() < 0.8 else rng.randint(2, 5)
+            lines = ["Hi Alex,\n"]
+            for _ in range(count):
+                company, title = self._role(rng)
+                lines.append(f"Your application for {title} was successfully submitted to {company}!\n")
+            lines.append("\nGood luck!\nThe JobsDB team\n")
+            parts = [('plain', 'base64', _encode(''.join(lines), 'base64'))]
+            return SyntheticMessage(uid, JOBSDB_SENDER, "Your application was successfully submitted", sent_at, parts)
+        text = f"{NOISE_SUBJECTS[uid % len(NOISE_SUBJECTS)]}\n\n" + "Lorem ipsum dolor sit amet. " * rng.randint(5, 40) + "\n"
+        parts = [('plain', '7bit', _encode(text, '7bit'))]
+        return SyntheticMessage(uid, self.sender(uid), NOISE_SUBJECTS[uid % len(NOISE_SUBJECTS)], sent_at, parts)
+
+    def subject(self, uid):
+        kind = self.kinds[uid - 1]
+        if kind == 'noise':
+            return NOISE_SUBJECTS[uid % len(NOISE_SUBJECTS)]
+        return self.message(uid).subject
+
+    def write_mbox(self, path):
+        """Write the whole mailbox as an mbox file, for benchmarking the offline mode"""
+        with open(path, 'wb') as f:
+            for uid in range(1, self.size + 1):
+                message = self.message(uid)
+                f.write(f"From synthetic {message.sent_at.strftime('%a %b %d %H:%M:%S %Y')}\n".encode())
+                # mboxrd-style escaping of body lines starting with 'From '
+                f.write(re.sub(rb'(?m)^(>*From )', rb'>\1', message.as_bytes()))
+                f.write(b'\n')
+
+class ImapStats:
+    """Round-trip counters shared by every connection to one fake server"""
+
+    def __init__(self):
+        self.round_trips = 0
+        self.commands = {}
+
+    def record(self, command):
+        self.round_trips += 1
+        self.commands[command] = self.commands.get(command, 0) + 1
+
+class FakeImap:
+    """An imaplib.IMAP4-compatible stand-in serving a SyntheticMailbox.
+
+    Implements the commands the email processor uses (LOGIN, SELECT, UID SEARCH,
+    UID FETCH, NOOP, CLOSE, LOGOUT) and returns data in imaplib's shapes. Every
+    command sleeps for latency seconds first, so round-trip costs show up in
+    the timings the way they would against Gmail.
+    """
+
+    def __init__(self, mailbox, latency=0.0, stats=None):
+        self.mailbox = mailbox
+        self.latency = latency
+        self.stats = stats or ImapStats()
+        self.selected = False
+
+    def _command(self, name):
+        self.stats.record(name)
+        if self.latency:
+            time.sleep(self.latency)
+
+    def login(self, user, password):
+        self._command('LOGIN')
+        return 'OK', [b'LOGIN completed']
+
+    def select(self, mailbox='INBOX', readonly=False):
+        self._command('SELECT')
+        self.selected = True
+        return 'OK', [str(len(self.mailbox)).encode()]
+
+    def response(self, code):
+        # Untagged data from SELECT, served locally like imaplib does
+        if code == 'UIDVALIDITY':
+            return code, [str(self.mailbox.uidvalidity).encode()]
+        if code == 'UIDNEXT':
+            return code, [str(len(self.mailbox) + 1).encode()]
+        return code, [None]
+
+    def noop(self):
+        self._command('NOOP')
+        return 'OK', [b'NOOP completed']
+
+    def close(self):
+        self._command('CLOSE')
+        self.selected = False
+        return 'OK', [b'CLOSE completed']
+
+    def logout(self):
+        self._command('LOGOUT')
+        return 'BYE', [b'LOGOUT completed']
+
+    def uid(self, command, *args):
+        command = command.upper()
+        self._command(f"UID {command}")
+        if command == 'SEARCH':
+            uids = self._search(args[-1])
+            return 'OK', [' '.join(str(uid) for uid in uids).encode()]
+        if command == 'FETCH':
+            return 'OK', self._fetch(args[0], args[1])
+        raise ValueError(f"FakeImap does not implement UID {command}")
+
+    def _uid_set(self, uid_set):
+        last = len(self.mailbox)
+        uids = set()
+        for item in uid_set.split(','):
+            start, _, end = item.partition(':')
+            start = last if start == '*' else int(start)
+            end = start if not end else last if end == '*' else int(end)
+            low, high = sorted((start, end))
+            uids.update(range(max(1, low), min(last, high) + 1))
+        return sorted(uids)
+
+    def _fetch(self, uid_set, items):
+        data = []
+        header_pass = bool(HEADER_FETCH_RE.search(items))
+        section_match = BODY_SECTION_RE.search(items)
+        for seq, uid in enumerate(self._uid_set(uid_set), 1):
+            message = self.mailbox.message(uid)
+            if header_pass:
+                literal = message.header_bytes()
+                prefix = (
+                    f"{seq} (UID {uid} BODYSTRUCTURE {message.bodystructure()} "
+                    f"BODY[HEADER.FIELDS (SUBJECT DATE FROM)] {{{len(literal)}}}"
+                )
+            elif section_match:
+                section = section_match.group(1)
+                literal = message.section(section)
+                if literal is None:
+                    data.append(f"{seq} (UID {uid} BODY[{section}] NIL)".encode())
+                    continue
+                prefix = f"{seq} (UID {uid} BODY[{section}] {{{len(literal)}}}"
+            else:
+                data.append(f"{seq} (UID {uid})".encode())
+                continue
+            data.append((prefix.encode(), literal))
+            data.append(b')')
+        return data
+
+    def _search(self, criteria):
+        tokens = []
+        for match in SEARCH_TOKEN_RE.finditer(criteria):
+            open_paren, close_paren, quoted, atom = match.groups()
+            tokens.append('(' if open_paren else ')' if close_paren else ('str', quoted) if quoted is not None else atom)
+        position = 0
+
+        def parse_key():
+            nonlocal position
+            token = tokens[position]
+            position += 1
+            if token == '(':
+                keys = []
+                while tokens[position] != ')':
+                    keys.append(parse_key())
+                position += 1
+                return lambda uid: all(key(uid) for key in keys)
+            name = token.upper() if isinstance(token, str) else token[1].upper()
+            if name == 'ALL':
+                return lambda uid: True
+            if name in ('OR', 'NOT'):
+                first = parse_key()
+                if name == 'NOT':
+                    return lambda uid: not first(uid)
+                second = parse_key()
+                return lambda uid: first(uid) or second(uid)
+            argument = tokens[position]
+            position += 1
+            value = argument[1] if isinstance(argument, tuple) else argument
+            if name == 'FROM':
+                return lambda uid: value.lower() in self.mailbox.sender(uid).lower()
+            if name == 'SUBJECT':
+                return lambda uid: value.lower() in self.mailbox.subject(uid).lower()
+            if name in ('SINCE', 'BEFORE', 'ON'):
+                day = datetime.strptime(value, IMAP_DATE_FORMAT).date()
+                compare = {'SINCE': lambda d: d >= day, 'BEFORE': lambda d: d < day, 'ON': lambda d: d == day}[name]
+                return lambda uid: compare(self.mailbox.dates[uid - 1].date())
+            if name == 'UID':
+                wanted = set(self._uid_set(value))
+                return lambda uid: uid in wanted
+            raise ValueError(f"FakeImap does not implement SEARCH key {name}")
+
+        keys = []
+        while position < len(tokens):
+            keys.append(parse_key())
+        return [uid for uid in range(1, len(self.mailbox) + 1) if all(key(uid) for key in keys)]
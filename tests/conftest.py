@@ -0,0 +1,48 @@
+import pytest
+import canonical
+from db_writer import update_database
+from sqlite_db import SqliteConnection
+from status_updates import APPLICATION_INDEX
+from synthetic_mail import FakeImap, SyntheticMailbox
+
+@pytest.fixture
+def db(monkeypatch):
+    """An empty job_applications database, backed by in-memory SQLite"""
+    connection = SqliteConnection()
+    # The process-wide index and canonicalizer would otherwise carry rows over from another test's database
+    APPLICATION_INDEX.clear()
+    monkeypatch.setattr(canonical, 'CANONICALIZER', canonical.Canonicalizer())
+    yield connection
+    connection.close()
+
+@pytest.fixture
+def mailbox():
+    return SyntheticMailbox(60, seed=7)
+
+@pytest.fixture
+def mail(mailbox):
+    imap = FakeImap(mailbox)
+    imap.select('inbox')
+    return imap
+
+@pytest.fixture
+def job_info():
+    """Build an application the way the extractors return it"""
+    def build(company, title, application_date, status='Applied', platform='LinkedIn'):
+        return {'company_name': company, 'job_title': title, 'application_date': application_date,
+                'status': status, 'platform': platform, 'company_platform': 'NA'}
+    return build
+
+@pytest.fixture
+def stored(db, job_info, monkeypatch):
+    """A database holding numbers 1-6, written through update_database without duplicate checks"""
+    monkeypatch.setattr('db_writer.DEDUP_MODE', 'off')
+    update_database(db, [
+        job_info('Acme', 'Data Engineer', '2025-03-01'),
+        job_info('Acme', 'Data Engineer', '2025-01-05'),
+        job_info('Acme', 'Data Engineers', '2025-03-02', status='Viewed'),
+        job_info('Acme', 'Business Analyst', '2025-03-02'),
+        job_info('Globex', 'Platform Engineer', '2025-03-03', platform='Jobsdb'),
+        job_info('Initech', 'Analyst', None)
+    ])
+    return db
@@ -0,0 +1,98 @@
+import csv
+import io
+from datetime import date
+import pytest
+import app
+from db_pool import ConnectionPool
+
+def dict_rows(cursor, row):
+    # What pymysql's DictCursor returns, dates included
+    row = {column[0]: value for column, value in zip(cursor.description, row)}
+    if row.get('application_date'):
+        row['application_date'] = date.fromisoformat(row['application_date'])
+    return row
+
+@pytest.fixture
+def client(db, monkeypatch):
+    db.db.executemany(
+        "INSERT INTO job_applications (company_name, job_title, application_date, status, platform) VALUES (?, ?, ?, ?, ?)",
+        [
+            ('Acme', 'Data Engineer', '2025-03-01', 'Applied', 'LinkedIn'),
+            ('Globex', 'Analyst', '2025-03-02', 'Viewed', 'Jobsdb'),
+            ('Initech', 'Data Analyst', '2025-03-03', 'Applied', 'LinkedIn'),
+            ('Umbrella', 'Engineer, Platform', None, 'Applied', 'LinkedIn')
+        ]
+    )
+    db.db.execute("INSERT INTO cache_versions (name, version) VALUES ('job_applications', 1)")
+    db.db.commit()
+    pool = ConnectionPool(lambda: db, size=1, timeout=0.1)
+    monkeypatch.setattr(app, 'db_pool', pool)
+    return app.app.test_client()
+
+def test_json_pages_follow_the_next_links(db, client):
+    db.db.row_factory = dict_rows
+    response = client.get('/api/applications?per_page=3&platform=LinkedIn')
+    body = response.get_json()
+    assert [row['company_name'] for row in body['applications']] == ['Initech', 'Acme', 'Umbrella']
+    assert body['next'] is None
+    response = client.get('/api/applications?per_page=2')
+    body = response.get_json()
+    assert [row['number'] for row in body['applications']] == [3, 2]
+    assert body['previous'] is None
+    body = client.get(body['next']).get_json()
+    assert [row['number'] for row in body['applications']] == [1, 4]
+    assert body['applications'][1]['application_date'] is None
+    assert 'per_page=2' in body['previous']
+
+def test_json_answers_304_until_the_table_changes(db, client):
+    db.db.row_factory = dict_rows
+    first = client.get('/api/applications')
+    etag = first.headers['ETag'].strip('"')
+    assert client.get('/api/applications', headers={'If-None-Match': f'"{etag}"'}).status_code == 304
+    # The ETag also covers the query string
+    assert client.get('/api/applications?status=Viewed', headers={'If-None-Match': f'"{etag}"'}).status_code == 200
+    db.db.execute("UPDATE cache_versions SET version = version + 1")
+    db.db.commit()
+    assert client.get('/api/applications', headers={'If-None-Match': f'"{etag}"'}).status_code == 200
+
+def test_csv_export_streams_every_matching_row(client, monkeypatch):
+    monkeypatch.setattr(app, 'EXPORT_CHUNK_ROWS', 1)
+    response = client.get('/export.csv?status=Applied')
+    assert response.mimetype == 'text/csv'
+    assert 'attachment' in response.headers['Content-Disposition']
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == app.EXPORT_COLUMNS
+    assert [row[2] for row in rows[1:]] == ['Initech', 'Acme', 'Umbrella']
+    assert rows[3][3] == 'Engineer, Platform'
+    assert app.db_pool.metrics()['idle'] == 1
+
+def test_csv_export_answers_503_when_the_pool_is_busy(client):
+    with app.db_pool.connection():
+        response = client.get('/export.csv')
+    assert response.status_code == 503
+
+def test_aborted_export_gives_its_connection_up(client, monkeypatch):
+    monkeypatch.setattr(app, 'EXPORT_CHUNK_ROWS', 1)
+    response = client.get('/export.csv', buffered=False)
+    assert next(response.response).startswith(b'number,')
+    response.close()
+    # Discarded mid-result rather than handed to the next request
+    assert app.db_pool.metrics()['open'] == 0
+    assert app.db_pool.metrics()['connections_discarded'] == 1
+
+def test_resume_stream_closes_the_rest_on_abort():
+    closed = []
+
+    def chunks():
+        try:
+            yield 'b'
+            yield 'c'
+        finally:
+            closed.append(True)
+
+    rest = chunks()
+    # export_csv has already pulled the first chunk when the response starts
+    stream = app.resume_stream(next(rest), rest)
+    assert next(stream) == 'b'
+    stream.close()
+    assert closed == [True]
@@ -0,0 +1,53 @@
+import argparse
+import benchmark
+from sqlite_db import SqliteConnection, translate
+from synthetic_mail import FakeImap, SyntheticMailbox
+
+def test_translate_mysql_dialect():
+    assert translate("INSERT INTO t (a) VALUES (%s) ON DUPLICATE KEY UPDATE number = number") == \
+        "INSERT INTO t (a) VALUES (?) ON CONFLICT DO NOTHING"
+    assert translate("INSERT INTO t (a, b) VALUES (%s, 1) ON DUPLICATE KEY UPDATE b = b + VALUES(b)") == \
+        "INSERT INTO t (a, b) VALUES (?, 1) ON CONFLICT DO UPDATE SET b = b + excluded.b"
+    assert translate("UPDATE IGNORE t SET a = %s") == "UPDATE OR IGNORE t SET a = ?"
+
+def test_round_trips_are_counted_like_mysql():
+    db = SqliteConnection()
+    with db.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        # pymysql sends a plain INSERT ... VALUES batch as one statement
+        cursor.executemany(
+            "INSERT INTO job_applications (company_name, job_title, application_date) VALUES (%s, %s, %s)",
+            [('Acme', 'Analyst', '2025-03-01'), ('Acme', 'Engineer', '2025-03-01')]
+        )
+        cursor.executemany("UPDATE job_applications SET status = %s WHERE number = %s", [('Viewed', 1), ('Viewed', 2)])
+    db.commit()
+    assert db.round_trips == 5
+    assert db.db.execute("SELECT COUNT(*) FROM job_applications WHERE status = 'Viewed'").fetchone()[0] == 2
+
+def test_synthetic_mailbox_is_deterministic():
+    first, second = SyntheticMailbox(50, seed=1), SyntheticMailbox(50, seed=1)
+    assert first.kinds == second.kinds
+    assert first.message(17).as_bytes() == second.message(17).as_bytes()
+    assert SyntheticMailbox(50, seed=2).kinds != first.kinds
+
+def test_fake_imap_serves_searches_and_fetches():
+    mailbox = SyntheticMailbox(30, seed=1)
+    mail = FakeImap(mailbox)
+    mail.select('inbox', readonly=True)
+    since = mailbox.dates[9].strftime('%d-%b-%Y')
+    _, data = mail.uid('SEARCH', None, f'(SINCE "{since}" UID 1:*)')
+    uids = [int(uid) for uid in data[0].split()]
+    assert uids == [uid for uid in range(1, 31) if mailbox.dates[uid - 1].date() >= mailbox.dates[9].date()]
+    _, data = mail.uid('FETCH', '3', '(BODY.PEEK[1])')
+    assert data[0][0].startswith(b'1 (UID 3 BODY[1] ')
+    assert mail.stats.commands == {'SELECT': 1, 'UID SEARCH': 1, 'UID FETCH': 1}
+
+def test_benchmark_runs_end_to_end():
+    args = argparse.Namespace(mode='imap', imap_latency=0.0, db_latency=0.0, seed=0, pool_size=1)
+    result = benchmark.run_isolated(args, 200)
+    assert result['errors'] == []
+    assert result['applications_stored'] > 0
+    # One SEARCH and one FETCH per pass, however many messages match
+    assert result['imap_commands']['UID SEARCH'] == 1
+    assert result['imap_commands']['UID FETCH'] == 2
+    assert result['db_round_trips'] > 0
@@ -0,0 +1,52 @@
+from datetime import datetime
+from cache_versions import APPLICATION_REWRITES, bump_version
+from canonical import Canonicalizer
+from db_writer import update_database
+from extractors import JOBSDB
+
+def add_alias(db, kind, alias, canonical):
+    db.db.execute("INSERT INTO name_aliases (kind, alias, canonical) VALUES (?, ?, ?)", (kind, alias, canonical))
+    db.db.commit()
+
+def companies(db):
+    return [row[0] for row in db.db.execute("SELECT company_name FROM job_applications ORDER BY number")]
+
+def test_loaded_spellings_and_aliases(stored):
+    add_alias(stored, 'company', 'Big Blue', 'IBM')
+    add_alias(stored, 'platform', 'LI', 'LinkedIn')
+    canonicalizer = Canonicalizer()
+    canonicalizer.load(stored)
+    assert canonicalizer.company('ACME LIMITED') == 'Acme'
+    assert canonicalizer.company('big blue ltd') == 'IBM'
+    assert canonicalizer.platform('linedin') == 'LinkedIn'
+    assert canonicalizer.platform('LI') == 'LinkedIn'
+
+def test_reconnects_only_reload_after_rewrites(stored):
+    canonicalizer = Canonicalizer()
+    canonicalizer.load(stored)
+    stored.db.execute("INSERT INTO job_applications (company_name, job_title, application_date) VALUES ('HOOLI', 'QA', '2025-03-05')")
+    stored.db.commit()
+    stored.round_trips = 0
+    canonicalizer.load(stored)
+    assert stored.round_trips == 1
+    assert canonicalizer.company('Hooli') == 'Hooli'
+
+    with stored.cursor() as cursor:
+        bump_version(cursor, APPLICATION_REWRITES)
+    stored.commit()
+    canonicalizer.load(stored)
+    assert canonicalizer.company('Hooli') == 'HOOLI'
+
+def test_new_companies_keep_their_first_spelling():
+    canonicalizer = Canonicalizer()
+    assert canonicalizer.company('Hooli Inc') == 'Hooli'
+    assert canonicalizer.company('HOOLI') == 'Hooli'
+
+def test_names_are_canonicalized_once_when_written(db, job_info):
+    body = "Your application for Data Engineer was successfully submitted to ACME LIMITED!\n"
+    [extracted] = JOBSDB.extract(body, 'Your application was successfully submitted', datetime(2025, 3, 1), 'noreply@jobsdb.com')
+    # Extraction, which may run in a worker process, leaves names as written
+    assert extracted['company_name'] == 'ACME LIMITED'
+    update_database(db, [job_info('Acme', 'QA', '2025-03-01'), extracted])
+    assert companies(db) == ['Acme', 'Acme']
+    assert db.db.execute("SELECT platform FROM job_applications WHERE number = 2").fetchone()[0] == 'Jobsdb'
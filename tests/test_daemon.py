@@ -0,0 +1,40 @@
+import pytest
+import process_job_emails
+from ingest_metrics import METRICS
+
+class Stop(Exception):
+    pass
+
+class CountingBackoff:
+    """Records the retries and ends the daemon after the second one"""
+    sleeps = 0
+    delay = 0
+
+    def reset(self):
+        pass
+
+    def sleep(self):
+        CountingBackoff.sleeps += 1
+        if CountingBackoff.sleeps == 2:
+            raise Stop()
+
+@pytest.fixture
+def daemon(mail, db, monkeypatch):
+    CountingBackoff.sleeps = 0
+    monkeypatch.setattr(process_job_emails, 'Backoff', CountingBackoff)
+    monkeypatch.setattr(process_job_emails.signal, 'signal', lambda *args: None)
+    monkeypatch.setattr(process_job_emails, 'connect_to_email', lambda: mail)
+    monkeypatch.setattr(process_job_emails, 'connect_to_database', lambda: db)
+    monkeypatch.setattr(process_job_emails.METRICS, 'write_reports', lambda: None)
+
+def test_failed_sync_is_retried_with_backoff(daemon, monkeypatch):
+    syncs = []
+
+    def failing_sync(*args):
+        syncs.append(args)
+        raise RuntimeError("batch write failed")
+    monkeypatch.setattr(process_job_emails, 'process_incremental', failing_sync)
+    with pytest.raises(Stop):
+        process_job_emails.process_daemon()
+    assert len(syncs) == 2
+    assert METRICS.report()['counters']['sync_errors'] == 1
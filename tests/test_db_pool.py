@@ -0,0 +1,118 @@
+import threading
+import time
+import pytest
+from db_pool import ConnectionPool, PoolTimeout
+
+class FakeConnection:
+    def __init__(self, server):
+        self.server = server
+        self.closed = False
+
+    def ping(self, reconnect=True):
+        if self.server.down:
+            raise OSError("server down")
+
+    def close(self):
+        self.closed = True
+
+class FakeServer:
+    def __init__(self):
+        self.down = False
+        self.opened = 0
+
+    def connect(self):
+        if self.down:
+            raise OSError("server down")
+        self.opened += 1
+        return FakeConnection(self)
+
+@pytest.fixture
+def server():
+    return FakeServer()
+
+def test_connections_are_reused(server):
+    pool = ConnectionPool(server.connect, size=2, timeout=1)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+    assert server.opened == 1
+    assert pool.metrics()['idle'] == 1
+
+def test_timeout_when_every_connection_is_busy(server):
+    pool = ConnectionPool(server.connect, size=1, timeout=0.05)
+    with pool.connection():
+        with pytest.raises(PoolTimeout):
+            with pool.connection():
+                pass
+    assert pool.metrics()['timeouts'] == 1
+
+def test_failed_connect_frees_its_slot(server):
+    pool = ConnectionPool(server.connect, size=1, timeout=0.05)
+    server.down = True
+    with pytest.raises(OSError):
+        with pool.connection():
+            pass
+    server.down = False
+    with pool.connection():
+        pass
+    assert pool.metrics()['open'] == 1
+
+def test_failed_ping_frees_its_slot(server):
+    pool = ConnectionPool(server.connect, size=2, timeout=0.05, ping_after=0)
+    with pool.connection():
+        pass
+    server.down = True
+    # More failures than the pool has slots: none of them may leak one
+    for _ in range(5):
+        with pytest.raises(OSError):
+            with pool.connection():
+                pass
+    assert pool.metrics()['open'] == 0
+    server.down = False
+    with pool.connection():
+        pass
+
+def test_failed_recycle_frees_its_slot(server):
+    pool = ConnectionPool(server.connect, size=1, timeout=0.05, recycle=0)
+    with pool.connection():
+        pass
+    server.down = True
+    with pytest.raises(OSError):
+        with pool.connection():
+            pass
+    assert pool.metrics()['open'] == 0
+    server.down = False
+    with pool.connection():
+        pass
+    assert pool.metrics()['open'] == 1
+
+def test_error_in_block_discards_the_connection(server):
+    pool = ConnectionPool(server.connect, size=1, timeout=0.05)
+    with pytest.raises(ValueError):
+        with pool.connection() as connection:
+            raise ValueError
+    assert connection.closed
+    assert pool.metrics()['open'] == 0
+
+def test_waiter_wakes_when_a_discard_frees_a_slot(server):
+    pool = ConnectionPool(server.connect, size=1, timeout=5)
+    checked_out = threading.Event()
+
+    def fail_while_holding():
+        try:
+            with pool.connection():
+                checked_out.set()
+                time.sleep(0.1)
+                raise ValueError
+        except ValueError:
+            pass
+
+    thread = threading.Thread(target=fail_while_holding)
+    thread.start()
+    checked_out.wait()
+    start = time.monotonic()
+    with pool.connection():
+        waited = time.monotonic() - start
+    thread.join()
+    assert waited < 1
@@ -0,0 +1,55 @@
+import sqlite3
+import pytest
+from db_writer import ApplicationBatchWriter, update_database
+
+def numbers(db):
+    return [row[0] for row in db.db.execute("SELECT number FROM job_applications ORDER BY number")]
+
+def reject_long_titles(db):
+    # Stands in for MySQL's "Data too long" in strict mode
+    db.db.execute("CREATE TRIGGER title_length BEFORE INSERT ON job_applications "
+                  "WHEN length(NEW.job_title) > 20 BEGIN SELECT RAISE(ABORT, 'Data too long for column job_title'); END")
+
+def test_batch_inserts_new_rows_and_skips_stored_ones(stored, job_info):
+    stored.round_trips = 0
+    inserted, skipped = update_database(stored, [
+        job_info('Acme', 'Data Engineer', '2025-03-01'),
+        job_info('Hooli', 'QA', '2025-03-05'),
+        job_info('Hooli', 'QA', '2025-03-06')
+    ])
+    assert (inserted, skipped) == (2, 1)
+    # One lookup and one INSERT for the whole batch, however many rows it holds
+    assert stored.round_trips <= 8
+
+def test_stored_rows_do_not_use_up_numbers(stored, job_info):
+    update_database(stored, [job_info('Acme', 'Data Engineer', '2025-03-01'), job_info('Acme', 'Business Analyst', '2025-03-02')])
+    update_database(stored, [job_info('Hooli', 'QA', '2025-03-05'), job_info('Hooli', 'QA', '2025-03-05')])
+    assert numbers(stored) == [1, 2, 3, 4, 5, 6, 7]
+
+def test_batch_writer_flushes_when_full(db, job_info):
+    writer = ApplicationBatchWriter(db, batch_size=2)
+    for day in range(1, 6):
+        writer.add(job_info('Acme', 'QA', f'2025-03-0{day}'))
+    assert len(numbers(db)) == 4
+    writer.flush()
+    assert (writer.inserted_count, writer.skipped_count) == (5, 0)
+
+def test_rejected_row_is_skipped_and_the_rest_stored(stored, job_info):
+    reject_long_titles(stored)
+    inserted, skipped = update_database(stored, [
+        job_info('Hooli', 'QA', '2025-03-05'),
+        job_info('Hooli', 'Principal Reliability Engineer', '2025-03-05'),
+        job_info('Acme', 'Data Engineer', '2025-03-01'),
+        job_info('Hooli', 'Designer', '2025-03-06')
+    ])
+    assert (inserted, skipped) == (2, 2)
+    titles = [row[0] for row in stored.db.execute("SELECT job_title FROM job_applications WHERE company_name = 'Hooli'")]
+    assert sorted(titles) == ['Designer', 'QA']
+    rollups = dict(stored.db.execute("SELECT day, applications FROM application_rollups WHERE company_name = 'Hooli'"))
+    assert rollups == {'2025-03-05': 1, '2025-03-06': 1}
+
+def test_other_failures_roll_back_and_raise(stored, job_info):
+    stored.db.execute("DROP TABLE application_rollups")
+    with pytest.raises(sqlite3.OperationalError):
+        update_database(stored, [job_info('Hooli', 'QA', '2025-03-05')])
+    assert len(numbers(stored)) == 6
@@ -0,0 +1,55 @@
+from dedup import find_duplicates, same_company, title_similarity, company_key
+from db_writer import update_database
+
+def application(number, company, title, application_date, status='Applied'):
+    return {'number': number, 'company_name': company, 'job_title': title,
+            'application_date': application_date, 'status': status, 'duplicate_of': None}
+
+def test_title_similarity():
+    assert title_similarity('Data Engineer', 'data  engineer') == 1.0
+    assert title_similarity('Data Engineer', 'Data Engineers') > 0.85
+    assert title_similarity('Data Engineer', 'Marketing Manager') < 0.85
+
+def test_level_and_number_words_never_match():
+    assert title_similarity('Software Engineer II', 'Software Engineer III') == 0.0
+    assert title_similarity('Senior Data Engineer', 'Data Engineer') == 0.0
+
+def test_same_company_by_whole_words():
+    assert same_company(company_key('Acme Ltd'), company_key('ACME'))
+    assert same_company(company_key('Acme'), company_key('Acme Group'))
+    assert not same_company(company_key('Acme'), company_key('Acmeco'))
+
+def test_find_duplicates_within_the_window():
+    rows = [
+        application(1, 'Acme', 'Data Engineer', '2025-03-01'),
+        application(2, 'ACME Limited', 'Data Engineer', '2025-03-03'),
+        application(3, 'Acme', 'Data Engineer', '2025-03-10'),
+        application(4, 'Globex', 'Data Engineer', '2025-03-01'),
+        application(5, 'Acme', 'Senior Data Engineer', '2025-03-01')
+    ]
+    pairs = find_duplicates(rows)
+    assert [(duplicate['number'], original['number']) for duplicate, original in pairs] == [(2, 1)]
+
+def test_find_duplicates_only_checks_new_rows():
+    rows = [
+        application(1, 'Acme', 'Data Engineer', '2025-03-01'),
+        application(2, 'Acme', 'Data Engineer', '2025-03-02'),
+        application(3, 'Globex', 'Analyst', '2025-03-02')
+    ]
+    assert find_duplicates(rows, new_numbers={3}) == []
+    pairs = find_duplicates(rows, new_numbers={2, 3})
+    assert [(duplicate['number'], original['number']) for duplicate, original in pairs] == [(2, 1)]
+
+def test_batch_flags_only_its_own_duplicates(db, job_info, monkeypatch):
+    monkeypatch.setattr('db_writer.DEDUP_MODE', 'flag')
+    monkeypatch.setattr('dedup.DEDUP_MODE', 'flag')
+    assert update_database(db, [job_info('Acme', 'Data Engineer', '2025-03-01')]) == (1, 0)
+    # An older near-duplicate stored by someone else is left alone
+    db.db.execute("INSERT INTO job_applications (company_name, job_title, application_date, status) "
+                  "VALUES ('Acme Ltd', 'Data Engineers', '2025-03-02', 'Applied')")
+    db.db.commit()
+    update_database(db, [job_info('ACME', 'Data Engineer', '2025-03-03'), job_info('Globex', 'Analyst', '2025-03-03')])
+    flagged = db.db.execute(
+        "SELECT number, duplicate_of FROM job_applications WHERE duplicate_of IS NOT NULL"
+    ).fetchall()
+    assert flagged == [(3, 1)]
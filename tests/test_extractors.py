@@ -0,0 +1,47 @@
+from datetime import datetime
+from extractors import LINKEDIN, JOBSDB, RECRUITER, combined_search_criteria, get_extractor, registered_extractors
+from synthetic_mail import FakeImap, SyntheticMailbox
+
+SENT_AT = datetime(2025, 3, 4, 10, 30)
+
+def test_dispatch_by_sender_domain():
+    assert get_extractor('LinkedIn <jobs-noreply@linkedin.com>') is LINKEDIN
+    assert get_extractor('jobs@mail.linkedin.com') is LINKEDIN
+    assert get_extractor('JobsDB <noreply@jobsdb.com>') is JOBSDB
+    assert get_extractor('Acme Careers <no-reply@us.greenhouse-mail.io>') is RECRUITER
+    assert get_extractor('someone@example.com') is None
+    assert get_extractor('') is None
+
+def test_linkedin_confirmation():
+    body = ("Your application was sent to Acme Ltd\n\n  \nData Engineer\nAcme Ltd · Hong Kong SAR (Hybrid)\n"
+            "Applied on March 3, 2025\n")
+    [job_info] = LINKEDIN.extract(body, 'Alex, your application was sent to Acme Ltd', SENT_AT, 'jobs-noreply@linkedin.com')
+    assert job_info['job_title'] == 'Data Engineer'
+    assert job_info['application_date'] == '2025-03-03'
+    assert job_info['status'] == 'Applied'
+    assert job_info['platform'] == 'LinkedIn'
+
+def test_linkedin_without_company_yields_nothing():
+    assert LINKEDIN.extract('Data Engineer\n', 'Something else', SENT_AT, 'jobs-noreply@linkedin.com') == []
+
+def test_jobsdb_digest_yields_every_application():
+    body = ("Hi Alex,\nYour application for Data Engineer was successfully submitted to Globex Corporation!\n"
+            "Your application for Senior Analyst / BI was successfully submitted to Initech!\n")
+    applications = JOBSDB.extract(body, 'Your application was successfully submitted', SENT_AT, 'noreply@jobsdb.com')
+    assert [(job['job_title'], job['application_date']) for job in applications] == [
+        ('Data Engineer', '2025-03-04'), ('Senior Analyst / BI', '2025-03-04')
+    ]
+
+def test_subject_filters():
+    assert LINKEDIN.accepts('Your application was sent to Acme')
+    assert not LINKEDIN.accepts('New jobs similar to Data Engineer')
+    assert JOBSDB.accepts('Your application was successfully submitted')
+    assert not JOBSDB.accepts('Recommended jobs for you')
+
+def test_combined_search_finds_only_job_board_mail():
+    mailbox = SyntheticMailbox(200, seed=3)
+    mail = FakeImap(mailbox)
+    _, data = mail.uid('SEARCH', None, f'({combined_search_criteria(registered_extractors())})')
+    found = {int(uid) for uid in data[0].split()}
+    expected = {uid for uid in range(1, len(mailbox) + 1) if mailbox.kinds[uid - 1] != 'noise'}
+    assert found == expected
@@ -0,0 +1,58 @@
+import sqlite3
+from app import DEFAULT_STATUSES, load_facets
+from cache_versions import VersionedCache
+
+def add(db, platform, status, count=1):
+    for _ in range(count):
+        db.db.execute(
+            "INSERT INTO job_applications (company_name, job_title, application_date, status, platform) "
+            "VALUES ('Acme', 'Engineer ' || (SELECT COUNT(*) FROM job_applications), '2025-03-01', ?, ?)",
+            (status, platform)
+        )
+    db.db.commit()
+
+def bump(db):
+    db.db.execute("INSERT OR IGNORE INTO cache_versions (name, version) VALUES ('job_applications', 0)")
+    db.db.execute("UPDATE cache_versions SET version = version + 1 WHERE name = 'job_applications'")
+    db.db.commit()
+
+def test_facets_count_every_platform_and_status(db):
+    db.db.row_factory = sqlite3.Row
+    add(db, 'LinkedIn', 'Applied', 3)
+    add(db, 'LinkedIn', 'Viewed')
+    add(db, 'Jobsdb', 'Applied', 2)
+    add(db, None, 'Offered')
+    add(db, 'Jobsdb', None)
+    platforms, statuses = load_facets(db)
+    assert platforms == [('Jobsdb', 3), ('LinkedIn', 4)]
+    # Statuses nobody has reached yet are still offered, after the counted ones
+    assert statuses == [('Applied', 5), ('Offered', 1), ('Viewed', 1), ('Interviewing', 0)]
+    assert all(status in dict(statuses) for status in DEFAULT_STATUSES)
+
+def test_facets_reload_only_when_the_version_moves(db):
+    db.db.row_factory = sqlite3.Row
+    cache = VersionedCache(ttl=300, check_interval=0)
+    loads = []
+
+    def load(connection):
+        loads.append(1)
+        return load_facets(connection)
+
+    add(db, 'LinkedIn', 'Applied')
+    assert cache.get(db, load)[0] == [('LinkedIn', 1)]
+    add(db, 'LinkedIn', 'Applied')
+    # Rows written without a version bump are not seen until the next one
+    assert cache.get(db, load)[0] == [('LinkedIn', 1)]
+    assert len(loads) == 1
+    bump(db)
+    assert cache.get(db, load)[0] == [('LinkedIn', 2)]
+    assert cache.get(db, load)[0] == [('LinkedIn', 2)]
+    assert len(loads) == 2
+
+def test_facets_reload_after_the_ttl(db):
+    db.db.row_factory = sqlite3.Row
+    cache = VersionedCache(ttl=0, check_interval=0)
+    add(db, 'LinkedIn', 'Applied')
+    assert cache.get(db, load_facets)[0] == [('LinkedIn', 1)]
+    add(db, 'Jobsdb', 'Applied')
+    assert cache.get(db, load_facets)[0] == [('Jobsdb', 1), ('LinkedIn', 1)]
@@ -0,0 +1,96 @@
+import base64
+import quopri
+from imap_fetch import (
+    compress_uids, chunked, parse_fetch_response, find_text_part, decode_part,
+    decode_subject, search_uids, fetch_headers, fetch_bodies, fetch_raw_parts
+)
+
+def test_compress_uids_merges_runs():
+    assert compress_uids([b'9', b'1', b'2', b'3', b'4', b'7', b'3']) == '1:4,7,9'
+
+def test_chunked():
+    assert list(chunked([1, 2, 3, 4, 5], 2)) == [[1, 2], [3, 4], [5]]
+
+def test_parse_fetch_response_with_literals_and_several_messages():
+    data = [
+        (b'1 (UID 10 BODY[HEADER.FIELDS (SUBJECT)] {12}', b'Subject: a\r\n'),
+        b')',
+        (b'2 (UID 11 BODY[1] {5}', b'hello'),
+        b' FLAGS (\\Seen))',
+        b'3 (UID 12 BODY[1] NIL)'
+    ]
+    messages = parse_fetch_response(data)
+    assert messages[0] == {'UID': b'10', 'BODY[HEADER.FIELDS (SUBJECT)]': b'Subject: a\r\n'}
+    assert messages[1]['UID'] == b'11'
+    assert messages[1]['BODY[1]'] == b'hello'
+    assert messages[1]['FLAGS'] == [b'\\Seen']
+    assert messages[2] == {'UID': b'12', 'BODY[1]': None}
+
+def test_parse_fetch_response_unescapes_quoted_strings():
+    data = [b'1 (UID 3 BODYSTRUCTURE ("text" "plain" ("charset" "a\\"b") NIL NIL "7bit" 5 1))']
+    structure = parse_fetch_response(data)[0]['BODYSTRUCTURE']
+    assert structure[:3] == [b'text', b'plain', [b'charset', b'a"b']]
+    assert structure[3] is None
+
+def test_parse_fetch_response_skips_none_and_garbage():
+    assert parse_fetch_response([None, b'* garbage']) == []
+
+def test_find_text_part_single_part():
+    structure = [b'text', b'plain', [b'charset', b'iso-8859-1'], None, None, b'BASE64', b'10', b'1']
+    assert find_text_part(structure) == ('1', 'base64', 'iso-8859-1')
+
+def test_find_text_part_nested_multipart():
+    html = [b'text', b'html', [b'charset', b'utf-8'], None, None, b'7bit', b'10', b'1']
+    plain = [b'text', b'plain', [b'charset', b'utf-8'], None, None, b'quoted-printable', b'10', b'1']
+    image = [b'image', b'png', None, None, None, b'base64', b'10']
+    structure = [[html, plain, b'alternative'], image, b'mixed']
+    assert find_text_part(structure) == ('1.2', 'quoted-printable', 'utf-8')
+
+def test_find_text_part_without_plain_text():
+    html = [b'text', b'html', None, None, None, b'7bit', b'10', b'1']
+    assert find_text_part([html, b'alternative']) is None
+    assert find_text_part(None) is None
+
+def test_decode_part_transfer_encodings():
+    text = 'Café – Data Engineer'
+    assert decode_part(base64.b64encode(text.encode()), 'base64', 'utf-8') == text
+    assert decode_part(quopri.encodestring(text.encode()), 'quoted-printable', 'utf-8') == text
+    assert decode_part(text.encode(), '7bit', 'no-such-charset') == text
+    assert decode_part(None, '7bit', 'utf-8') == ''
+
+def test_decode_subject_encoded_word():
+    assert decode_subject('=?utf-8?b?Q2Fmw6k=?=') == 'Café'
+    assert decode_subject(None) == ''
+
+def test_search_uids_drops_uids_at_or_below_checkpoint(mail, mailbox):
+    uids = search_uids(mail, f'UID {len(mailbox)}:*', after_uid=len(mailbox))
+    assert uids == []
+
+def test_fetch_headers_and_bodies_match_the_messages(mail, mailbox):
+    uids = [str(uid).encode() for uid in range(1, len(mailbox) + 1)]
+    headers = fetch_headers(mail, uids)
+    assert [header['uid'] for header in headers] == uids
+    for header, body in fetch_bodies(mail, headers, chunk_size=7):
+        message = mailbox.message(int(header['uid']))
+        assert header['subject'] == message.subject
+        assert header['from'] == message.sender
+        assert header['section'] == '1'
+        subtype, encoding, payload = message.parts[0]
+        assert body == decode_part(payload, encoding, 'utf-8')
+        assert body.strip()
+    # One header FETCH, then one body FETCH per chunk of 7
+    assert mail.stats.commands['UID FETCH'] == 1 + -(-len(mailbox) // 7)
+
+def test_fetch_raw_parts_yields_each_chunk_as_it_arrives(mail, mailbox):
+    uids = [str(uid).encode() for uid in range(1, len(mailbox) + 1)]
+    headers = fetch_headers(mail, uids)
+    # Out of order, with one message that has no text part
+    headers = headers[10:] + headers[:10]
+    headers[0] = {**headers[0], 'section': None}
+    parts = fetch_raw_parts(mail, headers, chunk_size=7)
+    header, payload = next(parts)
+    assert header['uid'] == b'1'
+    assert mail.stats.commands['UID FETCH'] == 2
+    rest = list(parts)
+    assert [int(header['uid']) for header, _ in rest] == list(range(2, len(mailbox) + 1))
+    assert [header['uid'] for header, payload in rest if payload is None] == [b'11']
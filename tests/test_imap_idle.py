@@ -0,0 +1,75 @@
+import imap_idle
+from imap_idle import Backoff, forget_new_mail, idle, poll
+
+class FakeIdleMail:
+    """Just enough of imaplib.IMAP4 for idle() and poll(): untagged responses, NOOP and IDLE"""
+
+    def __init__(self, arrivals=()):
+        self.untagged_responses = {}
+        self.arrivals = list(arrivals)
+        self.noops = 0
+        self.idles = 0
+
+    def response(self, code):
+        return code, self.untagged_responses.pop(code, [None])
+
+    def announce(self):
+        self.untagged_responses.setdefault('EXISTS', []).append(b'1')
+
+    def noop(self):
+        self.noops += 1
+        if self.arrivals and self.arrivals.pop(0):
+            self.announce()
+
+    def idle(self, duration=None):
+        self.idles += 1
+        responses = [('EXISTS', [b'1'])] if self.arrivals and self.arrivals.pop(0) else []
+
+        class Idler:
+            def __enter__(self):
+                return iter(responses)
+
+            def __exit__(self, *exc):
+                return False
+        return Idler()
+
+def test_idle_returns_at_once_for_mail_announced_during_a_sync():
+    mail = FakeIdleMail()
+    mail.announce()
+    assert idle(mail, timeout=0) is True
+    assert mail.idles == 0
+    # Still pending until the next sync's search takes it
+    assert idle(mail, timeout=0) is True
+    forget_new_mail(mail)
+    assert idle(mail, timeout=0) is False
+    assert mail.idles == 1
+
+def test_idle_reports_an_exists_during_idle():
+    assert idle(FakeIdleMail(arrivals=[True]), timeout=0) is True
+
+def test_poll_stops_on_new_mail(monkeypatch):
+    monkeypatch.setattr(imap_idle.time, 'sleep', lambda seconds: None)
+    mail = FakeIdleMail(arrivals=[False, False, True])
+    assert poll(mail, timeout=60, interval=1) is True
+    assert mail.noops == 3
+
+def test_poll_skips_noop_when_mail_is_already_pending():
+    mail = FakeIdleMail()
+    mail.announce()
+    assert poll(mail, timeout=0) is True
+    assert mail.noops == 0
+
+def test_poll_times_out():
+    mail = FakeIdleMail()
+    assert poll(mail, timeout=0) is False
+    assert mail.noops == 1
+
+def test_backoff_doubles_up_to_the_maximum(monkeypatch):
+    slept = []
+    monkeypatch.setattr(imap_idle.time, 'sleep', slept.append)
+    backoff = Backoff(minimum=5, maximum=12)
+    for _ in range(4):
+        backoff.sleep()
+    backoff.reset()
+    backoff.sleep()
+    assert slept == [5, 10, 12, 12, 5]
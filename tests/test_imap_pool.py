@@ -0,0 +1,66 @@
+import threading
+import imap_pool
+from imap_pool import ImapConnectionPool, parallel_fetch_and_parse
+
+class FakeConnection:
+    def __init__(self, server):
+        self.server = server
+        self.selected = None
+        self.closed = False
+
+    def select(self, folder, readonly=False):
+        self.selected = (folder, readonly)
+
+    def close(self):
+        self.closed = True
+
+    def logout(self):
+        pass
+
+class FakeServer:
+    def __init__(self):
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def connect(self):
+        connection = FakeConnection(self)
+        with self.lock:
+            self.connections.append(connection)
+        return connection
+
+def fake_fetch_raw_parts(mail, headers, cache=None):
+    for header in headers:
+        yield header, b'body of ' + header['uid']
+
+def parse_message(header, payload):
+    # Module-level, so the spawned parse workers can import it
+    return payload.decode().upper()
+
+def headers_for(count):
+    return [{'uid': str(uid).encode()} for uid in range(1, count + 1)]
+
+def test_each_thread_logs_in_once(monkeypatch):
+    monkeypatch.setattr(imap_pool, 'fetch_raw_parts', fake_fetch_raw_parts)
+    server = FakeServer()
+    pool = ImapConnectionPool(server.connect, 'inbox')
+    pool.fetch_shard(headers_for(2))
+    pool.fetch_shard(headers_for(3))
+    thread = threading.Thread(target=pool.fetch_shard, args=(headers_for(1),))
+    thread.start()
+    thread.join()
+    assert len(server.connections) == 2
+    assert all(connection.selected == ('inbox', True) for connection in server.connections)
+    pool.close()
+    assert all(connection.closed for connection in server.connections)
+
+def test_results_come_back_in_uid_order(monkeypatch):
+    monkeypatch.setattr(imap_pool, 'fetch_raw_parts', fake_fetch_raw_parts)
+    server = FakeServer()
+    headers = headers_for(23)
+    results = list(parallel_fetch_and_parse(server.connect, 'inbox', headers, parse_message,
+                                            pool_size=3, parse_workers=2, shard_size=4))
+    assert [header['uid'] for header, _ in results] == [header['uid'] for header in headers]
+    assert results[0][1] == 'BODY OF 1'
+    assert results[-1][1] == 'BODY OF 23'
+    assert 1 <= len(server.connections) <= 3
+    assert all(connection.closed for connection in server.connections)
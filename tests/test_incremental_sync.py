@@ -0,0 +1,46 @@
+import functools
+import os
+import sqlite3
+import pytest
+import process_job_emails
+import sync_state
+from process_job_emails import process_incremental
+from sqlite_db import SCHEMA
+
+FOLDER = 'inbox'
+
+@pytest.fixture(autouse=True)
+def state_file(tmp_path, monkeypatch):
+    path = str(tmp_path / 'sync_state.json')
+    monkeypatch.setattr(process_job_emails, 'load_state', functools.partial(sync_state.load_state, path=path))
+    monkeypatch.setattr(process_job_emails, 'save_state', functools.partial(sync_state.save_state, path=path))
+    # Started from somewhere else, like a cron job
+    monkeypatch.chdir(tmp_path)
+    return path
+
+def checkpoints():
+    return {key: value['last_uid'] for key, value in process_job_emails.load_state().items()}
+
+def test_default_state_file_does_not_depend_on_the_working_directory():
+    assert os.path.isabs(sync_state.SYNC_STATE_FILE)
+    assert os.path.dirname(sync_state.SYNC_STATE_FILE) == os.path.dirname(os.path.abspath(sync_state.__file__))
+
+def test_checkpoint_covers_the_whole_folder(mail, mailbox, db):
+    added = process_incremental(mail, db, FOLDER, mailbox.uidvalidity)
+    assert sum(added.values()) > 0
+    assert set(checkpoints().values()) == {len(mailbox)}
+    # Nothing new: a second run stores nothing
+    assert sum(process_incremental(mail, db, FOLDER, mailbox.uidvalidity).values()) == 0
+
+def test_failed_write_does_not_advance_the_checkpoint(mail, mailbox, db):
+    db.db.execute("DROP TABLE application_rollups")
+    with pytest.raises(sqlite3.OperationalError):
+        process_incremental(mail, db, FOLDER, mailbox.uidvalidity)
+    assert checkpoints() == {}
+    assert db.db.execute("SELECT COUNT(*) FROM job_applications").fetchone()[0] == 0
+
+    # Once the database is fixed the same mail is picked up again
+    db.db.executescript(SCHEMA)
+    added = process_incremental(mail, db, FOLDER, mailbox.uidvalidity)
+    assert sum(added.values()) == db.db.execute("SELECT COUNT(*) FROM job_applications").fetchone()[0] > 0
+    assert set(checkpoints().values()) == {len(mailbox)}
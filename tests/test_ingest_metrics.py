@@ -0,0 +1,81 @@
+import json
+import logging
+import sys
+import pytest
+from ingest_metrics import HISTOGRAM_BUCKETS, JsonFormatter, RunMetrics, configure_logging
+
+@pytest.fixture
+def metrics():
+    metrics = RunMetrics()
+    metrics.observe('db_insert', 0.002, items=500)
+    metrics.observe('db_insert', 0.2, items=12)
+    metrics.observe('extract', 60.0)
+    metrics.count('applications_inserted', 400)
+    metrics.count('applications_inserted', 12)
+    return metrics
+
+def test_stages_and_counters_add_up(metrics):
+    with metrics.stage('extract', items=3):
+        pass
+    report = metrics.report()
+    assert report['stages']['db_insert'] == {'calls': 2, 'items': 512, 'seconds': 0.202, 'max_seconds': 0.2}
+    assert report['stages']['extract']['calls'] == 2
+    assert report['stages']['extract']['items'] == 4
+    assert report['counters'] == {'applications_inserted': 412}
+
+def test_stage_is_timed_when_its_body_raises(metrics):
+    with pytest.raises(ValueError):
+        with metrics.stage('imap_search'):
+            raise ValueError("server went away")
+    assert metrics.report()['stages']['imap_search']['calls'] == 1
+
+def test_prometheus_histogram_is_cumulative(metrics):
+    lines = metrics.prometheus_text().splitlines()
+    assert 'jobapp_ingest_applications_inserted_total 412' in lines
+    buckets = [line for line in lines if line.startswith('jobapp_ingest_stage_seconds_bucket{stage="db_insert"')]
+    assert len(buckets) == len(HISTOGRAM_BUCKETS) + 1
+    assert buckets[0] == 'jobapp_ingest_stage_seconds_bucket{stage="db_insert",le="0.001"} 0'
+    assert buckets[1] == 'jobapp_ingest_stage_seconds_bucket{stage="db_insert",le="0.005"} 1'
+    assert buckets[-1] == 'jobapp_ingest_stage_seconds_bucket{stage="db_insert",le="+Inf"} 2'
+    # Slower than the last bucket only shows up in +Inf
+    assert 'jobapp_ingest_stage_seconds_bucket{stage="extract",le="30.0"} 0' in lines
+    assert 'jobapp_ingest_stage_seconds_bucket{stage="extract",le="+Inf"} 1' in lines
+    assert 'jobapp_ingest_stage_items_total{stage="db_insert"} 512' in lines
+
+def test_reports_are_written_only_when_configured(metrics, tmp_path):
+    json_path = tmp_path / 'run.json'
+    prometheus_path = tmp_path / 'run.prom'
+    metrics.write_reports(json_path=None, prometheus_path=None)
+    assert list(tmp_path.iterdir()) == []
+    metrics.write_reports(json_path=str(json_path), prometheus_path=str(prometheus_path))
+    assert json.loads(json_path.read_text())['counters'] == {'applications_inserted': 412}
+    assert prometheus_path.read_text().endswith('\n')
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['run.json', 'run.prom']
+
+def test_reset_starts_a_new_run(metrics):
+    metrics.reset()
+    assert metrics.report()['stages'] == {}
+    assert metrics.report()['counters'] == {}
+
+def test_json_log_lines():
+    try:
+        raise ValueError("bad row")
+    except ValueError:
+        record = logging.LogRecord('db_writer', logging.ERROR, __file__, 1, "Skipping %s", ('Acme',), sys.exc_info())
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry['level'] == 'ERROR'
+    assert entry['logger'] == 'db_writer'
+    assert entry['message'] == 'Skipping Acme'
+    assert 'ValueError: bad row' in entry['exception']
+
+def test_configure_logging_replaces_the_root_handlers():
+    root = logging.getLogger()
+    handlers, level = root.handlers, root.level
+    try:
+        configure_logging('DEBUG', 'json')
+        assert root.level == logging.DEBUG
+        [handler] = root.handlers
+        assert isinstance(handler.formatter, JsonFormatter)
+    finally:
+        root.handlers = handlers
+        root.setLevel(level)
@@ -0,0 +1,62 @@
+import sqlite3
+from datetime import date
+import pytest
+from app import fetch_page, format_cursor, parse_cursor
+
+PER_PAGE = 4
+
+@pytest.fixture
+def applications(db):
+    # Dict-like rows, as the dashboard's DictCursor returns them
+    db.db.row_factory = sqlite3.Row
+    dates = ['2025-03-01', '2025-03-01', '2025-03-02', None, '2025-02-28', '2025-03-02', None, '2025-03-01',
+             '2025-01-15', '2025-03-03', None, '2025-02-28', '2025-03-01']
+    db.db.executemany(
+        "INSERT INTO job_applications (company_name, job_title, application_date, status, platform) VALUES (?, ?, ?, 'Applied', 'LinkedIn')",
+        [(f"Company {index}", "Engineer", value) for index, value in enumerate(dates)]
+    )
+    expected = db.db.execute(
+        "SELECT number FROM job_applications ORDER BY application_date IS NULL, application_date DESC, number DESC"
+    ).fetchall()
+    return [row['number'] for row in expected]
+
+def cursor_for(row):
+    # SQLite hands dates back as text; round-trip them through the URL form
+    return parse_cursor(f"{row['application_date'] or 'null'}:{row['number']}")
+
+def test_parse_and_format_cursor():
+    assert format_cursor({'application_date': date(2025, 3, 1), 'number': 42}) == '2025-03-01:42'
+    assert format_cursor({'application_date': None, 'number': 7}) == 'null:7'
+    assert parse_cursor('2025-03-01:42') == (date(2025, 3, 1), 42)
+    assert parse_cursor('null:7') == (None, 7)
+
+@pytest.mark.parametrize('value', ['', None, 'garbage', '2025-13-01:4', '2025-03-01:x'])
+def test_parse_cursor_rejects_malformed_values(value):
+    assert parse_cursor(value) is None
+
+def test_paging_forward_visits_every_row_once(db, applications):
+    seen = []
+    after = None
+    while True:
+        rows, has_previous, has_next = fetch_page(db, [], [], PER_PAGE, after=after)
+        assert has_previous == (after is not None)
+        seen.extend(row['number'] for row in rows)
+        if not has_next:
+            break
+        after = cursor_for(rows[-1])
+    assert seen == applications
+
+def test_paging_backward_returns_the_previous_page(db, applications):
+    pages = []
+    after = None
+    while True:
+        rows, _, has_next = fetch_page(db, [], [], PER_PAGE, after=after)
+        pages.append(rows)
+        if not has_next:
+            break
+        after = cursor_for(rows[-1])
+    for previous, current in zip(pages, pages[1:]):
+        rows, has_previous, has_next = fetch_page(db, [], [], PER_PAGE, before=cursor_for(current[0]))
+        assert [row['number'] for row in rows] == [row['number'] for row in previous]
+        assert has_next
+        assert has_previous == (previous is not pages[0])
@@ -0,0 +1,75 @@
+import base64
+import os
+import pytest
+from local_mail import iter_local_messages, message_body
+
+LINKEDIN = (b"From: LinkedIn <jobs-noreply@linkedin.com>\n"
+            b"Subject: Alex, your application was sent to Acme\n"
+            b"Date: Tue, 04 Mar 2025 10:30:00 +0000\n"
+            b"\n"
+            b"Data Engineer\nAcme\n")
+JOBSDB = (b"From: JobsDB <noreply@jobsdb.com>\n"
+          b"Subject: =?utf-8?b?" + base64.b64encode('Café application'.encode()) + b"?=\n"
+          b"Date: Wed, 05 Mar 2025 09:00:00 +0000\n"
+          b"MIME-Version: 1.0\n"
+          b"Content-Type: multipart/alternative; boundary=\"b\"\n"
+          b"\n"
+          b"--b\n"
+          b"Content-Type: text/html; charset=utf-8\n"
+          b"\n"
+          b"<p>html</p>\n"
+          b"--b\n"
+          b"Content-Type: text/plain; charset=iso-8859-1\n"
+          b"Content-Transfer-Encoding: base64\n"
+          b"\n" + base64.b64encode('Café'.encode('iso-8859-1')) + b"\n"
+          b"--b--\n")
+
+def read_all(path):
+    messages = []
+    for header, read_message in iter_local_messages(path):
+        messages.append((header, message_body(read_message())))
+    return messages
+
+def test_mbox_yields_headers_and_bodies_in_order(tmp_path):
+    path = tmp_path / 'export.mbox'
+    path.write_bytes(b"From a@b Tue Mar  4 10:30:00 2025\n" + LINKEDIN + b"\n"
+                     b"From a@b Wed Mar  5 09:00:00 2025\n" + JOBSDB)
+    [(first, first_body), (second, second_body)] = read_all(str(path))
+    assert first['uid'] == b'1'
+    assert first['subject'] == 'Alex, your application was sent to Acme'
+    assert first['from'] == 'LinkedIn <jobs-noreply@linkedin.com>'
+    assert first['date'].day == 4
+    assert first_body == 'Data Engineer\nAcme\n\n'
+    assert second['uid'] == b'2'
+    assert second['subject'] == 'Café application'
+    assert second_body == 'Café'
+
+def test_empty_mbox_yields_nothing(tmp_path):
+    path = tmp_path / 'empty.mbox'
+    path.write_bytes(b'')
+    assert read_all(str(path)) == []
+
+def test_maildir_reads_cur_and_new(tmp_path):
+    for sub_dir, name, raw in (('cur', 'b', JOBSDB), ('new', 'a', LINKEDIN), ('tmp', 'c', LINKEDIN)):
+        os.makedirs(tmp_path / sub_dir, exist_ok=True)
+        (tmp_path / sub_dir / name).write_bytes(raw)
+    messages = read_all(str(tmp_path))
+    assert [header['from'] for header, _ in messages] == [
+        'JobsDB <noreply@jobsdb.com>', 'LinkedIn <jobs-noreply@linkedin.com>'
+    ]
+
+def test_eml_files_and_directories(tmp_path):
+    os.makedirs(tmp_path / 'a')
+    (tmp_path / 'a' / 'one.eml').write_bytes(LINKEDIN)
+    (tmp_path / 'two.EML').write_bytes(JOBSDB)
+    (tmp_path / 'notes.txt').write_bytes(b'not mail')
+    # A directory's own files come before its subdirectories'
+    assert [header['from'] for header, _ in read_all(str(tmp_path))] == [
+        'JobsDB <noreply@jobsdb.com>', 'LinkedIn <jobs-noreply@linkedin.com>'
+    ]
+    [(header, body)] = read_all(str(tmp_path / 'a' / 'one.eml'))
+    assert body == 'Data Engineer\nAcme\n'
+
+def test_missing_export_is_an_error(tmp_path):
+    with pytest.raises(ValueError):
+        iter_local_messages(str(tmp_path / 'missing.mbox'))
@@ -0,0 +1,68 @@
+import itertools
+from datetime import datetime
+from types import SimpleNamespace
+import message_cache
+from message_cache import MessageCache, open_message_cache
+
+def header(uid, subject='Your application was sent to Acme'):
+    return {'uid': str(uid).encode(), 'subject': subject, 'from': 'jobs-noreply@linkedin.com',
+            'date': datetime(2025, 3, 4, 10, 30), 'section': '1', 'encoding': '7bit', 'charset': 'utf-8'}
+
+def test_headers_and_payloads_round_trip(tmp_path):
+    cache = MessageCache(str(tmp_path / 'cache.sqlite3'), 1024 * 1024)
+    inbox = cache.mailbox('inbox', 7)
+    inbox.put_headers([header(1), header(2)])
+    assert inbox.get_headers([b'1', b'2', b'3']) == {b'1': header(1), b'2': header(2)}
+    # Headers alone do not count as a fetched message
+    assert inbox.get_payloads([b'1', b'2']) == {}
+    inbox.put_payloads([(b'1', b'Data Engineer\nAcme\n'), (b'2', None)])
+    assert inbox.get_payloads([b'1', b'2']) == {b'1': b'Data Engineer\nAcme\n', b'2': None}
+    assert [(folder, cached['uid'], payload) for folder, cached, payload in cache.iter_messages()] == [
+        ('inbox', b'1', b'Data Engineer\nAcme\n'), ('inbox', b'2', None)
+    ]
+
+def test_new_uidvalidity_does_not_see_old_messages(tmp_path):
+    cache = MessageCache(str(tmp_path / 'cache.sqlite3'), 1024 * 1024)
+    cache.mailbox('inbox', 7).put_headers([header(1)])
+    assert cache.mailbox('inbox', 8).get_headers([b'1']) == {}
+    assert cache.mailbox('archive', 7).get_headers([b'1']) == {}
+
+def test_reopening_reuses_stored_messages(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = MessageCache(path, 1024 * 1024)
+    cache.mailbox('inbox', 7).put_headers([header(1)])
+    cache.mailbox('inbox', 7).put_payloads([(b'1', b'body')])
+    total_bytes = cache.total_bytes
+    cache.close()
+    reopened = MessageCache(path, 1024 * 1024)
+    assert reopened.total_bytes == total_bytes
+    assert reopened.mailbox('inbox', 7).get_payloads([b'1']) == {b'1': b'body'}
+
+def test_least_recently_used_messages_are_evicted(tmp_path, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(message_cache, 'time', SimpleNamespace(time=lambda: next(clock)))
+    cache = MessageCache(str(tmp_path / 'cache.sqlite3'), 1024 * 1024)
+    inbox = cache.mailbox('inbox', 7)
+    inbox.put_headers([header(1)])
+    inbox.put_headers([header(2)])
+    inbox.put_headers([header(3)])
+    # Reading 1 makes 2 the oldest
+    inbox.get_headers([b'1'])
+    per_message = cache.total_bytes // 3
+    cache.max_bytes = per_message * 2
+    cache._evict()
+    assert set(inbox.get_headers([b'1', b'2', b'3'])) == {b'1', b'3'}
+    assert cache.total_bytes == per_message * 2
+
+def test_shrinking_the_cap_evicts_on_open(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = MessageCache(path, 1024 * 1024)
+    cache.mailbox('inbox', 7).put_headers([header(uid) for uid in range(1, 11)])
+    cache.close()
+    reopened = MessageCache(path, 0)
+    assert reopened.total_bytes == 0
+    assert reopened.mailbox('inbox', 7).get_headers([str(uid).encode() for uid in range(1, 11)]) == {}
+
+def test_caching_is_off_without_a_path():
+    assert open_message_cache(path='') is None
+    assert open_message_cache(path=None) is None
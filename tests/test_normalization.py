@@ -0,0 +1,42 @@
+import pytest
+from normalization import company_normalizer, fold, platform_normalizer
+
+NAMES = ['Foo Inc Ltd', 'Foo Inc', 'Acme Co., Ltd.', 'ACME CO LTD', '  Globex   Pte. Ltd ', 'Booking.com',
+         'Initech, LLC.', 'Ltd', 'Inc Ltd', 'Hooli Corporation Limited', 'Umbrella GmbH -', '']
+
+@pytest.fixture
+def companies():
+    normalizer = company_normalizer({'Big Blue': 'IBM Corporation'})
+    for name in ['Acme', 'Acme', 'ACME Ltd']:
+        normalizer.learn(name)
+    return normalizer
+
+@pytest.mark.parametrize('name, expected', [
+    ('Foo Inc Ltd', 'Foo'),
+    ('Acme Co., Ltd.', 'Acme'),
+    ('ACME CO LTD', 'Acme'),
+    ('  Globex   Pte. Ltd ', 'Globex'),
+    ('Initech, LLC.', 'Initech'),
+    ('Umbrella GmbH -', 'Umbrella'),
+    ('Booking.com', 'Booking.com'),
+    # Nothing would be left
+    ('Ltd', 'Ltd'),
+    ('Inc Ltd', 'Inc'),
+    ('big  blue', 'IBM Corporation')
+])
+def test_company_rules(companies, name, expected):
+    assert companies.normalize(name) == expected
+
+@pytest.mark.parametrize('name', NAMES + ['Big Blue', 'IBM Corporation'])
+def test_normalizing_is_idempotent(companies, name):
+    once = companies.normalize(name)
+    assert companies.normalize(once) == once
+
+def test_most_common_spelling_wins(companies):
+    assert companies.normalize('aCmE') == 'Acme'
+    assert companies.key('ACME Limited') == fold('acme')
+
+def test_platform_patterns():
+    platforms = platform_normalizer({'Indeed Jobs': 'Indeed'})
+    assert [platforms.normalize(name) for name in ['jobsDB', 'Linedin', 'Indeed Jobs', 'Glassdoor']] == \
+        ['Jobsdb', 'LinkedIn', 'Indeed', 'Glassdoor']
@@ -0,0 +1,77 @@
+from datetime import date, timedelta
+import pytest
+from db_writer import update_database
+from dedup import apply_duplicates, load_rows, find_duplicates
+from normalize_company_names import apply_changes
+from rollups import ROLLUP_TABLES, add_to_rollups, load_stats, prune_rollups, rebuild_rollups
+
+@pytest.fixture(autouse=True)
+def no_dedup(monkeypatch):
+    monkeypatch.setattr('db_writer.DEDUP_MODE', 'off')
+
+def rollups(db, table='application_rollups'):
+    return sorted(db.db.execute(f"SELECT * FROM {table}").fetchall())
+
+def all_rollups(db):
+    return [rollups(db, table) for table in ROLLUP_TABLES]
+
+def assert_matches_rebuild(db):
+    incremental = all_rollups(db)
+    rebuild_rollups(db)
+    assert incremental == all_rollups(db)
+
+def test_removing_what_was_added_leaves_nothing(stored):
+    with stored.cursor() as cursor:
+        add_to_rollups(cursor, "company_name = %s", ['Acme'], sign=-1)
+        add_to_rollups(cursor, "company_name = %s", ['Acme'])
+        add_to_rollups(cursor, "1 = 1", sign=-1)
+        prune_rollups(cursor)
+    stored.commit()
+    assert all_rollups(stored) == [[], [], []]
+
+def test_inserted_batches_match_a_rebuild(stored, job_info):
+    # Rows that already exist are skipped and must not be counted again
+    update_database(stored, [job_info('Acme', 'Data Engineer', '2025-03-01'), job_info('Hooli', 'QA', '2025-03-05')])
+    assert_matches_rebuild(stored)
+    assert sum(row[-1] for row in rollups(stored)) == 6
+    assert rollups(stored, 'application_status_rollups') == [('Applied', 5), ('Viewed', 1)]
+
+def test_batch_counts_only_its_own_rows(stored, job_info):
+    # A row committed by another writer between this batch's reads and writes
+    stored.db.execute("INSERT INTO job_applications (company_name, job_title, application_date, status, platform) "
+                      "VALUES ('Other', 'Writer', '2025-03-04', 'Applied', 'LinkedIn')")
+    update_database(stored, [job_info('Hooli', 'QA', '2025-03-05')])
+    companies = [row[3] for row in rollups(stored)]
+    assert 'Hooli' in companies and 'Other' not in companies
+
+def test_company_renames_match_a_rebuild(stored):
+    numbers = [row[0] for row in stored.db.execute("SELECT number FROM job_applications WHERE company_name = 'Acme'")]
+    assert apply_changes(stored, [(number, 'Acme', 'Acme Corporation') for number in numbers]) == len(numbers)
+    assert_matches_rebuild(stored)
+    assert 'Acme' not in [row[3] for row in rollups(stored)]
+
+def test_merged_duplicates_match_a_rebuild(stored):
+    rows = load_rows(stored)
+    pairs = find_duplicates(rows)
+    assert len(pairs) == 1
+    apply_duplicates(stored, pairs, mode='merge')
+    assert_matches_rebuild(stored)
+    # The kept row takes the duplicate's later status
+    assert ('2025-03-01', 'LinkedIn', 'Viewed', 'Acme', 1) in rollups(stored)
+
+def test_load_stats_funnel_and_weeks(db, job_info):
+    today = date.today()
+    update_database(db, [
+        job_info('Acme', 'A', today.isoformat()),
+        job_info('Acme', 'B', today.isoformat(), status='Interviewing'),
+        job_info('Globex', 'C', (today - timedelta(days=7)).isoformat(), status='Rejected', platform='Jobsdb')
+    ])
+    stats = load_stats(db, weeks=4, top=1)
+    assert stats['total'] == 3
+    assert dict(stats['funnel']) == {'Applied': 3, 'Viewed': 1, 'Interviewing': 1, 'Offered': 0}
+    assert stats['other_statuses'] == [('Rejected', 1)]
+    assert stats['top_companies'] == [('Acme', 2)]
+    per_platform = dict(stats['per_platform'])
+    assert per_platform['LinkedIn'][-1] == 2
+    assert sum(per_platform['Jobsdb']) == 1
+    assert len(stats['weeks']) == 4
@@ -0,0 +1,56 @@
+import sqlite3
+import pytest
+from cache_versions import bump_version
+from search_index import SearchIndex
+
+ROWS = [
+    (1, 'Acme', 'Data Engineer'),
+    (2, 'Globex', 'Acme Integrations Lead'),
+    (3, 'Macmeister', 'Analyst'),
+    (4, 'Initech', 'Senior Data Engineer'),
+    (5, 'Data Corp', 'Backend Developer')
+]
+
+@pytest.fixture
+def db(db):
+    db.db.row_factory = sqlite3.Row
+    insert(db, ROWS)
+    return db
+
+def insert(db, rows):
+    with db.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO job_applications (number, company_name, job_title, status) VALUES (%s, %s, %s, 'Applied')",
+            rows
+        )
+        bump_version(cursor)
+    db.commit()
+
+def substring_matches(rows, query):
+    query = query.casefold()
+    return {number for number, company, title in rows if query in company.casefold() or query in title.casefold()}
+
+@pytest.mark.parametrize('query', ['acme', 'ACM', 'data', 'engineer', 'cme', 'zz', 'da', 'Senior Data'])
+def test_matches_the_same_rows_as_a_substring_search(db, query):
+    index = SearchIndex(check_interval=0)
+    assert set(index.search(db, query)) == substring_matches(ROWS, query)
+
+def test_any_company_match_ranks_above_any_title_match(db):
+    scores = SearchIndex(check_interval=0).search(db, 'acme')
+    # Exact company, then an infix company match, then a title prefix match
+    assert scores[1] > scores[3] > scores[2]
+
+def test_new_rows_are_added_incrementally(db):
+    index = SearchIndex(check_interval=0)
+    assert set(index.search(db, 'umbrella')) == set()
+    insert(db, [(6, 'Umbrella', 'Chemist')])
+    assert set(index.search(db, 'umbrella')) == {6}
+
+def test_rows_committed_out_of_number_order_are_found(db):
+    index = SearchIndex(check_interval=0)
+    index.search(db, 'x')
+    # Row 7 commits before row 6, whose writer started first
+    insert(db, [(7, 'Hooli', 'Engineer')])
+    assert set(index.search(db, 'hooli')) == {7}
+    insert(db, [(6, 'Hooli XYZ', 'Engineer')])
+    assert set(index.search(db, 'hooli')) == {6, 7}
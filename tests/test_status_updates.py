@@ -0,0 +1,145 @@
+import sqlite3
+from datetime import datetime
+import pytest
+from db_writer import update_database
+from extractors import LINKEDIN, RECRUITER, classify_status
+from rollups import ROLLUP_TABLES, rebuild_rollups
+from status_updates import ApplicationIndex, StatusUpdateWriter
+
+SENT_AT = datetime(2025, 3, 10, 9, 0)
+
+@pytest.mark.parametrize('text, status', [
+    ("Unfortunately the panel moved; we'd like to invite you to an interview on Tuesday", 'Interviewing'),
+    ("We would like to schedule a phone call next week", 'Interviewing'),
+    ("Unfortunately, we have decided to proceed with other candidates", 'Rejected'),
+    ("After careful review we will not be moving forward with your application", 'Rejected'),
+    ("Thank you for interviewing with us. We regret to inform you that the role has closed", 'Rejected'),
+    ("We are pleased to offer you the position", 'Offered'),
+    ("Unfortunately our office is closed on Friday", None),
+    ("Thank you for applying, we have received your application", None)
+])
+def test_classify_status(text, status):
+    assert classify_status(text) == status
+
+def test_linkedin_viewed():
+    body = "Your application was viewed by Acme\n\nData Engineer\nAcme · Hong Kong SAR\n"
+    [job_info] = LINKEDIN.extract(body, 'Your application was viewed by Acme', SENT_AT, 'jobs-noreply@linkedin.com')
+    assert (job_info['status'], job_info['job_title'], job_info['status_date']) == ('Viewed', 'Data Engineer', '2025-03-10')
+
+def test_linkedin_update_without_a_status_yields_nothing():
+    subject = 'Your application to Data Engineer at Acme'
+    assert LINKEDIN.extract('Thanks for applying', subject, SENT_AT, 'jobs-noreply@linkedin.com') == []
+
+def test_recruiter_email_company_and_title():
+    body = "Hi Alex,\nWe'd like to invite you to an interview for the Platform Engineer position.\n"
+    [job_info] = RECRUITER.extract(body, 'Thank you for applying to Globex', SENT_AT, 'Globex Recruiting <no-reply@lever.co>')
+    assert (job_info['status'], job_info['company_name'], job_info['job_title']) == ('Interviewing', 'Globex', 'Platform Engineer')
+
+def test_recruiter_email_falls_back_to_the_sender_name():
+    [job_info] = RECRUITER.extract('We regret to inform you...', 'An update', SENT_AT, '"Initech Talent Team" <x@greenhouse.io>')
+    assert (job_info['company_name'], job_info['job_title']) == ('Initech', None)
+
+def test_recruiter_email_without_an_employer_yields_nothing():
+    assert RECRUITER.extract('We regret to inform you', 'An update', SENT_AT, 'Greenhouse <no-reply@greenhouse.io>') == []
+
+def update(company, title, status):
+    return {'company_name': company, 'job_title': title, 'application_date': None, 'status': status,
+            'platform': 'LinkedIn', 'company_platform': 'NA', 'status_date': '2025-03-10'}
+
+def statuses(db):
+    return dict(db.db.execute("SELECT number, status FROM job_applications").fetchall())
+
+def test_index_matching():
+    index = ApplicationIndex()
+    for number, company, title, application_date in [
+        (1, 'Acme', 'Data Engineer', '2025-01-05'), (2, 'Acme', 'Data Engineer', '2025-03-01'),
+        (3, 'Acme Ltd', 'Business Analyst', '2025-03-02'), (4, 'Globex', 'Software Engineer II', '2025-03-03')
+    ]:
+        index.add({'number': number, 'company_name': company, 'job_title': title,
+                   'application_date': application_date, 'status': 'Applied'})
+    # Exact title: the most recent application
+    assert index.find('ACME', 'data engineer')['number'] == 2
+    # Close title at the same company
+    assert index.find('Acme', 'Business Analysts')['number'] == 3
+    # No title: the company's latest application
+    assert index.find('Acme', None)['number'] == 3
+    assert index.find('Globex', 'Software Engineer III') is None
+    assert index.find('Hooli', 'Data Engineer') is None
+
+def history(db):
+    return db.db.execute(
+        "SELECT application_number, old_status, new_status, changed_on, source FROM application_status_history ORDER BY id"
+    ).fetchall()
+
+def test_writer_applies_forward_transitions_in_one_batch(stored):
+    writer = StatusUpdateWriter(stored, index=ApplicationIndex())
+    for job in [update('Acme', 'Data Engineer', 'Interviewing'), update('Acme', 'Data Engineer', 'Viewed'),
+                update('Globex', 'Platform Engineer', 'Rejected'), update('Hooli', 'QA', 'Rejected')]:
+        writer.add(job)
+    stored.round_trips = 0
+    assert writer.flush() == 2
+    assert statuses(stored) == {1: 'Interviewing', 2: 'Applied', 3: 'Viewed', 4: 'Applied', 5: 'Rejected', 6: 'Applied'}
+    assert writer.unmatched_count == 1
+    assert history(stored) == [(1, 'Applied', 'Interviewing', '2025-03-10', 'LinkedIn'),
+                               (5, 'Applied', 'Rejected', '2025-03-10', 'LinkedIn')]
+    # A fixed number of statements, however many updates the batch holds
+    assert stored.round_trips <= 16
+
+def test_status_never_moves_backwards(stored):
+    writer = StatusUpdateWriter(stored, index=ApplicationIndex())
+    writer.add(update('Globex', 'Platform Engineer', 'Interviewing'))
+    writer.flush()
+    writer.add(update('Globex', 'Platform Engineer', 'Viewed'))
+    assert writer.flush() == 0
+    assert statuses(stored)[5] == 'Interviewing'
+
+def test_status_edited_by_hand_is_respected(stored):
+    index = ApplicationIndex()
+    writer = StatusUpdateWriter(stored, index=index)
+    writer.add(update('Globex', 'Platform Engineer', 'Viewed'))
+    writer.flush()
+    # Edits the index never hears about
+    stored.db.execute("UPDATE job_applications SET status = 'Offered' WHERE number = 5")
+    stored.db.execute("UPDATE job_applications SET status = 'Applied' WHERE number = 3")
+    stored.db.commit()
+    for job in [update('Globex', 'Platform Engineer', 'Interviewing'), update('Acme', 'Data Engineers', 'Viewed')]:
+        writer.add(job)
+    assert writer.flush() == 1
+    assert (statuses(stored)[5], statuses(stored)[3]) == ('Offered', 'Viewed')
+    assert history(stored)[-1] == (3, 'Applied', 'Viewed', '2025-03-10', 'LinkedIn')
+    assert index.rows[5]['status'] == 'Offered'
+
+def test_status_changes_keep_rollups_in_step(stored):
+    writer = StatusUpdateWriter(stored, index=ApplicationIndex())
+    writer.add(update('Acme', 'Business Analyst', 'Offered'))
+    writer.add(update('Globex', 'Platform Engineer', 'Rejected'))
+    writer.flush()
+    def rollups():
+        return [sorted(stored.db.execute(f"SELECT * FROM {table}").fetchall()) for table in ROLLUP_TABLES]
+    incremental = rollups()
+    rebuild_rollups(stored)
+    assert incremental == rollups()
+
+def test_index_only_loads_new_rows_between_syncs(stored, job_info):
+    index = ApplicationIndex()
+    writer = StatusUpdateWriter(stored, index=index)
+    writer.add(update('Acme', 'Data Engineer', 'Viewed'))
+    writer.flush()
+    update_database(stored, [job_info('Hooli', 'QA', '2025-03-09')])
+    loaded = []
+    original_add = index.add
+    index.add = lambda row: (loaded.append(row['number']), original_add(row))
+    writer = StatusUpdateWriter(stored, index=index)
+    writer.add(update('Hooli', 'QA', 'Viewed'))
+    assert writer.flush() == 1
+    assert loaded == [7]
+
+def test_failed_status_write_is_raised_and_rolled_back(stored):
+    index = ApplicationIndex()
+    writer = StatusUpdateWriter(stored, index=index)
+    stored.db.execute("DROP TABLE application_status_history")
+    writer.add(update('Acme', 'Data Engineer', 'Viewed'))
+    with pytest.raises(sqlite3.OperationalError):
+        writer.flush()
+    assert statuses(stored)[1] == 'Applied'
+    assert index.rows == {}